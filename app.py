@@ -313,13 +313,59 @@ async def on_ready():
     try:
         logger.info("Запуск ежедневной очистки заявок на отгулы...")
         from utils.leave_request_storage import LeaveRequestStorage
-        asyncio.create_task(LeaveRequestStorage.start_daily_cleanup_task())
+        LeaveRequestStorage.schedule_daily_cleanup()
         logger.info("Задача ежедневной очистки заявок запущена")
     except Exception as e:
         logger.error("Ошибка запуска очистки заявок: %s", e)
         import traceback
         traceback.print_exc()
     
+    # Start user cache periodic cleanup
+    try:
+        from utils.user_cache import schedule_user_cache_cleanup
+        schedule_user_cache_cleanup()
+        logger.info("Задача очистки кэша пользователей запущена")
+    except Exception as e:
+        logger.error("Ошибка запуска очистки кэша пользователей: %s", e)
+
+    # Start hot reload of message files
+    try:
+        from utils.message_manager import schedule_messages_watch
+        schedule_messages_watch()
+        logger.info("Отслеживание изменений файлов сообщений запущено")
+    except Exception as e:
+        logger.error("Ошибка запуска отслеживания файлов сообщений: %s", e)
+
+    # Create indexes for hot personnel queries in the background
+    try:
+        from utils.database_manager.indexes import start_hot_path_indexes
+        start_hot_path_indexes()
+    except Exception as e:
+        logger.error("Ошибка запуска создания индексов частых запросов: %s", e)
+
+    # Periodic database health checks through the shared pool
+    try:
+        from utils.postgresql_pool import schedule_health_checks
+        schedule_health_checks()
+        logger.info("Проверка доступности PostgreSQL запущена")
+    except Exception as e:
+        logger.error("Ошибка запуска проверки доступности PostgreSQL: %s", e)
+
+    # Publish audit records left unsent before restart
+    try:
+        from utils.audit_outbox import audit_outbox
+        await audit_outbox.restore(bot)
+    except Exception as e:
+        logger.error("Ошибка восстановления очереди аудита: %s", e)
+
+    # Start warehouse cart eviction and snapshots
+    try:
+        from forms.warehouse.cart import schedule_cart_maintenance
+        schedule_cart_maintenance()
+        logger.info("Обслуживание корзин склада запущено")
+    except Exception as e:
+        logger.error("Ошибка запуска обслуживания корзин склада: %s", e)
+
     # 🚀 ЗАПУСК СИСТЕМЫ ПРЕДЗАГРУЗКИ КЭША
     try:
         logger.info("Запуск предзагрузчика кэша пользователей...")
@@ -682,6 +728,27 @@ async def shutdown_handler():
     logger.warning("Получен сигнал завершения...")
     logger.info("Завершение работы бота...")
     
+    try:
+        # Сохраняем корзины склада, чтобы они пережили перезапуск
+        from forms.warehouse.cart import cart_store
+        cart_store.save_snapshot()
+    except Exception as e:
+        logger.error("Ошибка сохранения корзин склада: %s", e)
+    
+    try:
+        # Записываем отложенный снимок таймеров поставок
+        from forms.supplies.supplies_manager import flush_timer_stores
+        flush_timer_stores()
+    except Exception as e:
+        logger.error("Ошибка сохранения таймеров поставок: %s", e)
+    
+    try:
+        # Записываем отложенный снимок очереди аудита
+        from utils.audit_outbox import audit_outbox
+        audit_outbox.flush()
+    except Exception as e:
+        logger.error("Ошибка сохранения очереди аудита: %s", e)
+    
     try:
         # Закрываем соединение с Discord
         await bot.close()
@@ -560,6 +560,15 @@ class MessageManagement(commands.Cog):
                 inline=True
             )
 
+            embed.add_field(
+                name="🧩 Кэш шаблонов",
+                value=f"Записей: {cache_stats.get('resolved_messages', 0)}/{cache_stats.get('resolved_max_size', 0)}\n"
+                      f"Попаданий: {cache_stats.get('resolved_hits', 0)}\n"
+                      f"Промахов: {cache_stats.get('resolved_misses', 0)}\n"
+                      f"Вытеснений: {cache_stats.get('resolved_evictions', 0)}",
+                inline=True
+            )
+
             # File info
             file_info = report.get('file_info', {})
             embed.add_field(
@@ -5,6 +5,8 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from utils.config_manager import load_config, save_config
+from utils.job_scheduler import job_scheduler
+from utils.notification_scheduler import PromotionNotificationScheduler
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -53,6 +55,9 @@ class NotificationScheduleCommands(commands.Cog):
             
             save_config(config)
             
+            # Apply the new time to the already scheduled job
+            job_scheduler.reschedule(PromotionNotificationScheduler.JOB_NAME)
+            
             # Format time display
             time_str = f"{hour:02d}:{minute:02d}"
             
@@ -65,10 +70,7 @@ class NotificationScheduleCommands(commands.Cog):
             
             embed.add_field(
                 name="ℹ️ Примечание",
-                value=(
-                    "Изменения вступят в силу при следующем запуске планировщика.\n"
-                    "Для немедленного применения перезапустите бота."
-                ),
+                value="Изменения применены к планировщику сразу, перезапуск не требуется.",
                 inline=False
             )
             
@@ -11,6 +11,10 @@ from discord import app_commands
 import time
 from utils.user_cache import get_cache_statistics, get_cached_user_info
 from utils.database_manager import personnel_manager
+from utils.discord_mutation_queue import mutation_queue
+from utils.job_scheduler import job_scheduler
+from utils.prepared_statements import statement_registry
+from utils.postgresql_pool import get_pool_statistics
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -123,6 +127,63 @@ class PerformanceMonitoringCog(commands.Cog):
             inline=False
         )
         
+        # Очередь изменений Discord (роли, никнеймы)
+        queue_stats = mutation_queue.get_stats()
+        embed.add_field(
+            name="🚦 Очередь изменений Discord",
+            value=(
+                f"• Выполнено: {queue_stats['completed']} • Ошибок: {queue_stats['failed']}\n"
+                f"• В очереди: {queue_stats['pending']} • Выполняется: {queue_stats['in_flight']}\n"
+                f"• Повторов: {queue_stats['retried']} • Rate limit: {queue_stats['rate_limited']}\n"
+                f"• Retry-after: всего {queue_stats['retry_after_total']:.1f}s, макс. {queue_stats['retry_after_max']:.1f}s"
+            ),
+            inline=False
+        )
+        
+        # Фоновые задачи планировщика
+        job_lines = []
+        for job_name, job_stats in job_scheduler.get_stats().items():
+            avg = f"{job_stats['avg_duration']:.2f}s" if job_stats['avg_duration'] is not None else "—"
+            job_lines.append(
+                f"• `{job_name}`: запусков {job_stats['runs']}, ошибок {job_stats['failures']}, "
+                f"среднее {avg}, макс. {job_stats['max_duration']:.2f}s"
+            )
+        if job_lines:
+            embed.add_field(name="⏱️ Фоновые задачи", value="\n".join(job_lines)[:1024], inline=False)
+        
+        # Общий пул соединений PostgreSQL (сырой SQL и ORM)
+        pool_stats = get_pool_statistics()
+        last_check = pool_stats['health']['last_check']
+        if last_check is None:
+            health_text = "ещё не проверялась"
+        elif last_check['ok']:
+            health_text = f"доступна ({last_check['latency_ms']:.1f}ms)"
+        else:
+            health_text = f"недоступна: {last_check['error']}"
+        embed.add_field(
+            name="🗄️ Пул соединений PostgreSQL",
+            value=(
+                f"• Соединений: {pool_stats['pool_config']['min_connections']}-{pool_stats['pool_config']['max_connections']}, "
+                f"занято {pool_stats['pool_config']['active_connections']}\n"
+                f"• Выдано: {pool_stats['pool_efficiency']['pool_hits']} (ORM: {pool_stats['pool_efficiency']['orm_checkouts']})\n"
+                f"• БД: {health_text}"
+            )[:1024],
+            inline=False
+        )
+        
+        # Подготовленные запросы (самые частые первыми)
+        statement_lines = []
+        statement_stats = sorted(statement_registry.get_stats().items(), key=lambda item: item[1]['calls'], reverse=True)
+        for statement_name, stmt_stats in statement_stats:
+            if not stmt_stats['calls']:
+                continue
+            statement_lines.append(
+                f"• `{statement_name}`: вызовов {stmt_stats['calls']}, подготовок {stmt_stats['prepares']}, "
+                f"среднее {stmt_stats['avg_ms']:.1f}ms, макс. {stmt_stats['max_ms']:.1f}ms"
+            )
+        if statement_lines:
+            embed.add_field(name="🗂️ Подготовленные запросы", value="\n".join(statement_lines)[:1024], inline=False)
+        
         # Рекомендации
         recommendations = []
         if direct_time > 2.0:
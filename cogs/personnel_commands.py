@@ -604,7 +604,8 @@ class PersonnelCommands(commands.Cog):
                             target_user=сотрудник,
                             moderator=interaction.user,
                             personnel_data=personnel_data,
-                            config=config
+                            config=config,
+                            wait=False
                         )
                         logger.info("AUDIT PROMOTION: Аудит-уведомление отправлено")
 
@@ -751,7 +752,8 @@ class PersonnelCommands(commands.Cog):
                             target_user=сотрудник,
                             moderator=interaction.user,
                             personnel_data=personnel_data,
-                            config=config
+                            config=config,
+                            wait=False
                         )
                         logger.info("AUDIT DEMOTION: Аудит-уведомление отправлено")
 
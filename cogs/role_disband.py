@@ -9,7 +9,7 @@ from discord import app_commands
 from typing import List
 import asyncio
 from utils.config_manager import load_config, is_administrator
-from utils.message_manager import get_role_reason
+from utils.disband_jobs import DisbandJobManager
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -37,15 +37,28 @@ class RoleDisbandView(discord.ui.View):
                 )
                 return
             
-            # Disable the button and update the message
-            button.disabled = True
-            button.label = "⏳ Обрабатывается..."
-            button.style = discord.ButtonStyle.secondary
+            job_manager = interaction.client.get_cog('RoleDisband').job_manager
+            conflicting_job = job_manager.find_conflicting_job(interaction.guild.id, [role.id for role in self.roles_to_disband])
+            if conflicting_job:
+                await interaction.response.send_message(
+                    f"❌ Эти роли уже расформировываются (задача `{conflicting_job['job_id']}`).",
+                    ephemeral=True
+                )
+                return
+            
+            # Close the confirmation view right away - the job runs in the background
+            embed = discord.Embed(
+                title="🔄 Расформирование запущено",
+                description="Создание фоновой задачи...",
+                color=discord.Color.orange()
+            )
+            await interaction.response.edit_message(embed=embed, view=None)
+            self.stop()
             
-            await interaction.response.edit_message(view=self)
+            job = await job_manager.start_job(interaction.channel, self.roles_to_disband, self.admin_user, self.affected_users)
             
-            # Start the disbanding process
-            await self._execute_disband(interaction)
+            embed.description = f"Операция выполняется в фоне (задача `{job['job_id']}`). Прогресс отображается в сообщении канала."
+            await interaction.edit_original_response(embed=embed)
             
         except Exception as e:
             logger.error("Error in role disband confirmation: %s", e)
@@ -54,150 +67,6 @@ class RoleDisbandView(discord.ui.View):
                 ephemeral=True
             )
     
-    async def _execute_disband(self, interaction: discord.Interaction):
-        """Execute the role disbanding process"""
-        try:
-            total_users = len(self.affected_users)
-            processed_users = 0
-            failed_users = []
-            
-            # Create progress embed
-            progress_embed = discord.Embed(
-                title="🔄 Расформирование ролей",
-                description=f"Обработка: 0/{total_users} пользователей...",
-                color=discord.Color.orange()
-            )
-            
-            await interaction.edit_original_response(embed=progress_embed, view=None)
-            
-            # Process users in batches to avoid rate limits
-            batch_size = 10
-            for i in range(0, len(self.affected_users), batch_size):
-                batch = self.affected_users[i:i + batch_size]
-                batch_tasks = []
-                
-                for user in batch:
-                    batch_tasks.append(self._remove_roles_from_user(user, failed_users))
-                
-                # Execute batch
-                await asyncio.gather(*batch_tasks, return_exceptions=True)
-                
-                processed_users += len(batch)
-                
-                # Update progress every batch
-                progress_embed.description = f"Обработка: {processed_users}/{total_users} пользователей..."
-                await interaction.edit_original_response(embed=progress_embed)
-                
-                # Small delay to avoid rate limits
-                await asyncio.sleep(0.5)
-            
-            # Create final result embed
-            result_embed = discord.Embed(
-                title="✅ Расформирование завершено",
-                color=discord.Color.green()
-            )
-            
-            role_names = [role.mention for role in self.roles_to_disband]
-            result_embed.add_field(
-                name="Расформированные роли",
-                value=", ".join(role_names),
-                inline=False
-            )
-            
-            result_embed.add_field(
-                name="Статистика",
-                value=f"**Обработано пользователей:** {processed_users}\n**Успешно:** {processed_users - len(failed_users)}\n**Ошибок:** {len(failed_users)}",
-                inline=False
-            )
-            
-            if failed_users:
-                failed_mentions = [f"<@{user_id}>" for user_id in failed_users[:10]]  # Show max 10
-                if len(failed_users) > 10:
-                    failed_mentions.append(f"... и ещё {len(failed_users) - 10}")
-                
-                result_embed.add_field(
-                    name="⚠️ Не удалось обработать",
-                    value=", ".join(failed_mentions),
-                    inline=False
-                )
-            
-            result_embed.set_footer(text=f"Расформировал: {self.admin_user.display_name}")
-            result_embed.timestamp = discord.utils.utcnow()
-            
-            await interaction.edit_original_response(embed=result_embed)
-            
-            # Send audit log
-            await self._send_audit_log(interaction.guild, processed_users - len(failed_users))
-            
-        except Exception as e:
-            logger.error("Error executing role disband: %s", e)
-            error_embed = discord.Embed(
-                title="❌ Ошибка расформирования",
-                description="Произошла критическая ошибка при расформировании ролей.",
-                color=discord.Color.red()
-            )
-            await interaction.edit_original_response(embed=error_embed, view=None)
-    
-    async def _remove_roles_from_user(self, user: discord.Member, failed_users: List[int]):
-        """Remove roles from a single user"""
-        try:
-            roles_to_remove = []
-            for role in self.roles_to_disband:
-                if role in user.roles:
-                    roles_to_remove.append(role)
-            
-            if roles_to_remove:
-                await user.remove_roles(*roles_to_remove, reason=get_role_reason(user.guild.id, "role_removal.administrative", "Административное снятие роли").format(moderator=self.admin_user.mention))
-                logger.info(f"Removed {len(roles_to_remove)} roles from {user.display_name}")
-            
-        except Exception as e:
-            logger.warning(f"Failed to remove roles from {user.display_name}: %s", e)
-            failed_users.append(user.id)
-    
-    async def _send_audit_log(self, guild: discord.Guild, successful_count: int):
-        """Send audit log message"""
-        try:
-            config = load_config()
-            audit_channel_id = config.get('audit_channel')
-            
-            if not audit_channel_id:
-                logger.info("No audit channel configured")
-                return
-            
-            audit_channel = guild.get_channel(audit_channel_id)
-            if not audit_channel:
-                logger.info("Audit channel not found: %s", audit_channel_id)
-                return
-            
-            # Create audit embed
-            audit_embed = discord.Embed(
-                title="🔧 Административное действие",
-                description=f"{self.admin_user.mention} расформировал роли",
-                color=discord.Color.blue()
-            )
-            
-            role_names = [role.mention for role in self.roles_to_disband]
-            audit_embed.add_field(
-                name="Расформированные роли",
-                value=", ".join(role_names),
-                inline=False
-            )
-            
-            audit_embed.add_field(
-                name="Затронуто пользователей",
-                value=str(successful_count),
-                inline=True
-            )
-            
-            audit_embed.set_footer(text=f"ID администратора: {self.admin_user.id}")
-            audit_embed.timestamp = discord.utils.utcnow()
-            
-            await audit_channel.send(embed=audit_embed)
-            logger.info(f"Sent audit log for role disband by {self.admin_user.display_name}")
-            
-        except Exception as e:
-            logger.warning("Error sending audit log: %s", e)
-    
     @discord.ui.button(label="❌ Отменить", style=discord.ButtonStyle.secondary, custom_id="cancel_disband")
     async def cancel_disband(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handle cancellation of role disbanding"""
@@ -246,15 +115,64 @@ class RoleDisbandView(discord.ui.View):
         except Exception as e:
             logger.error("Error handling role disband timeout: %s", e)
 
-    # ...existing code...
-  
+
+class DisbandJobControlView(discord.ui.View):
+    """Persistent view attached to a running disband job's progress message"""
+    
+    def __init__(self):
+        super().__init__(timeout=None)
+    
+    @discord.ui.button(label="⏹️ Остановить", style=discord.ButtonStyle.secondary, custom_id="disband_job_cancel")
+    async def cancel_job(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Cancel the job this progress message belongs to"""
+        try:
+            job_manager = interaction.client.get_cog('RoleDisband').job_manager
+            job = job_manager.get_job_by_message(interaction.message.id)
+            if not job:
+                await interaction.response.send_message("❌ Задача расформирования не найдена.", ephemeral=True)
+                return
+            
+            config = load_config()
+            if interaction.user.id != job['admin_id'] and not is_administrator(interaction.user, config):
+                await interaction.response.send_message(
+                    "❌ Остановить расформирование может только инициатор или администратор.",
+                    ephemeral=True
+                )
+                return
+            
+            if await job_manager.cancel_job(job['job_id']):
+                await interaction.response.send_message(
+                    "⏹️ Расформирование будет остановлено после текущей порции.",
+                    ephemeral=True
+                )
+            else:
+                await interaction.response.send_message("ℹ️ Задача уже завершена.", ephemeral=True)
+        
+        except Exception as e:
+            logger.error("Error cancelling disband job: %s", e)
+            await interaction.response.send_message(
+                "❌ Произошла ошибка при остановке расформирования.",
+                ephemeral=True
+            )
+
+
 class RoleDisband(commands.Cog):
     """Cog for role disbanding functionality"""
     
     def __init__(self, bot):
         self.bot = bot
+        self.job_manager = DisbandJobManager(bot, DisbandJobControlView)
         logger.info("RoleDisband cog initialized")
     
+    async def cog_load(self):
+        """Register the persistent control view and resume interrupted jobs"""
+        self.bot.add_view(DisbandJobControlView())
+        asyncio.create_task(self._resume_jobs())
+    
+    async def _resume_jobs(self):
+        await self.bot.wait_until_ready()
+        await self.job_manager.resume_jobs()
+    
     @app_commands.command(name="расформ", description="Расформировать указанные роли (убрать у всех пользователей)")
     @app_commands.describe(
         роль1="Роль для расформирования",
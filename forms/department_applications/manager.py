@@ -13,6 +13,7 @@ from utils.config_manager import load_config, save_config
 from utils.ping_manager import ping_manager
 from utils.department_manager import DepartmentManager
 from .views import DepartmentSelectView
+from utils.message_edit_cache import message_edit_cache
 from utils.logging_setup import get_logger
 
 # Московский часовой пояс (UTC+3)
@@ -228,9 +229,11 @@ class DepartmentApplicationManager:
                 else:
                     logger.info(f"       Item %s: {type(item).__name__} (no custom_id)", i)
             
-            # Update the message with new view
-            await message.edit(view=view)
-            logger.info(f"     Message updated with new view")
+            # Update the message with new view (skipped if the layout is unchanged)
+            if await message_edit_cache.edit_if_changed(message, view=view):
+                logger.info(f"     Message updated with new view")
+            else:
+                logger.info(f"     View layout unchanged, edit skipped")
             
             # Note: View is already globally registered in app.py
             # No need to add it again here to prevent duplicates
@@ -1257,7 +1257,8 @@ class DepartmentApplicationModerationView(discord.ui.View):
                         target_user=target_user,
                         moderator=interaction.user,
                         personnel_data=position_personnel_data,
-                        config=config
+                        config=config,
+                        wait=False
                     )
             
             if success:
@@ -554,7 +554,8 @@ class RecruitmentModal(ui.Modal, title="Принятие на службу"):
                         target_user=self.target_user,
                         moderator=interaction.user,
                         personnel_data=personnel_data,
-                        config=config
+                        config=config,
+                        wait=False
                     )
                     logger.info("RECRUITMENT: Audit notification sent")
                 except Exception as audit_error:
@@ -848,113 +849,91 @@ class DismissalModal(ui.Modal, title="Увольнение"):
                 return False
             
             # Process dismissal directly (same as in dismissal reports)
-            from utils.postgresql_pool import get_db_cursor
+            from utils.database_manager import personnel_transaction
             from datetime import datetime, timezone
-            import json
             
             try:
-                with get_db_cursor() as cursor:
-                    # Get personnel and employee data
-                    cursor.execute("""
-                        SELECT 
-                            p.id, p.first_name, p.last_name, p.static,
-                            e.id as employee_id,
-                            r.name as current_rank,
-                            pos.name as current_position,
-                            sub.name as current_subdivision
-                        FROM personnel p
-                        LEFT JOIN employees e ON p.id = e.personnel_id
-                        LEFT JOIN ranks r ON e.rank_id = r.id
-                        LEFT JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
-                        LEFT JOIN positions pos ON ps.position_id = pos.id
-                        LEFT JOIN subdivisions sub ON e.subdivision_id = sub.id
-                        WHERE p.discord_id = %s AND p.is_dismissal = false
-                    """, (self.target_user.id,))
-                    
-                    personnel_record = cursor.fetchone()
-                    if not personnel_record:
-                        logger.info("DISMISSAL: User not found or already dismissed")
-                        await interaction.followup.send(
-                            "❌ Пользователь не найден в базе данных или уже уволен.",
-                            ephemeral=True
-                        )
-                        return False
+                # Lookups, employee removal, dismissal flag and history in one transaction
+                with personnel_transaction() as uow:
+                    # Get personnel, employee and moderator data in one query
+                    personnel_record = uow.load_context(self.target_user.id, interaction.user.id)
+                    if not personnel_record['personnel_id']:
+                        uow.abort(f"personnel not found or already dismissed: {self.target_user.id}")
+                    else:
+                        personnel_id = personnel_record['personnel_id']
+                        employee_id = personnel_record['employee_id']
+                        moderator_personnel_id = personnel_record['moderator_personnel_id']
+                        current_time = datetime.now(timezone.utc)
                     
-                    personnel_id = personnel_record['id']
-                    employee_id = personnel_record['employee_id']
-                    current_time = datetime.now(timezone.utc)
+                        # Detect presence of dismissal_reason column (compat with older schema)
+                        column_check = uow.fetchone("""
+                            SELECT COUNT(*) as cnt
+                            FROM information_schema.columns
+                            WHERE table_name = 'personnel' AND column_name = 'dismissal_reason'
+                        """)
+                        has_dismissal_reason_col = column_check.get('cnt', 0) > 0
                     
-                    # Step 1: Remove from employees table if exists
-                    if employee_id:
-                        cursor.execute("DELETE FROM employees WHERE id = %s", (employee_id,))
-                        logger.info("DISMISSAL: Removed employee record %s", employee_id)
+                        # Step 1: Remove from employees table if exists
+                        if employee_id:
+                            uow.execute("DELETE FROM employees WHERE id = %s", (employee_id,))
                     
-                    # Detect presence of dismissal_reason column (compat with older schema)
-                    cursor.execute("""
-                        SELECT COUNT(*) as cnt
-                        FROM information_schema.columns
-                        WHERE table_name = 'personnel' AND column_name = 'dismissal_reason'
-                    """)
-                    has_dismissal_reason_col = cursor.fetchone().get('cnt', 0) > 0
-
-                    # Step 2: Mark personnel as dismissed
-                    cursor.execute("""
-                        UPDATE personnel 
-                        SET is_dismissal = true, 
-                            dismissal_date = %s,
-                            last_updated = %s
-                        WHERE id = %s
-                    """, (current_time.date(), current_time, personnel_id))
-                    if has_dismissal_reason_col:
-                        cursor.execute("""
-                            UPDATE personnel
-                            SET dismissal_reason = %s
+                        # Step 2: Mark personnel as dismissed
+                        uow.execute("""
+                            UPDATE personnel 
+                            SET is_dismissal = true, 
+                                dismissal_date = %s,
+                                last_updated = %s
                             WHERE id = %s
-                        """, (reason, personnel_id))
-                    logger.info("DISMISSAL: Marked personnel %s as dismissed", personnel_id)
-                    
-                    # Step 3: Get moderator's personnel ID
-                    cursor.execute("""
-                        SELECT id FROM personnel WHERE discord_id = %s
-                    """, (interaction.user.id,))
-                    
-                    moderator_record = cursor.fetchone()
-                    moderator_personnel_id = moderator_record['id'] if moderator_record else None
+                        """, (current_time.date(), current_time, personnel_id))
+                        if has_dismissal_reason_col:
+                            uow.execute("""
+                                UPDATE personnel
+                                SET dismissal_reason = %s
+                                WHERE id = %s
+                            """, (reason, personnel_id))
                     
-                    # Step 4: Add history entry
-                    changes_data = {
-                        "rank": {
-                            "new": None,
-                            "previous": personnel_record.get('current_rank')
-                        },
-                        "position": {
-                            "new": None,
-                            "previous": personnel_record.get('current_position')
-                        },
-                        "subdivision": {
-                            "new": None,
-                            "previous": personnel_record.get('current_subdivision')
-                        },
-                        "dismissal_info": {
-                            "reason": reason,
-                            "static": personnel_record.get('static', ''),
-                            "moderator_info": interaction.user.display_name,
-                            "dismissed_at": current_time.isoformat()
+                        # Step 3: Add history entry
+                        changes_data = {
+                            "rank": {
+                                "new": None,
+                                "previous": personnel_record.get('rank_name')
+                            },
+                            "position": {
+                                "new": None,
+                                "previous": personnel_record.get('position_name')
+                            },
+                            "subdivision": {
+                                "new": None,
+                                "previous": personnel_record.get('subdivision_name')
+                            },
+                            "dismissal_info": {
+                                "reason": reason,
+                                "static": personnel_record.get('static') or '',
+                                "moderator_info": interaction.user.display_name,
+                                "dismissed_at": current_time.isoformat()
+                            }
                         }
-                    }
-                    
-                    cursor.execute("""
-                        INSERT INTO history (personnel_id, action_id, performed_by, details, changes, action_date)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, (
-                        personnel_id,
-                        3,  # Action ID for "Уволен со службы"
-                        moderator_personnel_id,  # Can be NULL if moderator not in personnel
-                        reason,
-                        json.dumps(changes_data, ensure_ascii=False),
-                        current_time
-                    ))
-                    logger.info("DISMISSAL: Added history entry for dismissal")
+                        uow.add_history(
+                            personnel_id,
+                            3,  # Action ID for "Уволен со службы"
+                            moderator_personnel_id,  # Can be NULL if moderator not in personnel
+                            changes_data,
+                            details=reason,
+                            action_date=current_time
+                        )
+
+                if uow.aborted:
+                    logger.info("DISMISSAL: User not found or already dismissed")
+                    await interaction.followup.send(
+                        "❌ Пользователь не найден в базе данных или уже уволен.",
+                        ephemeral=True
+                    )
+                    return False
+                
+                if employee_id:
+                    logger.info("DISMISSAL: Removed employee record %s", employee_id)
+                logger.info("DISMISSAL: Marked personnel %s as dismissed", personnel_id)
+                logger.info("DISMISSAL: Added history entry for dismissal")
                 
                 success = True
                 message = f"Пользователь успешно уволен из базы данных"
@@ -982,7 +961,6 @@ class DismissalModal(ui.Modal, title="Увольнение"):
                     logger.error("DISMISSAL: Ошибка при попытке инвалидации кэша: %s", cache_error)
                 try:
                     from utils.audit_logger import audit_logger, AuditAction
-                    from utils.postgresql_pool import get_db_cursor
                     config = load_config()
                     
                     audit_personnel_data = {
@@ -1005,35 +983,22 @@ class DismissalModal(ui.Modal, title="Увольнение"):
                     )
                     logger.info("DISMISSAL: Audit notification sent")
                     
-                    # Get personnel_id for auto-blacklist check (if allowed)
+                    # Auto-blacklist check for the dismissed personnel record (if allowed)
                     if perform_blacklist_check:
                         try:
-                            with get_db_cursor() as cursor:
-                                cursor.execute(
-                                    "SELECT id FROM personnel WHERE discord_id = %s;",
-                                    (self.target_user.id,)
-                                )
-                                result = cursor.fetchone()
+                            was_blacklisted = await audit_logger.check_and_send_auto_blacklist(
+                                guild=interaction.guild,
+                                target_user=self.target_user,
+                                moderator=interaction.user,
+                                personnel_id=personnel_id,
+                                personnel_data=audit_personnel_data,
+                                audit_message_url=audit_message_url,
+                                config=config
+                            )
+                            
+                            if was_blacklisted:
+                                logger.info(f"DISMISSAL: Auto-blacklist triggered for {audit_personnel_data.get('name')}")
                                 
-                                if result:
-                                    personnel_id = result['id']
-                                    
-                                    # Check and send auto-blacklist if needed
-                                    was_blacklisted = await audit_logger.check_and_send_auto_blacklist(
-                                        guild=interaction.guild,
-                                        target_user=self.target_user,
-                                        moderator=interaction.user,
-                                        personnel_id=personnel_id,
-                                        personnel_data=audit_personnel_data,
-                                        audit_message_url=audit_message_url,
-                                        config=config
-                                    )
-                                    
-                                    if was_blacklisted:
-                                        logger.info(f"DISMISSAL: Auto-blacklist triggered for {audit_personnel_data.get('name')}")
-                                else:
-                                    logger.info(f"DISMISSAL: Personnel not found in DB for auto-blacklist check: {self.target_user.id}")
-                                    
                         except Exception as blacklist_error:
                             logger.error("DISMISSAL: Error in auto-blacklist check: %s", blacklist_error)
                             # Don't fail the whole dismissal if blacklist check fails
@@ -1421,86 +1386,60 @@ class PositionSelect(ui.Select):
     async def _assign_position_in_db(self, user_discord_id: int, position_id: str, position_name: str, moderator_discord_id: int, old_position_name: str = None, moderator_member: discord.Member = None) -> bool:
         """Assign position to user in database and create history record"""
         try:
-            from utils.postgresql_pool import get_db_cursor
-            from datetime import datetime, timezone, timedelta
+            from utils.database_manager import personnel_transaction
             from utils.user_cache import invalidate_user_cache
             
-            # Get old position ID and name for role updates and history
-            old_position_id = None
+            # Get user as member for role updates
             user_member = None
-            try:
-                # Get user as member for role updates
-                for guild in self.bot.guilds if hasattr(self, 'bot') else []:
-                    user_member = guild.get_member(user_discord_id)
-                    if user_member:
-                        break
-                
-                if not user_member and hasattr(self, 'target_user'):
-                    user_member = self.target_user
-                
-                # Get old position ID (for role updates only, not for history)
-                with get_db_cursor() as cursor:
-                    cursor.execute("""
-                        SELECT ps.position_id
-                        FROM personnel p
-                        JOIN employees e ON p.id = e.personnel_id
-                        LEFT JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
-                        WHERE p.discord_id = %s AND p.is_dismissal = false
-                    """, (user_discord_id,))
-                    old_pos_result = cursor.fetchone()
-                    if old_pos_result and old_pos_result['position_id']:
-                        old_position_id = old_pos_result['position_id']
-            except Exception as e:
-                logger.warning("Warning: Could not get old position for role update: %s", e)
+            for guild in self.bot.guilds if hasattr(self, 'bot') else []:
+                user_member = guild.get_member(user_discord_id)
+                if user_member:
+                    break
             
-            with get_db_cursor() as cursor:
-                # Get personnel ID
-                cursor.execute("SELECT id FROM personnel WHERE discord_id = %s AND is_dismissal = false;", (user_discord_id,))
-                personnel_result = cursor.fetchone()
-                if not personnel_result:
+            if not user_member and hasattr(self, 'target_user'):
+                user_member = self.target_user
+            
+            # Lookups, employee update and history in one transaction
+            with personnel_transaction() as uow:
+                context = uow.load_context(user_discord_id, moderator_discord_id)
+                personnel_id = context['personnel_id']
+                if not personnel_id:
+                    uow.abort(f"personnel not found for {user_discord_id}")
+                    return False
+                moderator_personnel_id = context['moderator_personnel_id']
+                if not moderator_personnel_id:
+                    uow.abort(f"moderator not found for {moderator_discord_id}")
                     return False
-                personnel_id = personnel_result['id']
                 
                 # Get position_subdivision_id for the current user's subdivision
                 if position_id == "default":
                     # Handle default case - find Стажёр position
-                    cursor.execute("""
+                    ps_result = uow.fetchone("""
                         SELECT ps.id FROM position_subdivision ps
                         JOIN positions p ON ps.position_id = p.id
-                        JOIN employees e ON ps.subdivision_id = e.subdivision_id
-                        WHERE e.personnel_id = %s AND p.name = 'Стажёр'
+                        WHERE ps.subdivision_id = %s AND p.name = 'Стажёр'
                         LIMIT 1;
-                    """, (personnel_id,))
+                    """, (context['subdivision_id'],))
                 else:
                     # Normal case - find position_subdivision_id
-                    cursor.execute("""
+                    ps_result = uow.fetchone("""
                         SELECT ps.id FROM position_subdivision ps
-                        JOIN employees e ON ps.subdivision_id = e.subdivision_id
-                        WHERE e.personnel_id = %s AND ps.position_id = %s
+                        WHERE ps.subdivision_id = %s AND ps.position_id = %s
                         LIMIT 1;
-                    """, (personnel_id, position_id))
+                    """, (context['subdivision_id'], position_id))
                 
-                ps_result = cursor.fetchone()
                 if not ps_result:
+                    uow.abort(f"position {position_id} is not available in subdivision {context['subdivision_id']}")
                     return False
-                position_subdivision_id = ps_result['id']
                 
                 # Update employee with new position
-                cursor.execute("""
+                uow.execute("""
                     UPDATE employees 
                     SET position_subdivision_id = %s
                     WHERE personnel_id = %s;
-                """, (position_subdivision_id, personnel_id))
-                
-                # Get moderator personnel ID for history
-                cursor.execute("SELECT id FROM personnel WHERE discord_id = %s;", (moderator_discord_id,))
-                moderator_result = cursor.fetchone()
-                if not moderator_result:
-                    return False
-                moderator_personnel_id = moderator_result['id']
+                """, (ps_result['id'], personnel_id))
                 
                 # Create history record for position assignment (action_id = 5)
-                import json
                 changes = {
                     "rank": {
                         "new": None,
@@ -1515,47 +1454,36 @@ class PositionSelect(ui.Select):
                         "previous": None
                     }
                 }
-                
-                cursor.execute("""
-                    INSERT INTO history (personnel_id, action_id, performed_by, details, changes, action_date)
-                    VALUES (%s, %s, %s, %s, %s, %s);
-                """, (
-                    personnel_id,
-                    5,  # Position assignment action_id
-                    moderator_personnel_id,
-                    None,  # details = NULL
-                    json.dumps(changes, ensure_ascii=False),
-                    datetime.now(timezone(timedelta(hours=3)))  # Moscow time
-                ))
-                
-                # Update Discord roles for position change
-                if user_member:
+                uow.add_history(personnel_id, 5, moderator_personnel_id, changes)
+            
+            # Update Discord roles for position change (after commit)
+            if user_member:
+                try:
+                    # Refresh member object to get current roles
                     try:
-                        # Refresh member object to get current roles
-                        try:
-                            user_member = await user_member.guild.fetch_member(user_member.id)
-                            logger.info("🔄 Refreshed member object before position role update (old method)")
-                        except Exception as fetch_error:
-                            logger.warning("Could not refresh member: %s", fetch_error)
-                        
-                        new_position_id = int(position_id) if position_id.isdigit() else None
-                        from utils.role_utils import role_utils
-                        await role_utils.smart_update_user_position_roles(
-                            user_member.guild,
-                            user_member,
-                            new_position_id,
-                            moderator_member
-                        )
-                    except Exception as e:
-                        logger.error("Error updating position roles: %s", e)
+                        user_member = await user_member.guild.fetch_member(user_member.id)
+                        logger.info("🔄 Refreshed member object before position role update (old method)")
+                    except Exception as fetch_error:
+                        logger.warning("Could not refresh member: %s", fetch_error)
+                    
+                    new_position_id = int(position_id) if position_id.isdigit() else None
+                    from utils.role_utils import role_utils
+                    await role_utils.smart_update_user_position_roles(
+                        user_member.guild,
+                        user_member,
+                        new_position_id,
+                        moderator_member
+                    )
+                except Exception as e:
+                    logger.error("Error updating position roles: %s", e)
 
-                try:
-                    invalidate_user_cache(user_discord_id)
-                    logger.info("POSITION ASSIGN: Инвалидация кэша для пользователя %s", user_discord_id)
-                except Exception as cache_error:
-                    logger.error("POSITION ASSIGN: Ошибка при попытке инвалидации кэша: %s", cache_error)
-                
-                return True
+            try:
+                invalidate_user_cache(user_discord_id)
+                logger.info("POSITION ASSIGN: Инвалидация кэша для пользователя %s", user_discord_id)
+            except Exception as cache_error:
+                logger.error("POSITION ASSIGN: Ошибка при попытке инвалидации кэша: %s", cache_error)
+            
+            return True
                 
         except Exception as e:
             logger.error("Error in _assign_position_in_db: %s", e)
@@ -1571,14 +1499,10 @@ class PositionSelect(ui.Select):
             logger.info(f"EXECUTE DEPARTMENT CHANGE: Starting for user {self.target_user.id}, action_type={self.action_type}, dept_key={self.dept_key}, position=%s", position_name)
             
             # Import required modules
-            from utils.database_manager import PersonnelManager
-            from utils.database_manager.position_service import position_service
+            from utils.database_manager import PersonnelManager, personnel_transaction
             from utils.audit_logger import audit_logger, AuditAction
             from utils.config_manager import load_config
-            from utils.postgresql_pool import get_db_cursor
             from utils.user_cache import invalidate_user_cache
-            from datetime import datetime, timezone, timedelta
-            import json
             
             # Initialize managers
             manager = PersonnelManager()
@@ -1591,121 +1515,116 @@ class PositionSelect(ui.Select):
             if not role_id:
                 return False, f"Подразделение '{self.dept_name}' не настроено (нет role_id)."
             
-            # Get subdivision ID from database by role_id
-            new_subdivision_id = None
-            try:
-                with get_db_cursor() as cursor:
-                    cursor.execute("""
-                        SELECT id FROM subdivisions WHERE role_id = %s
-                    """, (role_id,))
-                    result = cursor.fetchone()
-                    if result:
-                        new_subdivision_id = result['id']
-            except Exception as e:
-                logger.error("Error getting subdivision ID: %s", e)
-            
-            if not new_subdivision_id:
-                return False, f"Подразделение '{self.dept_name}' не найдено в базе данных."
-            
-            # Get personnel ID
-            personnel_id = await manager._get_personnel_id(self.target_user.id)
-            if not personnel_id:
-                return False, "Пользователь не найден в базе данных."
-            
-            # Get current subdivision for history
-            current_subdivision = await manager._get_current_subdivision(personnel_id)
-            
-            # Get current position before any changes for history tracking
-            old_position_name = None
-            try:
-                with get_db_cursor() as cursor:
-                    cursor.execute("""
-                        SELECT pos.name as position_name
-                        FROM personnel p
-                        JOIN employees e ON p.id = e.personnel_id
-                        LEFT JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
-                        LEFT JOIN positions pos ON ps.position_id = pos.id
-                        WHERE p.discord_id = %s AND p.is_dismissal = false
-                    """, (self.target_user.id,))
-                    old_pos_result = cursor.fetchone()
-                    if old_pos_result and old_pos_result['position_name']:
-                        old_position_name = old_pos_result['position_name']
-            except Exception as e:
-                logger.info("Could not get old position for history: %s", e)
-            
-            # Get user's current rank
-            rank_id = await manager._get_user_rank_id(personnel_id)
-            if not rank_id:
-                return False, "Не удалось определить звание пользователя."
-            
-            # Update employee record with new subdivision (clears position)
-            success = await manager._update_employee_subdivision(personnel_id, new_subdivision_id, rank_id)
-            if not success:
-                return False, "Не удалось обновить подразделение пользователя."
-            
-            # Log department transfer to history first
             action_id = 7 if self.action_type == "join" else 8  # 7=join, 8=transfer
+            position_assigned = False
             
-            # Get moderator personnel ID
-            moderator_personnel_id = await manager._get_personnel_id(interaction.user.id)
-            
-            if moderator_personnel_id:
-                # Create history record for department transfer
-                changes = {
-                    "rank": {
-                        "new": None,
-                        "previous": None
-                    },
-                    "position": {
-                        "new": None,  # No position change in department transfer
-                        "previous": None
-                    },
-                    "subdivision": {
-                        "new": self.dept_name,
-                        "previous": await manager._get_subdivision_name(current_subdivision) if current_subdivision else None
-                    }
-                }
+            # Subdivision change, its history and the position change form one transaction
+            with personnel_transaction() as uow:
+                # Get subdivision ID from database by role_id
+                subdivision_result = uow.fetchone("SELECT id FROM subdivisions WHERE role_id = %s", (role_id,))
+                if not subdivision_result:
+                    uow.abort(f"subdivision with role_id {role_id} not found")
+                    return False, f"Подразделение '{self.dept_name}' не найдено в базе данных."
+                new_subdivision_id = subdivision_result['id']
+                
+                # Current employee state (subdivision, position, rank) and moderator personnel ID
+                context = uow.load_context(self.target_user.id, interaction.user.id)
+                personnel_id = context['personnel_id']
+                if not personnel_id:
+                    uow.abort(f"personnel not found for {self.target_user.id}")
+                    return False, "Пользователь не найден в базе данных."
+                
+                current_subdivision = context['subdivision_id']
+                old_position_name = context['position_name']
+                
+                if not context['rank_id']:
+                    uow.abort(f"rank not set for personnel {personnel_id}")
+                    return False, "Не удалось определить звание пользователя."
+                
+                # Update employee record with new subdivision (clears position)
+                uow.execute("""
+                    UPDATE employees 
+                    SET subdivision_id = %s, position_subdivision_id = NULL
+                    WHERE personnel_id = %s;
+                """, (new_subdivision_id, personnel_id))
                 
-                with get_db_cursor() as cursor:
-                    cursor.execute("""
-                        INSERT INTO history (personnel_id, action_id, performed_by, details, changes, action_date)
-                        VALUES (%s, %s, %s, %s, %s, %s);
-                    """, (
+                # Log department transfer to history first
+                moderator_personnel_id = context['moderator_personnel_id']
+                if moderator_personnel_id:
+                    changes = {
+                        "rank": {
+                            "new": None,
+                            "previous": None
+                        },
+                        "position": {
+                            "new": None,  # No position change in department transfer
+                            "previous": None
+                        },
+                        "subdivision": {
+                            "new": self.dept_name,
+                            "previous": context['subdivision_name']
+                        }
+                    }
+                    uow.add_history(
                         personnel_id,
                         action_id,
                         moderator_personnel_id,
-                        f"{'Принят' if self.action_type == 'join' else 'Переведен'} в {self.dept_name}",
-                        json.dumps(changes, ensure_ascii=False),
-                        datetime.now(timezone(timedelta(hours=3)))  # Moscow time
-                    ))
+                        changes,
+                        details=f"{'Принят' if self.action_type == 'join' else 'Переведен'} в {self.dept_name}"
+                    )
+                
+                # Assign position if selected (logs its own history record)
+                if selected_position_id not in ["no_position", "default"] and position_name:
+                    position_context = dict(context, subdivision_id=new_subdivision_id)
+                    position_assigned = _assign_position_in_transaction(
+                        uow, position_context, selected_position_id, position_name, old_position_name
+                    )
+                    logger.info("DEPARTMENT CHANGE: Position assignment result: %s", position_assigned)
+                    if not position_assigned:
+                        return False, f"Не удалось назначить должность **{position_name}** в **{self.dept_name}**. Изменения отменены."
+                
+                # Handle "no_position" selection - log demotion if user had a position before department change
+                elif selected_position_id == "no_position" and old_position_name and moderator_personnel_id:
+                    changes = {
+                        "rank": {
+                            "new": None,
+                            "previous": None
+                        },
+                        "position": {
+                            "new": None,
+                            "previous": old_position_name
+                        },
+                        "subdivision": {
+                            "new": None,  # No subdivision change in position demotion
+                            "previous": None
+                        }
+                    }
+                    uow.add_history(
+                        personnel_id,
+                        6,  # action_id for demotion
+                        moderator_personnel_id,
+                        changes,
+                        details=f"Разжалован с должности '{old_position_name}' при переводе в {self.dept_name}"
+                    )
+            
+            invalidate_user_cache(self.target_user.id)
+            logger.info("CACHE INVALIDATE: Employee subdivision updated for user %s", self.target_user.id)
             
             # Update Discord roles for department change
             try:
                 # Get old department key for role removal
                 old_dept_key = None
                 if current_subdivision:
-                    try:
-                        # Get department config key by subdivision_id
-                        with get_db_cursor() as cursor:
-                            # Get subdivision data
-                            cursor.execute("""
-                                SELECT name, abbreviation, role_id FROM subdivisions WHERE id = %s
-                            """, (current_subdivision,))
-                            sub_result = cursor.fetchone()
-                            
-                            if sub_result:
-                                subdivision_name = sub_result['name']
-                                role_id = sub_result['role_id']
-                                
-                                # Find config key by role_id
-                                for dept_key, dept_config in config.get('departments', {}).items():
-                                    if dept_config.get('role_id') == role_id:
-                                        old_dept_key = dept_key
-                                        break
-                                
-                                logger.info("Determined old department: '%s' (role_id=%s) → '%s'", subdivision_name, role_id, old_dept_key)
-                    except Exception as e:
-                        logger.info("Could not determine old department key: %s", e)
+                    subdivision_name = context['subdivision_name']
+                    old_role_id = context['subdivision_role_id']
+                    
+                    # Find config key by role_id
+                    for dept_key, dept_config in config.get('departments', {}).items():
+                        if dept_config.get('role_id') == old_role_id:
+                            old_dept_key = dept_key
+                            break
+                    
+                    logger.info("Determined old department: '%s' (role_id=%s) → '%s'", subdivision_name, old_role_id, old_dept_key)
                 
                 # Update Discord roles using RoleUtils
                 try:
@@ -1752,7 +1671,8 @@ class PositionSelect(ui.Select):
                         action=await (AuditAction.DEPARTMENT_TRANSFER() if self.action_type == "transfer" else AuditAction.DEPARTMENT_JOIN()),
                         target_user=self.target_user,
                         moderator=interaction.user,
-                        personnel_data=personnel_data
+                        personnel_data=personnel_data,
+                        wait=False
                     )
                     logger.info("Sent department transfer audit notification for %s", full_name)
                 else:
@@ -1779,85 +1699,46 @@ class PositionSelect(ui.Select):
             except Exception as e:
                 logger.error("DEPARTMENT CHANGE NICKNAME ERROR: Не удалось обновить никнейм через nickname_manager: %s", e)
             
-            # Assign position if selected (this will log its own history record)
-            position_assigned = False
-            if selected_position_id not in ["no_position", "default"] and position_name:
-                position_assigned = await assign_position_in_db(
-                    user_member=self.target_user,
-                    position_id=selected_position_id,
-                    position_name=position_name,
-                    moderator_member=interaction.user,
-                    old_position_name=old_position_name
-                )
-                logger.info("DEPARTMENT CHANGE: Position assignment result: %s", position_assigned)
+            # Position was assigned in the transaction above - update its roles
+            if position_assigned:
+                await _sync_position_roles(self.target_user, selected_position_id, interaction.user)
                 
                 # Send separate audit notification for position assignment SECOND
-                if position_assigned:
-                    try:
-                        # Get updated personnel data for position assignment audit
-                        updated_personnel_data = await manager.get_personnel_data_for_audit(self.target_user.id)
-                        if updated_personnel_data:
-                            # Format data for position assignment audit
-                            full_name = f"{updated_personnel_data.get('first_name', '')} {updated_personnel_data.get('last_name', '')}".strip()
-                            if not full_name:
-                                full_name = "Неизвестно"
-                            
-                            position_audit_data = {
-                                'name': full_name,
-                                'static': updated_personnel_data.get('static', ''),
-                                'rank': updated_personnel_data.get('rank_name', 'Неизвестно'),
-                                'department': updated_personnel_data.get('subdivision_name', self.dept_name),  # Use current department from DB
-                                'position': position_name,
-                                'reason': None
-                            }
-                            
-                            await audit_logger.send_personnel_audit(
-                                guild=interaction.guild,
-                                action=await AuditAction.POSITION_ASSIGNMENT(),
-                                target_user=self.target_user,
-                                moderator=interaction.user,
-                                personnel_data=position_audit_data
-                            )
-                            logger.info("Sent position assignment audit notification for %s", full_name)
-                        else:
-                            logger.info("Could not get updated personnel data for position assignment audit")
-                    except Exception as e:
-                        logger.error("Error sending position assignment audit notification: %s", e)
+                try:
+                    # Get updated personnel data for position assignment audit
+                    updated_personnel_data = await manager.get_personnel_data_for_audit(self.target_user.id)
+                    if updated_personnel_data:
+                        # Format data for position assignment audit
+                        full_name = f"{updated_personnel_data.get('first_name', '')} {updated_personnel_data.get('last_name', '')}".strip()
+                        if not full_name:
+                            full_name = "Неизвестно"
+                        
+                        position_audit_data = {
+                            'name': full_name,
+                            'static': updated_personnel_data.get('static', ''),
+                            'rank': updated_personnel_data.get('rank_name', 'Неизвестно'),
+                            'department': updated_personnel_data.get('subdivision_name', self.dept_name),  # Use current department from DB
+                            'position': position_name,
+                            'reason': None
+                        }
+                        
+                        await audit_logger.send_personnel_audit(
+                            guild=interaction.guild,
+                            action=await AuditAction.POSITION_ASSIGNMENT(),
+                            target_user=self.target_user,
+                            moderator=interaction.user,
+                            personnel_data=position_audit_data,
+                            wait=False
+                        )
+                        logger.info("Sent position assignment audit notification for %s", full_name)
+                    else:
+                        logger.info("Could not get updated personnel data for position assignment audit")
+                except Exception as e:
+                    logger.error("Error sending position assignment audit notification: %s", e)
             
             # Handle "no_position" selection - check if user had a position before department change
             elif selected_position_id == "no_position" and old_position_name:
-                logger.info("DEPARTMENT CHANGE: User had position '%s' before transfer, logging demotion", old_position_name)
-                
-                # Create history record for position demotion (action_id = 6)
-                moderator_personnel_id = await manager._get_personnel_id(interaction.user.id)
-                if moderator_personnel_id:
-                    changes = {
-                        "rank": {
-                            "new": None,
-                            "previous": None
-                        },
-                        "position": {
-                            "new": None,
-                            "previous": old_position_name
-                        },
-                        "subdivision": {
-                            "new": None,  # No subdivision change in position demotion
-                            "previous": None
-                        }
-                    }
-                    
-                    with get_db_cursor() as cursor:
-                        cursor.execute("""
-                            INSERT INTO history (personnel_id, action_id, performed_by, details, changes, action_date)
-                            VALUES (%s, %s, %s, %s, %s, %s);
-                        """, (
-                            personnel_id,
-                            6,  # action_id for demotion
-                            moderator_personnel_id,
-                            f"Разжалован с должности '{old_position_name}' при переводе в {self.dept_name}",
-                            json.dumps(changes, ensure_ascii=False),
-                            datetime.now(timezone(timedelta(hours=3)))  # Moscow time
-                        ))
+                logger.info("DEPARTMENT CHANGE: User had position '%s' before transfer, demotion logged", old_position_name)
                 
                 # Send audit notification for position demotion SECOND
                 try:
@@ -1883,7 +1764,8 @@ class PositionSelect(ui.Select):
                             action=await AuditAction.POSITION_DEMOTION(),
                             target_user=self.target_user,
                             moderator=interaction.user,
-                            personnel_data=demotion_audit_data
+                            personnel_data=demotion_audit_data,
+                            wait=False
                         )
                         logger.info("Sent position demotion audit notification for %s (position: %s)", full_name, old_position_name)
                     else:
@@ -2203,7 +2085,8 @@ class PositionOnlySelect(ui.Select):
                     target_user=self.target_user,
                     moderator=interaction.user,
                     personnel_data=personnel_data,
-                    config=config
+                    config=config,
+                    wait=False
                 )
                 
             except Exception as audit_error:
@@ -2245,56 +2128,31 @@ class PositionOnlySelect(ui.Select):
     async def _remove_position_from_db_standalone(self, user_discord_id: int, position_name: str, moderator_discord_id: int) -> bool:
         """Remove position from user in database (standalone version)"""
         try:
-            from utils.postgresql_pool import get_db_cursor
-            from datetime import datetime, timezone, timedelta
+            from utils.database_manager import personnel_transaction
             from utils.user_cache import invalidate_user_cache
-            import json
             
-            # Get old position ID for role updates
-            old_position_id = None
-            user_member = None
-            try:
-                # Get user as member for role updates
-                if hasattr(self, 'target_user'):
-                    user_member = self.target_user
-                
-                # Get old position
-                with get_db_cursor() as cursor:
-                    cursor.execute("""
-                        SELECT ps.position_id 
-                        FROM personnel p
-                        JOIN employees e ON p.id = e.personnel_id
-                        LEFT JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
-                        WHERE p.discord_id = %s AND p.is_dismissal = false
-                    """, (user_discord_id,))
-                    old_pos_result = cursor.fetchone()
-                    if old_pos_result and old_pos_result['position_id']:
-                        old_position_id = old_pos_result['position_id']
-            except Exception as e:
-                logger.warning("Warning: Could not get old position for role update: %s", e)
+            # Get user as member for role updates
+            user_member = self.target_user if hasattr(self, 'target_user') else None
             
-            with get_db_cursor() as cursor:
-                # Get personnel ID
-                cursor.execute("SELECT id FROM personnel WHERE discord_id = %s AND is_dismissal = false;", (user_discord_id,))
-                personnel_result = cursor.fetchone()
-                if not personnel_result:
+            # Position clearing and history in one transaction
+            with personnel_transaction() as uow:
+                context = uow.load_context(user_discord_id, moderator_discord_id)
+                personnel_id = context['personnel_id']
+                if not personnel_id:
+                    uow.abort(f"personnel not found for {user_discord_id}")
+                    return False
+                moderator_personnel_id = context['moderator_personnel_id']
+                if not moderator_personnel_id:
+                    uow.abort(f"moderator not found for {moderator_discord_id}")
                     return False
-                personnel_id = personnel_result['id']
                 
                 # Clear position_subdivision_id in employees
-                cursor.execute("""
+                uow.execute("""
                     UPDATE employees 
                     SET position_subdivision_id = NULL
                     WHERE personnel_id = %s;
                 """, (personnel_id,))
                 
-                # Get moderator personnel ID for history
-                cursor.execute("SELECT id FROM personnel WHERE discord_id = %s;", (moderator_discord_id,))
-                moderator_result = cursor.fetchone()
-                if not moderator_result:
-                    return False
-                moderator_personnel_id = moderator_result['id']
-                
                 # Create history record for position demotion (action_id = 6)
                 changes = {
                     "rank": {
@@ -2310,48 +2168,37 @@ class PositionOnlySelect(ui.Select):
                         "previous": None
                     }
                 }
-                
-                cursor.execute("""
-                    INSERT INTO history (personnel_id, action_id, performed_by, details, changes, action_date)
-                    VALUES (%s, %s, %s, %s, %s, %s);
-                """, (
-                    personnel_id,
-                    6,  # Position demotion action_id
-                    moderator_personnel_id,
-                    None,  # details = NULL
-                    json.dumps(changes, ensure_ascii=False),
-                    datetime.now(timezone(timedelta(hours=3)))  # Moscow time
-                ))
-                
-                # Update Discord roles using RoleUtils after position removal
-                if user_member:
+                uow.add_history(personnel_id, 6, moderator_personnel_id, changes)
+            
+            # Update Discord roles using RoleUtils after position removal
+            if user_member:
+                try:
+                    # Refresh member object to get current roles from Discord API
                     try:
-                        # Refresh member object to get current roles from Discord API
-                        try:
-                            user_member = await user_member.guild.fetch_member(user_member.id)
-                            logger.info("🔄 Refreshed member object before removing position roles")
-                        except Exception as fetch_error:
-                            logger.warning("Could not refresh member: %s", fetch_error)
-                        
-                        # Remove all position roles via smart updater
-                        from utils.role_utils import role_utils
-                        await role_utils.smart_update_user_position_roles(
-                            user_member.guild,
-                            user_member,
-                            None,
-                            None
-                        )
-                        logger.info(f"Position roles removed for {user_member.display_name}")
-                    except Exception as role_error:
-                        logger.error("Warning: Failed to remove position role: %s", role_error)
+                        user_member = await user_member.guild.fetch_member(user_member.id)
+                        logger.info("🔄 Refreshed member object before removing position roles")
+                    except Exception as fetch_error:
+                        logger.warning("Could not refresh member: %s", fetch_error)
+                    
+                    # Remove all position roles via smart updater
+                    from utils.role_utils import role_utils
+                    await role_utils.smart_update_user_position_roles(
+                        user_member.guild,
+                        user_member,
+                        None,
+                        None
+                    )
+                    logger.info(f"Position roles removed for {user_member.display_name}")
+                except Exception as role_error:
+                    logger.error("Warning: Failed to remove position role: %s", role_error)
 
-                try:
-                    invalidate_user_cache(user_discord_id)
-                    logger.info("POSITION REMOVE: Инвалидация кэша для пользователя %s", user_discord_id)
-                except Exception as cache_error:
-                    logger.error("POSITION REMOVE: Ошибка при попытке инвалидации кэша: %s", cache_error)
-                
-                return True
+            try:
+                invalidate_user_cache(user_discord_id)
+                logger.info("POSITION REMOVE: Инвалидация кэша для пользователя %s", user_discord_id)
+            except Exception as cache_error:
+                logger.error("POSITION REMOVE: Ошибка при попытке инвалидации кэша: %s", cache_error)
+            
+            return True
                 
         except Exception as e:
             logger.error("Error in _remove_position_from_db_standalone: %s", e)
@@ -2495,7 +2342,8 @@ class PositionOnlySelect(ui.Select):
                     target_user=self.target_user,
                     moderator=interaction.user,
                     personnel_data=personnel_data,
-                    config=config
+                    config=config,
+                    wait=False
                 )
                 
             except Exception as audit_error:
@@ -2512,143 +2360,116 @@ class PositionOnlySelect(ui.Select):
             logger.error("Error in position assignment: %s", e)
             await interaction.followup.send(f" **Ошибка:** {str(e)}", ephemeral=True)
     
+def _assign_position_in_transaction(uow, context: dict, position_id: str, position_name: str, old_position_name: str | None = None) -> bool:
+    """Назначение должности в рамках кадровой операции (uow).
+
+    Использует подразделение из context['subdivision_id']; при ошибке отменяет всю операцию.
+    """
+    personnel_id = context['personnel_id']
+
+    # Текущее подразделение пользователя
+    subdivision_id = context['subdivision_id']
+    if not subdivision_id:
+        uow.abort(f"subdivision not set for personnel {personnel_id}")
+        return False
+
+    moderator_personnel_id = context['moderator_personnel_id']
+    if not moderator_personnel_id:
+        uow.abort("moderator not found in personnel")
+        return False
+
+    # Берём связку position_subdivision
+    ps_result = uow.fetchone(
+        """
+        SELECT ps.id FROM position_subdivision ps
+        WHERE ps.subdivision_id = %s AND ps.position_id = %s
+        LIMIT 1;
+        """,
+        (subdivision_id, position_id)
+    )
+    if not ps_result:
+        uow.abort(f"position {position_id} is not available in subdivision {subdivision_id}")
+        return False
+
+    # Обновляем должность сотрудника
+    uow.execute(
+        """
+        UPDATE employees
+        SET position_subdivision_id = %s
+        WHERE personnel_id = %s;
+        """,
+        (ps_result['id'], personnel_id)
+    )
+
+    # Пишем историю (action_id = 5 — назначение должности)
+    changes = {
+        "rank": {"new": None, "previous": None},
+        "position": {"new": position_name, "previous": old_position_name},
+        "subdivision": {"new": None, "previous": None},
+    }
+    uow.add_history(personnel_id, 5, moderator_personnel_id, changes)
+    return True
+
+
+async def _sync_position_roles(user_member: discord.Member, position_id: str, moderator_member: discord.Member):
+    """Обновить роли должности после фиксации назначения в БД"""
+    try:
+        # Refresh member object to get current roles from Discord API
+        try:
+            user_member = await user_member.guild.fetch_member(user_member.id)
+            logger.info("🔄 Refreshed member object before assigning position roles")
+        except Exception as fetch_error:
+            logger.warning("Could not refresh member: %s", fetch_error)
+        
+        from utils.role_utils import role_utils
+        new_position_id_int = int(position_id) if isinstance(position_id, (int, str)) and str(position_id).isdigit() else None
+        
+        logger.info("POSITION ROLES DEBUG: position_id=%s, type=%s, int_value=%s", position_id, type(position_id), new_position_id_int)
+        
+        # Используем smart_update для корректного назначения ролей
+        success = await role_utils.smart_update_user_position_roles(
+            user_member.guild,
+            user_member,
+            new_position_id_int,
+            moderator_member
+        )
+        
+        if success:
+            logger.info("POSITION ROLES: Обновлены роли должности для %s (position_id=%s)", user_member.display_name, new_position_id_int)
+        else:
+            logger.warning("POSITION ROLES: Не удалось обновить роли для %s", user_member.display_name)
+    except Exception as role_err:
+        logger.error("POSITION ROLES ERROR: %s", role_err)
+        import traceback
+        traceback.print_exc()
+
+
 async def assign_position_in_db(user_member: discord.Member, position_id: str, position_name: str, moderator_member: discord.Member, old_position_name: str | None = None) -> bool:
     """Общая логика назначения должности в БД и обновления ролей.
     Используется как при переводе в подразделение, так и при отдельном назначении должности.
     """
     try:
-        from utils.postgresql_pool import get_db_cursor
-        from datetime import datetime, timezone, timedelta
+        from utils.database_manager import personnel_transaction
         from utils.user_cache import invalidate_user_cache
-        import json
 
         user_discord_id = user_member.id
-        moderator_discord_id = moderator_member.id
 
-        # Получаем прошлую должность, если не передана
-        if old_position_name is None:
-            with get_db_cursor() as cursor:
-                cursor.execute(
-                    """
-                    SELECT pos.name as position_name
-                    FROM personnel p
-                    JOIN employees e ON p.id = e.personnel_id
-                    LEFT JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
-                    LEFT JOIN positions pos ON ps.position_id = pos.id
-                    WHERE p.discord_id = %s AND p.is_dismissal = false
-                    """,
-                    (user_discord_id,)
-                )
-                old_pos_result = cursor.fetchone()
-                if old_pos_result and old_pos_result.get('position_name'):
-                    old_position_name = old_pos_result['position_name']
-
-        with get_db_cursor() as cursor:
-            # Ищем personnel_id пользователя
-            cursor.execute("SELECT id FROM personnel WHERE discord_id = %s AND is_dismissal = false;", (user_discord_id,))
-            personnel_result = cursor.fetchone()
-            if not personnel_result:
+        # Поиск, обновление должности и история - одной транзакцией
+        with personnel_transaction() as uow:
+            context = uow.load_context(user_discord_id, moderator_member.id)
+            if not context['personnel_id']:
+                uow.abort(f"personnel not found for {user_discord_id}")
                 return False
-            personnel_id = personnel_result['id']
 
-            # Определяем текущий subdivision пользователя и позицию для него
-            cursor.execute(
-                """
-                SELECT e.subdivision_id
-                FROM employees e
-                WHERE e.personnel_id = %s
-                LIMIT 1;
-                """,
-                (personnel_id,)
-            )
-            emp_sub_result = cursor.fetchone()
-            if not emp_sub_result or not emp_sub_result.get('subdivision_id'):
-                return False
-            subdivision_id = emp_sub_result['subdivision_id']
-
-            # Берём связку position_subdivision
-            cursor.execute(
-                """
-                SELECT ps.id FROM position_subdivision ps
-                WHERE ps.subdivision_id = %s AND ps.position_id = %s
-                LIMIT 1;
-                """,
-                (subdivision_id, position_id)
-            )
-            ps_result = cursor.fetchone()
-            if not ps_result:
-                return False
-            position_subdivision_id = ps_result['id']
-
-            # Обновляем должность сотрудника
-            cursor.execute(
-                """
-                UPDATE employees
-                SET position_subdivision_id = %s
-                WHERE personnel_id = %s;
-                """,
-                (position_subdivision_id, personnel_id)
-            )
+            # Прошлая должность, если не передана
+            if old_position_name is None:
+                old_position_name = context['position_name']
 
-            # Получаем personnel_id модератора для истории
-            cursor.execute("SELECT id FROM personnel WHERE discord_id = %s;", (moderator_discord_id,))
-            moderator_result = cursor.fetchone()
-            if not moderator_result:
+            if not _assign_position_in_transaction(uow, context, position_id, position_name, old_position_name):
                 return False
-            moderator_personnel_id = moderator_result['id']
-
-            # Пишем историю (action_id = 5 — назначение должности)
-            changes = {
-                "rank": {"new": None, "previous": None},
-                "position": {"new": position_name, "previous": old_position_name},
-                "subdivision": {"new": None, "previous": None},
-            }
-
-            cursor.execute(
-                """
-                INSERT INTO history (personnel_id, action_id, performed_by, details, changes, action_date)
-                VALUES (%s, %s, %s, %s, %s, %s);
-                """,
-                (
-                    personnel_id,
-                    5,
-                    moderator_personnel_id,
-                    None,
-                    json.dumps(changes, ensure_ascii=False),
-                    datetime.now(timezone(timedelta(hours=3))),
-                ),
-            )
 
         # Обновляем роли должности через умную систему позиций
-        try:
-            # Refresh member object to get current roles from Discord API
-            try:
-                user_member = await user_member.guild.fetch_member(user_member.id)
-                logger.info("🔄 Refreshed member object before assigning position roles")
-            except Exception as fetch_error:
-                logger.warning("Could not refresh member: %s", fetch_error)
-            
-            from utils.role_utils import role_utils
-            new_position_id_int = int(position_id) if isinstance(position_id, (int, str)) and str(position_id).isdigit() else None
-            
-            logger.info("POSITION ROLES DEBUG: position_id=%s, type=%s, int_value=%s", position_id, type(position_id), new_position_id_int)
-            
-            # Используем smart_update для корректного назначения ролей
-            success = await role_utils.smart_update_user_position_roles(
-                user_member.guild,
-                user_member,
-                new_position_id_int,
-                moderator_member
-            )
-            
-            if success:
-                logger.info("POSITION ROLES: Обновлены роли должности для %s (position_id=%s)", user_member.display_name, new_position_id_int)
-            else:
-                logger.warning("POSITION ROLES: Не удалось обновить роли для %s", user_member.display_name)
-        except Exception as role_err:
-            logger.error("POSITION ROLES ERROR: %s", role_err)
-            import traceback
-            traceback.print_exc()
+        await _sync_position_roles(user_member, position_id, moderator_member)
 
         try:
             invalidate_user_cache(user_discord_id)
@@ -2841,7 +2662,8 @@ class RankChangeView(ui.View):
                     target_user=self.target_user,
                     moderator=interaction.user,
                     personnel_data=personnel_data,
-                    config=config
+                    config=config,
+                    wait=False
                 )
                 
             except Exception as audit_error:
@@ -2936,47 +2758,35 @@ class RankChangeView(ui.View):
     async def _change_rank_in_db(self, user_discord_id: int, new_rank: str, moderator_discord_id: int, action_id: int) -> bool:
         """Change user's rank in database and create history record"""
         try:
-            from utils.postgresql_pool import get_db_cursor
-            from datetime import datetime, timezone, timedelta
-            
-            with get_db_cursor() as cursor:
-                # Get personnel ID and current rank
-                cursor.execute("""
-                    SELECT p.id, r.name as current_rank 
-                    FROM personnel p
-                    JOIN employees e ON p.id = e.personnel_id
-                    JOIN ranks r ON e.rank_id = r.id
-                    WHERE p.discord_id = %s AND p.is_dismissal = false;
-                """, (user_discord_id,))
-                personnel_result = cursor.fetchone()
-                if not personnel_result:
+            from utils.database_manager import personnel_transaction
+            
+            with personnel_transaction() as uow:
+                # Get personnel ID, current rank and moderator personnel ID
+                context = uow.load_context(user_discord_id, moderator_discord_id)
+                personnel_id = context['personnel_id']
+                if not personnel_id or not context['rank_name']:
+                    uow.abort(f"personnel with rank not found for {user_discord_id}")
+                    return False
+                previous_rank = context['rank_name']
+                moderator_personnel_id = context['moderator_personnel_id']
+                if not moderator_personnel_id:
+                    uow.abort(f"moderator not found for {moderator_discord_id}")
                     return False
-                personnel_id = personnel_result['id']
-                previous_rank = personnel_result['current_rank']
                 
                 # Get new rank ID
-                cursor.execute("SELECT id FROM ranks WHERE name = %s;", (new_rank,))
-                rank_result = cursor.fetchone()
+                rank_result = uow.fetchone("SELECT id FROM ranks WHERE name = %s;", (new_rank,))
                 if not rank_result:
+                    uow.abort(f"rank '{new_rank}' not found")
                     return False
-                new_rank_id = rank_result['id']
                 
                 # Update employee with new rank
-                cursor.execute("""
+                uow.execute("""
                     UPDATE employees 
                     SET rank_id = %s
                     WHERE personnel_id = %s;
-                """, (new_rank_id, personnel_id))
-                
-                # Get moderator personnel ID for history
-                cursor.execute("SELECT id FROM personnel WHERE discord_id = %s;", (moderator_discord_id,))
-                moderator_result = cursor.fetchone()
-                if not moderator_result:
-                    return False
-                moderator_personnel_id = moderator_result['id']
+                """, (rank_result['id'], personnel_id))
                 
                 # Create history record with previous rank
-                import json
                 changes = {
                     "rank": {
                         "new": new_rank,
@@ -2991,20 +2801,9 @@ class RankChangeView(ui.View):
                         "previous": None
                     }
                 }
-                
-                cursor.execute("""
-                    INSERT INTO history (personnel_id, action_id, performed_by, details, changes, action_date)
-                    VALUES (%s, %s, %s, %s, %s, %s);
-                """, (
-                    personnel_id,
-                    action_id,
-                    moderator_personnel_id,
-                    None,  # details = NULL
-                    json.dumps(changes, ensure_ascii=False),
-                    datetime.now(timezone(timedelta(hours=3)))  # Moscow time
-                ))
-                
-                return True
+                uow.add_history(personnel_id, action_id, moderator_personnel_id, changes)
+            
+            return True
                 
         except Exception as e:
             logger.error("Error in _change_rank_in_db: %s", e)
@@ -3052,7 +2851,7 @@ class RankSelect(ui.Select):
         
         # Determine if this is promotion or demotion
         try:
-            from utils.postgresql_pool import get_db_cursor
+            from utils.database_manager import rank_manager
             
             # Get CURRENT rank from database
             current_rank_from_db = await get_user_rank_from_db(self.target_user.id)
@@ -3060,19 +2859,15 @@ class RankSelect(ui.Select):
                 logger.warning(f"Warning: Could not get current rank for {self.target_user.display_name}")
                 is_promotion = True  # Default to promotion
             else:
-                with get_db_cursor() as cursor:
-                    # Get current rank level
-                    cursor.execute("SELECT rank_level FROM ranks WHERE name = %s;", (current_rank_from_db,))
-                    current_result = cursor.fetchone()
-                    current_level = current_result['rank_level'] if current_result else 1
-                    
-                    # Get new rank level  
-                    cursor.execute("SELECT rank_level FROM ranks WHERE name = %s;", (selected_rank,))
-                    new_result = cursor.fetchone()
-                    new_level = new_result['rank_level'] if new_result else 1
-                    
-                    is_promotion = new_level > current_level
-                    logger.info("Rank comparison: %s(level %s) -> %s(level %s) = %s", current_rank_from_db, current_level, selected_rank, new_level, 'повышение' if is_promotion else 'понижение')
+                # Rank levels come from the in-memory rank index
+                current_result = rank_manager.get_rank_by_name(current_rank_from_db)
+                current_level = current_result['rank_level'] if current_result else 1
+                
+                new_result = rank_manager.get_rank_by_name(selected_rank)
+                new_level = new_result['rank_level'] if new_result else 1
+                
+                is_promotion = new_level > current_level
+                logger.info("Rank comparison: %s(level %s) -> %s(level %s) = %s", current_rank_from_db, current_level, selected_rank, new_level, 'повышение' if is_promotion else 'понижение')
                 
         except Exception as e:
             logger.error("Error determining rank change type: %s", e)
@@ -3568,6 +3363,10 @@ class RecruitmentStaticConflictView(ui.View):
                     self.target_user.id,
                     self.new_static
                 )
+
+            # Запись ЧС по этому static теперь относится к новому Discord ID
+            from utils.database_manager import personnel_manager
+            personnel_manager.invalidate_blacklist_cache(static=self.new_static, discord_id=self.target_user.id)
             
             # Now proceed with recruitment process
             # Parse name parts
@@ -3633,7 +3432,8 @@ class RecruitmentStaticConflictView(ui.View):
                         target_user=self.target_user,
                         moderator=interaction.user,
                         personnel_data=personnel_data,
-                        config=config
+                        config=config,
+                        wait=False
                     )
                     logger.info("RECRUITMENT: Audit notification sent")
                 except Exception as audit_error:
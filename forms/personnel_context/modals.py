@@ -996,7 +996,8 @@ class PersonalDataModal(ui.Modal, title="Изменить личные данн
                                 action=audit_action,
                                 target_user=self.target_user,
                                 moderator=interaction.user,
-                                personnel_data=audit_data
+                                personnel_data=audit_data,
+                                wait=False
                             )
                             
                             logger.info("Audit notification sent for name change: %s %s", first_name, last_name)
@@ -914,7 +914,8 @@ class RoleApplicationApprovalView(ui.View):
                         target_user=user,
                         moderator=moderator_user,
                         personnel_data=personnel_data,
-                        config=config
+                        config=config,
+                        wait=False
                     )
         except Exception as e:
             logger.error("Warning: Error in auto processing with auth: %s", e)
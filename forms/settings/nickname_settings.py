@@ -1,11 +1,15 @@
 """
 Nickname auto-replacement settings configuration
 """
+import time
 import discord
 from discord import ui
 from utils.config_manager import load_config, save_config
 from .base import BaseSettingsView, SectionSettingsView
 from utils.department_manager import DepartmentManager
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
 
 
 class NicknameBaseView(BaseSettingsView):
@@ -64,6 +68,12 @@ class NicknameSettingsSelect(ui.Select):
                 description="Настройка поддержки различных форматов никнеймов",
                 emoji="🔠",
                 value="format_settings"
+            ),
+            discord.SelectOption(
+                label="Сверка никнеймов",
+                description="Проверить и исправить никнеймы всех сотрудников",
+                emoji="🔄",
+                value="reconciliation"
             )
             #discord.SelectOption(
             #    label="Редактор шаблонов",
@@ -96,6 +106,8 @@ class NicknameSettingsSelect(ui.Select):
             await self.show_format_settings(interaction)
         elif selected_option == "template_editor":
             await self.show_template_editor(interaction)
+        elif selected_option == "reconciliation":
+            await self.show_reconciliation(interaction)
     
     async def show_global_settings(self, interaction: discord.Interaction):
         """Show global nickname replacement settings"""
@@ -295,6 +307,38 @@ class NicknameSettingsSelect(ui.Select):
         view = PositionsManagementView()
         await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
+    async def show_reconciliation(self, interaction: discord.Interaction):
+        """Show bulk nickname reconciliation interface"""
+        embed = discord.Embed(
+            title="🔄 Сверка никнеймов",
+            description="Сравнение никнеймов всех действующих сотрудников с шаблоном по данным из базы.",
+            color=discord.Color.blue(),
+            timestamp=discord.utils.utcnow()
+        )
+        
+        embed.add_field(
+            name="ℹ️ Режимы:",
+            value=(
+                "• **Проверить** - отчёт о расхождениях без изменений\n"
+                "• **Применить** - исправить никнеймы; изменения идут в фоне "
+                "и не задерживают кадровые операции"
+            ),
+            inline=False
+        )
+        
+        embed.add_field(
+            name="⏭️ Не изменяются:",
+            value=(
+                "• Особые и должностные никнеймы\n"
+                "• Подразделения с отключённой автозаменой\n"
+                "• Участники с ролью выше роли бота"
+            ),
+            inline=False
+        )
+        
+        view = NicknameReconciliationView()
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+
     async def show_template_editor(self, interaction: discord.Interaction):
         """Show template editor interface"""
         embed = discord.Embed(
@@ -733,6 +777,72 @@ class PositionsManagementView(NicknameBaseView):
         self.add_item(PositionsManagementSelect())
 
 
+class NicknameReconciliationView(NicknameBaseView):
+    """View for bulk nickname reconciliation"""
+    
+    def __init__(self):
+        super().__init__()
+        self.add_item(ReconciliationButton(apply=False))
+        self.add_item(ReconciliationButton(apply=True))
+
+
+class ReconciliationButton(ui.Button):
+    """Button to run nickname reconciliation (dry-run or apply)"""
+    
+    PROGRESS_EDIT_INTERVAL = 5.0
+    
+    def __init__(self, apply: bool):
+        super().__init__(
+            label="Применить" if apply else "Проверить",
+            style=discord.ButtonStyle.danger if apply else discord.ButtonStyle.primary,
+            emoji="✅" if apply else "🔍",
+            custom_id="nickname_reconcile_apply" if apply else "nickname_reconcile_preview"
+        )
+        self.apply = apply
+    
+    async def callback(self, interaction: discord.Interaction):
+        from utils.nickname_reconciliation import nickname_reconciler
+        
+        if nickname_reconciler.is_running(interaction.guild.id):
+            await interaction.response.send_message(
+                "⏳ Сверка никнеймов уже выполняется, дождитесь её завершения.", ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        last_edit = 0.0
+        
+        async def on_progress(stage: str, done: int, total: int):
+            nonlocal last_edit
+            now = time.monotonic()
+            if now - last_edit < self.PROGRESS_EDIT_INTERVAL:
+                return
+            last_edit = now
+            text = f"🔍 Проверено сотрудников: {done}" if stage == 'scan' else f"✏️ Изменено никнеймов: {done}/{total}"
+            try:
+                await interaction.edit_original_response(content=text)
+            except discord.HTTPException:
+                pass
+        
+        try:
+            report = await nickname_reconciler.run(interaction.guild, apply=self.apply, progress_callback=on_progress)
+        except Exception as e:
+            logger.error("Ошибка сверки никнеймов: %s", e)
+            await interaction.edit_original_response(content=f"❌ Ошибка сверки никнеймов: {e}")
+            return
+        
+        embed = nickname_reconciler.build_report_embed(report)
+        try:
+            await interaction.edit_original_response(content=None, embed=embed)
+            if report['changes'] or report['skipped']:
+                await interaction.followup.send(
+                    file=nickname_reconciler.build_report_file(report), ephemeral=True
+                )
+        except discord.HTTPException as e:
+            # Токен взаимодействия живёт 15 минут - длинное применение может его пережить
+            logger.warning("Не удалось отправить отчёт сверки никнеймов: %s", e)
+
+
 class TemplateEditorView(NicknameBaseView):
     """View for template editing selection"""
     
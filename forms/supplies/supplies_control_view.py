@@ -3,6 +3,7 @@ from utils.config_manager import load_config
 from utils.message_manager import get_supplies_message, get_supplies_color, get_message
 from datetime import datetime
 from utils.logging_setup import get_logger
+from utils.message_edit_cache import message_edit_cache
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -228,7 +229,8 @@ class SuppliesControlView(discord.ui.View):
                 )
                 embeds = [main_embed, timer_embed]
             
-            await message.edit(embeds=embeds, view=self)
+            # Через кэш: восстановление (utils/supplies_restore.py) редактирует это же сообщение
+            await message_edit_cache.edit_if_changed(message, embeds=embeds, view=self)
             
         except Exception as e:
             logger.warning("Ошибка при обновлении информации о таймерах: %s", e)
@@ -308,8 +310,8 @@ class SuppliesControlView(discord.ui.View):
             from utils.supplies_scheduler import get_supplies_scheduler
             scheduler = get_supplies_scheduler()
             if scheduler:
-                # Принудительно проверяем таймеры при изменении
-                await scheduler._check_timers()
+                # Будим планировщик - он обработает изменения без ожидания следующего дедлайна
+                scheduler.wake()
         except Exception as e:
             logger.warning("Ошибка уведомления планировщика: %s", e)
 
@@ -1,3 +1,5 @@
+import asyncio
+import copy
 import json
 import os
 import discord
@@ -5,19 +7,105 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional, Any
 from utils.config_manager import load_config
 from utils.message_manager import get_supplies_message
+from utils.message_edit_cache import message_edit_cache
 from utils.logging_setup import get_logger
 
 # Initialize logger
 logger = get_logger(__name__)
 
 
+class SuppliesTimerStore:
+    """
+    Состояние таймеров поставок в памяти
+
+    Память - источник истины: чтение не обращается к диску. Изменения сохраняются
+    отложенным снимком (не чаще раза в SNAPSHOT_DELAY секунд) через временный файл
+    и атомарную замену, поэтому сбой во время записи не портит файл таймеров.
+    """
+    
+    SNAPSHOT_DELAY = 1.0
+    
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+        self._data: Optional[Dict[str, Any]] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+    
+    def _ensure_loaded(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = {"active_timers": {}}
+            if os.path.exists(self.data_file):
+                try:
+                    with open(self.data_file, 'r', encoding='utf-8') as f:
+                        self._data = json.load(f)
+                    self._data.setdefault("active_timers", {})
+                except Exception as e:
+                    logger.error("Ошибка загрузки снимка таймеров поставок %s: %s", self.data_file, e)
+            else:
+                self.flush()
+        return self._data
+    
+    def get(self) -> Dict[str, Any]:
+        """Копия состояния (вызывающий код может изменять её и передавать в set)"""
+        return copy.deepcopy(self._ensure_loaded())
+    
+    def set(self, data: Dict[str, Any]):
+        """Заменить состояние и запланировать сохранение снимка"""
+        self._data = copy.deepcopy(data)
+        self._schedule_flush()
+    
+    def _schedule_flush(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне event loop (скрипты, тесты) - сохраняем сразу
+            self.flush()
+            return
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.SNAPSHOT_DELAY, self.flush)
+    
+    def flush(self):
+        """Записать снимок состояния на диск"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._data is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.data_file) or ".", exist_ok=True)
+            tmp_path = f"{self.data_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.data_file)
+        except Exception as e:
+            logger.error("%s", get_supplies_message(0, "templates.errors.processing").format(object="сохранения данных поставок", error=e))
+
+
+# Хранилища таймеров по пути файла: все экземпляры SuppliesManager работают с одним состоянием
+_timer_stores: Dict[str, SuppliesTimerStore] = {}
+
+
+def get_timer_store(data_file: str) -> SuppliesTimerStore:
+    store = _timer_stores.get(data_file)
+    if store is None:
+        store = _timer_stores[data_file] = SuppliesTimerStore(data_file)
+    return store
+
+
+def flush_timer_stores():
+    """Сохранить отложенные изменения таймеров (при завершении работы)"""
+    for store in _timer_stores.values():
+        store.flush()
+
+
 class SuppliesManager:
     """Менеджер для управления таймерами поставок"""
     
     def __init__(self, bot=None):
         self.bot = bot
         self.data_file = "data/supplies_timers.json"
-        self._ensure_data_file()
+        self._store = get_timer_store(self.data_file)
         
         # Объекты поставок по категориям (каждая категория = ряд кнопок)
         self.categories = {
@@ -66,33 +154,13 @@ class SuppliesManager:
         for category_key, category_objects in self.categories.items():
             self.objects.update(category_objects)
     
-    def _ensure_data_file(self):
-        """Создает файл данных если его нет"""
-        os.makedirs("data", exist_ok=True)
-        
-        if not os.path.exists(self.data_file):
-            initial_data = {
-                "active_timers": {}
-            }
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(initial_data, f, ensure_ascii=False, indent=2)
-    
     def _load_data(self) -> Dict[str, Any]:
-        """Загружает данные из файла"""
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error("%s", get_supplies_message(0, "templates.errors.processing").format(object="загрузки данных поставок", error=e))
-            return {"active_timers": {}}
+        """Возвращает копию состояния таймеров (без чтения файла)"""
+        return self._store.get()
     
     def _save_data(self, data: Dict[str, Any]):
-        """Сохраняет данные в файл"""
-        try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error("%s", get_supplies_message(0, "templates.errors.processing").format(object="сохранения данных поставок", error=e))
+        """Сохраняет состояние таймеров (снимок на диск записывается отложенно)"""
+        self._store.set(data)
     
     def get_categories(self) -> Dict[str, Dict[str, Dict[str, str]]]:
         """Возвращает все категории с объектами"""
@@ -176,6 +244,7 @@ class SuppliesManager:
             else:
                 duration_str = f"{remaining_minutes}м"
             
+            self._wake_scheduler()
             return True
             
         except Exception as e:
@@ -262,6 +331,31 @@ class SuppliesManager:
             logger.error("%s", get_supplies_message(0, "templates.errors.processing").format(object="получения активных таймеров", error=e))
             return {}
     
+    def cancel_timer(self, object_key: str) -> bool:
+        """Удаляет таймер объекта без удаления сообщений"""
+        try:
+            data = self._load_data()
+            active_timers = data.get("active_timers", {})
+            
+            if object_key not in active_timers:
+                return False
+            
+            del active_timers[object_key]
+            self._save_data(data)
+            self._wake_scheduler()
+            return True
+            
+        except Exception as e:
+            logger.error("%s", get_supplies_message(0, "templates.errors.processing").format(object=f"отмены таймера для {object_key}", error=e))
+            return False
+    
+    def _wake_scheduler(self):
+        """Будит планировщик, чтобы он пересчитал ближайший дедлайн"""
+        from utils.supplies_scheduler import get_supplies_scheduler
+        scheduler = get_supplies_scheduler()
+        if scheduler:
+            scheduler.wake()
+    
     async def cancel_timer_with_cleanup(self, object_key: str) -> bool:
         """Отменяет таймер для объекта и удаляет все связанные сообщения"""
         try:
@@ -281,6 +375,7 @@ class SuppliesManager:
             if object_key in active_timers:
                 del active_timers[object_key]
                 self._save_data(data)
+                self._wake_scheduler()
                 logger.info(f"{get_supplies_message(0, 'templates.status.completed')} Таймер для {object_key} отменен")
                 return True
             else:
@@ -475,8 +570,8 @@ class SuppliesManager:
                     continue
                 
                 try:
-                    # Получаем сообщение
-                    message = await channel.fetch_message(start_message_id)
+                    # Частичное сообщение: редактирование без предварительного fetch
+                    message = channel.get_partial_message(start_message_id)
                     
                     # Получаем актуальное оставшееся время
                     remaining_time = self.get_remaining_time(object_key)
@@ -511,8 +606,8 @@ class SuppliesManager:
                     
                     embed.set_footer(text="Уведомление будет отправлено за несколько минут до конца таймера")
                     
-                    # Обновляем сообщение (оставляем контент без изменений)
-                    await message.edit(embed=embed)
+                    # Обновляем сообщение только если embed изменился (контент без изменений)
+                    await message_edit_cache.edit_if_changed(message, embed=embed)
                     
                 except discord.NotFound:
                     # Сообщение удалено, очищаем ID
@@ -575,8 +670,8 @@ class SuppliesManager:
             for message_id in all_warning_ids[:]:  # Копия списка для безопасного изменения
                 logger.warning("Пытаемся обновить warning сообщение %s", message_id)
                 try:
-                    # Получаем сообщение
-                    message = await channel.fetch_message(message_id)
+                    # Частичное сообщение: редактирование без предварительного fetch
+                    message = channel.get_partial_message(message_id)
                     
                     # Определяем статус и цвет
                     if remaining_time == "Истек" or remaining_time == "Не активен":
@@ -633,8 +728,8 @@ class SuppliesManager:
                     
                     embed.set_footer(text="Система управления поставками")
                     
-                    # Обновляем сообщение (оставляем контент без изменений)
-                    await message.edit(embed=embed)
+                    # Обновляем сообщение только если embed изменился (контент без изменений)
+                    await message_edit_cache.edit_if_changed(message, embed=embed)
                     
                 except discord.NotFound:
                     # Сообщение удалено, убираем ID из соответствующих списков
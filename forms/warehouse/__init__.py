@@ -15,7 +15,8 @@ from .cart import (
     clear_user_cart,
     clear_user_cart_safe,
     get_user_cart_message,
-    set_user_cart_message
+    set_user_cart_message,
+    clear_user_cart_message
 )
 from .modals import (
     WarehouseRequestModal,
@@ -58,6 +59,7 @@ __all__ = [
     'clear_user_cart_safe',
     'get_user_cart_message',
     'set_user_cart_message',
+    'clear_user_cart_message',
     
     # Modals
     'WarehouseRequestModal',
@@ -1,15 +1,28 @@
 """
 Управление корзиной запросов склада
+
+Корзины хранятся в WarehouseCartStore: неактивные дольше CART_IDLE_TTL удаляются
+периодической задачей, содержимое сохраняется в снимок на диске и переживает перезапуск.
+Сообщения корзин (ephemeral) не сохраняются - после перезапуска корзина показывается заново.
 """
 
+import json
+import os
+import time
 import discord
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
 from utils.logging_setup import get_logger
 
 # Initialize logger
 logger = get_logger(__name__)
 
+# Время неактивности, после которого корзина удаляется (секунды)
+CART_IDLE_TTL = 6 * 3600
+# Периодичность очистки и сохранения снимка (секунды)
+CART_MAINTENANCE_INTERVAL = 60
+CART_SNAPSHOT_FILE = "data/warehouse_carts.json"
+
 
 class WarehouseRequestItem:
     """Класс для представления одного предмета в корзине"""
@@ -27,6 +40,26 @@ class WarehouseRequestItem:
     
     def __str__(self):
         return f"**{self.item_name}** × {self.quantity}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'category': self.category,
+            'item_name': self.item_name,
+            'quantity': self.quantity,
+            'user_name': self.user_name,
+            'user_static': self.user_static,
+            'position': self.position,
+            'rank': self.rank,
+            'timestamp': self.timestamp.isoformat(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'WarehouseRequestItem':
+        item = cls(data['category'], data['item_name'], data['quantity'], data.get('user_name', ''),
+                   data.get('user_static', ''), data.get('position', ''), data.get('rank', ''))
+        if data.get('timestamp'):
+            item.timestamp = datetime.fromisoformat(data['timestamp'])
+        return item
 
 
 class WarehouseRequestCart:
@@ -34,39 +67,58 @@ class WarehouseRequestCart:
     
     def __init__(self, user_id: int):
         self.user_id = user_id
-        self.items: List[WarehouseRequestItem] = []
+        # (категория, предмет) -> предмет; порядок добавления сохраняется
+        self._items: Dict[Tuple[str, str], WarehouseRequestItem] = {}
         self.created_at = datetime.now()
+        # Последнее обращение и изменение (time.time())
+        self.last_activity = time.time()
+        self.updated_at = self.last_activity
+    
+    @property
+    def items(self) -> List[WarehouseRequestItem]:
+        """Предметы в порядке добавления"""
+        return list(self._items.values())
+    
+    def touch(self):
+        """Отметить обращение к корзине"""
+        self.last_activity = time.time()
+    
+    def _mark_changed(self):
+        self.last_activity = self.updated_at = time.time()
     
     def add_item(self, item: WarehouseRequestItem):
         """Добавить предмет в корзину"""
-        # Проверяем, есть ли уже такой предмет
-        for existing_item in self.items:
-            if (existing_item.category == item.category and 
-                existing_item.item_name == item.item_name):
-                # Если есть, увеличиваем количество
-                existing_item.quantity += item.quantity
-                return
-        # Если нет, добавляем новый предмет
-        self.items.append(item)
+        key = (item.category, item.item_name)
+        existing_item = self._items.get(key)
+        if existing_item:
+            # Если есть, увеличиваем количество
+            existing_item.quantity += item.quantity
+        else:
+            # Если нет, добавляем новый предмет
+            self._items[key] = item
+        self._mark_changed()
     
     def remove_item_by_index(self, index: int):
         """Удалить предмет по индексу (0-based)"""
-        if 0 <= index < len(self.items):
-            self.items.pop(index)
+        if 0 <= index < len(self._items):
+            key = list(self._items)[index]
+            del self._items[key]
+            self._mark_changed()
             return True
         return False
     
     def clear(self):
         """Очистить корзину"""
-        self.items.clear()
+        self._items.clear()
+        self._mark_changed()
     
     def is_empty(self) -> bool:
         """Проверить, пуста ли корзина"""
-        return len(self.items) == 0
+        return not self._items
     
     def get_total_items(self) -> int:
         """Получить общее количество предметов"""
-        return sum(item.quantity for item in self.items)
+        return sum(item.quantity for item in self._items.values())
     
     def get_summary(self) -> str:
         """Получить краткое описание корзины"""
@@ -92,39 +144,165 @@ class WarehouseRequestCart:
     
     def get_item_quantity(self, category: str, item_name: str) -> int:
         """Получить текущее количество конкретного предмета в корзине"""
-        for item in self.items:
-            if item.category == category and item.item_name == item_name:
-                return item.quantity
-        return 0
+        item = self._items.get((category, item_name))
+        return item.quantity if item else 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'user_id': self.user_id,
+            'created_at': self.created_at.isoformat(),
+            'last_activity': self.last_activity,
+            'items': [item.to_dict() for item in self._items.values()],
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'WarehouseRequestCart':
+        cart = cls(int(data['user_id']))
+        cart.created_at = datetime.fromisoformat(data['created_at'])
+        for item_data in data.get('items', []):
+            cart.add_item(WarehouseRequestItem.from_dict(item_data))
+        cart.last_activity = cart.updated_at = data.get('last_activity', cart.last_activity)
+        return cart
+
+
+class WarehouseCartStore:
+    """
+    Хранилище корзин пользователей
+
+    Неактивные корзины вытесняются по idle-TTL, содержимое сохраняется в снимок
+    (если задан snapshot_file) атомарной заменой файла.
+    """
+    
+    def __init__(self, idle_ttl: float = CART_IDLE_TTL, snapshot_file: Optional[str] = CART_SNAPSHOT_FILE):
+        self.idle_ttl = idle_ttl
+        self.snapshot_file = snapshot_file
+        self._carts: Dict[int, WarehouseRequestCart] = {}
+        # Сообщения корзин пользователей (для редактирования)
+        self._messages: Dict[int, discord.Message] = {}
+        self._loaded = False
+        self._saved_at = 0.0
+        self._removed_since_save = False
+    
+    def _ensure_loaded(self):
+        """Загрузить снимок при первом обращении"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            expire_before = time.time() - self.idle_ttl
+            for cart_data in data.get('carts', []):
+                cart = WarehouseRequestCart.from_dict(cart_data)
+                if cart.last_activity >= expire_before and not cart.is_empty():
+                    self._carts[cart.user_id] = cart
+            self._saved_at = time.time()
+            logger.info("CART STORE: Восстановлено корзин из снимка: %s", len(self._carts))
+        except Exception as e:
+            logger.warning("CART STORE: Ошибка загрузки снимка корзин: %s", e)
+    
+    def get(self, user_id: int) -> WarehouseRequestCart:
+        """Получить (или создать) корзину пользователя"""
+        self._ensure_loaded()
+        cart = self._carts.get(user_id)
+        if cart is None:
+            cart = self._carts[user_id] = WarehouseRequestCart(user_id)
+        cart.touch()
+        return cart
+    
+    def remove(self, user_id: int) -> Tuple[bool, bool]:
+        """Удалить корзину и сообщение пользователя; возвращает (корзина удалена, сообщение удалено)"""
+        self._ensure_loaded()
+        cart_removed = self._carts.pop(user_id, None) is not None
+        message_removed = self._messages.pop(user_id, None) is not None
+        if cart_removed:
+            self._removed_since_save = True
+        return cart_removed, message_removed
+    
+    def get_message(self, user_id: int) -> Optional[discord.Message]:
+        return self._messages.get(user_id)
+    
+    def set_message(self, user_id: int, message: discord.Message):
+        self._messages[user_id] = message
+    
+    def remove_message(self, user_id: int):
+        self._messages.pop(user_id, None)
+    
+    def evict_idle(self) -> int:
+        """Удалить корзины, к которым не обращались дольше idle_ttl"""
+        self._ensure_loaded()
+        expire_before = time.time() - self.idle_ttl
+        expired = [user_id for user_id, cart in self._carts.items() if cart.last_activity < expire_before]
+        for user_id in expired:
+            self.remove(user_id)
+        if expired:
+            logger.info("CART STORE: Удалено неактивных корзин: %s", len(expired))
+        return len(expired)
+    
+    def save_snapshot(self, force: bool = False) -> bool:
+        """Сохранить непустые корзины, если что-то изменилось с прошлого сохранения"""
+        if not self.snapshot_file or not self._loaded:
+            return False
+        changed = self._removed_since_save or any(cart.updated_at > self._saved_at for cart in self._carts.values())
+        if not changed and not force:
+            return False
+        
+        saved_at = time.time()
+        data = {'carts': [cart.to_dict() for cart in self._carts.values() if not cart.is_empty()]}
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_file), exist_ok=True)
+            tmp_path = f"{self.snapshot_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_file)
+            self._saved_at = saved_at
+            self._removed_since_save = False
+            return True
+        except Exception as e:
+            logger.warning("CART STORE: Ошибка сохранения снимка корзин: %s", e)
+            return False
+    
+    async def run_maintenance(self):
+        """Периодическая задача: вытеснение неактивных корзин и сохранение снимка"""
+        self.evict_idle()
+        self.save_snapshot()
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'carts': len(self._carts),
+            'messages': len(self._messages),
+        }
 
 
-# Глобальный словарь для хранения корзин пользователей
-user_carts: Dict[int, WarehouseRequestCart] = {}
+# Глобальное хранилище корзин
+cart_store = WarehouseCartStore()
 
-# Глобальный словарь для хранения сообщений корзин пользователей (для редактирования)
-user_cart_messages: Dict[int, discord.Message] = {}
+
+def schedule_cart_maintenance():
+    """Зарегистрировать очистку и сохранение корзин в общем планировщике"""
+    from utils.job_scheduler import job_scheduler, IntervalTrigger
+    
+    job_scheduler.add_job(
+        'warehouse_cart_maintenance',
+        cart_store.run_maintenance,
+        IntervalTrigger(CART_MAINTENANCE_INTERVAL),
+        catch_up=False,
+        retry_delay=CART_MAINTENANCE_INTERVAL
+    )
+    job_scheduler.start()
 
 
 def get_user_cart(user_id: int) -> WarehouseRequestCart:
     """Получить корзину пользователя"""
-    if user_id not in user_carts:
-        user_carts[user_id] = WarehouseRequestCart(user_id)
-    return user_carts[user_id]
+    return cart_store.get(user_id)
 
 
 def clear_user_cart(user_id: int):
     """Очистить корзину пользователя безопасно"""
     try:
-        cart_cleared = False
-        message_cleared = False
-        
-        if user_id in user_carts:
-            del user_carts[user_id]
-            cart_cleared = True
-            
-        if user_id in user_cart_messages:
-            del user_cart_messages[user_id]
-            message_cleared = True
+        cart_cleared, message_cleared = cart_store.remove(user_id)
             
         if cart_cleared or message_cleared:
             logger.info("CART CLEANUP: Очищены данные для пользователя %s (корзина: %s, сообщение: %s)", user_id, '' if cart_cleared else '', '' if message_cleared else '')
@@ -144,9 +322,14 @@ def clear_user_cart_safe(user_id: int, reason: str = "unknown"):
 
 def get_user_cart_message(user_id: int) -> Optional[discord.Message]:
     """Получить сообщение корзины пользователя"""
-    return user_cart_messages.get(user_id)
+    return cart_store.get_message(user_id)
 
 
 def set_user_cart_message(user_id: int, message: discord.Message):
     """Установить сообщение корзины пользователя"""
-    user_cart_messages[user_id] = message
+    cart_store.set_message(user_id, message)
+
+
+def clear_user_cart_message(user_id: int):
+    """Перестать отслеживать сообщение корзины пользователя"""
+    cart_store.remove_message(user_id)
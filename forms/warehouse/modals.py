@@ -7,6 +7,7 @@ import re
 import discord
 from datetime import datetime
 from utils.warehouse_manager import WarehouseManager
+from utils.warehouse_ledger import warehouse_request_ledger
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -839,7 +840,10 @@ class WarehouseFinalDetailsModal(discord.ui.Modal):
             ping_content = f"-# {' '.join(ping_mentions)}"
         
         view = WarehousePersistentRequestView()
-        await warehouse_channel.send(content=ping_content, embed=embed, view=view)
+        message = await warehouse_channel.send(content=ping_content, embed=embed, view=view)
+        warehouse_request_ledger.record_request(
+            interaction.guild.id, interaction.user.id, message.id, len(self.cart.items)
+        )
 
     async def _send_multi_request(self, interaction: discord.Interaction):
         """Отправить множественную заявку"""
@@ -909,7 +913,10 @@ class WarehouseFinalDetailsModal(discord.ui.Modal):
             ping_content = f"-# {' '.join(ping_mentions)}"
         
         view = WarehousePersistentMultiRequestView()
-        await warehouse_channel.send(content=ping_content, embed=embed, view=view)
+        message = await warehouse_channel.send(content=ping_content, embed=embed, view=view)
+        warehouse_request_ledger.record_request(
+            interaction.guild.id, interaction.user.id, message.id, len(self.cart.items)
+        )
 
     async def _update_cart_after_submission(self, interaction: discord.Interaction):
         """Обновить корзину после отправки заявки"""
@@ -5,6 +5,7 @@ Persistent Views для кнопок модерации заявок склад
 import discord
 from typing import TYPE_CHECKING
 from utils.logging_setup import get_logger
+from utils.warehouse_ledger import warehouse_request_ledger, STATUS_APPROVED
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -49,6 +50,7 @@ class WarehousePersistentRequestView(discord.ui.View):
             status_view = WarehouseStatusView(status="approved")
             
             await interaction.response.edit_message(content="", embed=embed, view=status_view)
+            warehouse_request_ledger.update_status(interaction.message.id, STATUS_APPROVED, interaction.user.id)
             
         except Exception as e:
             logger.error("Ошибка при одобрении запроса склада: %s", e)
@@ -216,6 +218,7 @@ class WarehousePersistentMultiRequestView(discord.ui.View):
             status_view = WarehouseStatusView(status="approved")
             
             await interaction.response.edit_message(content="", embed=embed, view=status_view)
+            warehouse_request_ledger.update_status(interaction.message.id, STATUS_APPROVED, interaction.user.id)
             
         except Exception as e:
             logger.error("Ошибка при одобрении множественного запроса: %s", e)
@@ -4,6 +4,7 @@ Views и модалы для управления статусом заявок
 
 import discord
 from utils.message_manager import get_warehouse_message
+from utils.warehouse_ledger import warehouse_request_ledger, STATUS_REJECTED, STATUS_DELETED
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -82,10 +83,11 @@ class DeletionConfirmView(discord.ui.View):
             # Удаляем оригинальное сообщение
             try:
                 await self.original_message.delete()
+                warehouse_request_ledger.update_status(self.original_message.id, STATUS_DELETED, interaction.user.id)
                 logger.info(f"DELETE: Запрос склада удален пользователем {interaction.user.display_name}")
             except discord.NotFound:
                 # Сообщение уже удалено
-                pass
+                warehouse_request_ledger.update_status(self.original_message.id, STATUS_DELETED, interaction.user.id)
             except discord.Forbidden:
                 await interaction.followup.send(
                     "⚠️ Нет прав для удаления сообщения. Обратитесь к администратору сервера.",
@@ -152,6 +154,7 @@ class RejectionReasonModal(discord.ui.Modal):
             status_view = WarehouseStatusView(status="rejected")
             
             await interaction.response.edit_message(content="", embed=embed, view=status_view)
+            warehouse_request_ledger.update_status(self.original_message.id, STATUS_REJECTED, interaction.user.id)
             
         except Exception as e:
             logger.error("Ошибка при отклонении запроса склада: %s", e)
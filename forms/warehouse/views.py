@@ -9,7 +9,7 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict
 from utils.warehouse_manager import WarehouseManager
 from utils.message_manager import get_warehouse_message
-from .cart import WarehouseRequestCart, clear_user_cart_safe, get_user_cart_message, user_cart_messages
+from .cart import WarehouseRequestCart, clear_user_cart_safe, get_user_cart_message, clear_user_cart_message
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -482,8 +482,7 @@ class WarehouseCartView(discord.ui.View):
                 empty_embed.set_footer(text="Сообщение автоматически исчезнет через 10 секунд")
                 
                 # Удаляем сообщение корзины из отслеживания
-                if interaction.user.id in user_cart_messages:
-                    del user_cart_messages[interaction.user.id]
+                clear_user_cart_message(interaction.user.id)
                 
                 await interaction.response.edit_message(embed=empty_embed, view=None)
                 
@@ -0,0 +1,214 @@
+"""
+Nickname parser regression corpus and benchmark
+Регрессионный корпус и бенчмарк парсера никнеймов
+
+Корпус генерируется детерминированно (фиксированный seed) и покрывает реальные
+форматы: стандартный, с подгруппой, особые "!"/"!!", должностные и длинные имена,
+которые упираются в лимит 32 символа.
+
+Запуск бенчмарка отдельно:
+    python -m tests.test_nickname_parser
+"""
+
+import random
+import time
+from unittest import mock
+
+import pytest
+
+from utils.postgresql_pool import PostgreSQLConnectionPool
+
+# Парсер не обращается к БД, поэтому импорт менеджеров не должен требовать запущенный PostgreSQL
+with mock.patch.object(PostgreSQLConnectionPool, '_initialize_pool'):
+    from utils import nickname_manager as nickname_module
+
+SEED = 20240601
+CORPUS_SIZE = 3000
+
+SUBDIVISIONS = ['ВА', 'РОиО', 'ССО', 'ВП', 'МР', 'УВП', 'ОБР', 'ГШ', 'ВАИ', 'ДШБ']
+SUBGROUPS = ['ПГ', 'СО', 'РГ', 'МП']
+RANK_ABBREVIATIONS = [
+    'Р-й', 'Еф-р', 'Мл. С-т', 'С-т', 'Ст. С-т', 'Ст-на', 'Пр-к', 'Ст. Пр-к',
+    'Мл. Л-т', 'Л-т', 'Ст. Л-т', 'К-н', 'М-р', 'П-к', 'Г-л',
+]
+POSITIONS = ['Нач. Штаба', 'Зам. Нач.', 'Ком. Бриг', 'Нач. Отдела', 'Ком. КР']
+FIRST_NAMES = [
+    'Иван', 'Пётр', 'Алексей', 'Виктор', 'Максимилиан', 'Анна', 'Елизавета', 'Ян',
+    'Константин', 'Всеволод', 'Ёжи', 'Артём', 'Мария', 'Александр', 'Ли',
+]
+LAST_NAMES = [
+    'Петров', 'Верпов', 'Тимонов', 'Константинопольский', 'Ивановский-Петровский',
+    'Ким', 'Ёлкин', 'Соловьёва', 'Римский-Корсаков', 'Ли', 'Аксёнов', 'Шереметьев',
+]
+
+# (должность, И.Фамилия, ожидаемый format_type) для формата "[Должность] И.Фамилия"
+POSITION_NICKNAMES = [
+    ('Нач. Штаба', 'И.Петров', 'position'),
+    ('Зам. Нач.', 'А.Ким', 'position'),
+    ('Ком. Бриг', 'М.Шереметьев', 'position'),
+    ('Нач. Отдела', 'В.Константинопольский', 'position'),
+    ('Ком. КР', 'Я.Ли', 'position'),
+    # Должностной паттерн не допускает "Ё" в инициале, дефис и "ё" в фамилии - такие никнеймы
+    # остаются нераспознанными (и тоже не изменяются автоматически)
+    ('Нач. Штаба', 'Ё.Ким', 'unknown'),
+    ('Ком. Бриг', 'П.Ёлкин', 'unknown'),
+    ('Зам. Нач.', 'А.Соловьёва', 'unknown'),
+    ('Ком. КР', 'Р.Римский-Корсаков', 'unknown'),
+]
+
+
+@pytest.fixture(scope="module")
+def manager():
+    """NicknameManager с настройками по умолчанию (не зависит от локального config.json)"""
+    with mock.patch.object(nickname_module, 'load_config', return_value={}), \
+            mock.patch.object(nickname_module, 'get_config_version', return_value=('tests',)):
+        yield nickname_module.NicknameManager()
+
+
+def _generate_identity(rng: random.Random):
+    return (
+        rng.choice(SUBDIVISIONS),
+        rng.choice(RANK_ABBREVIATIONS),
+        rng.choice(FIRST_NAMES),
+        rng.choice(LAST_NAMES),
+    )
+
+
+def generate_corpus(manager, size: int = CORPUS_SIZE, seed: int = SEED):
+    """
+    Корпус никнеймов реальной формы
+
+    Returns:
+        List[Tuple[str, str]]: (никнейм, ожидаемый format_type)
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        subdivision, rank, first_name, last_name = _generate_identity(rng)
+        kind = rng.random()
+        if kind < 0.55:
+            corpus.append((manager.build_service_nickname(subdivision, rank, first_name, last_name), 'standard'))
+        elif kind < 0.65:
+            corpus.append((f"{subdivision} | {first_name} {last_name}"[:32], 'standard'))
+        elif kind < 0.75:
+            corpus.append((f"{subdivision}[{rng.choice(SUBGROUPS)}] | {rank} | {first_name[0]}. {last_name}"[:32],
+                           'standard_with_subgroup'))
+        elif kind < 0.82:
+            corpus.append((f"{subdivision} | {rng.choice(POSITIONS)} | {first_name[0]}. {last_name}"[:32],
+                           'positional'))
+        elif kind < 0.88:
+            corpus.append((f"{'!' * rng.choice((1, 2))}[{rng.choice(POSITIONS)}] {first_name}", 'complex_special'))
+        elif kind < 0.93:
+            corpus.append((f"! {first_name} {last_name}", 'simple_special'))
+        elif kind < 0.97:
+            position, short_name, expected = rng.choice(POSITION_NICKNAMES)
+            corpus.append((f"[{position}] {short_name}", expected))
+        else:
+            corpus.append((manager.build_dismissed_nickname(first_name, last_name), None))
+    return corpus
+
+
+def test_corpus_format_detection(manager):
+    """Каждый никнейм корпуса распознаётся в ожидаемом формате"""
+    for nickname, expected_format in generate_corpus(manager):
+        parsed = manager.parse_nickname(nickname)
+        assert parsed['name'], nickname
+        if expected_format:
+            assert parsed['format_type'] == expected_format, (nickname, parsed)
+        if parsed['format_type'] in ('complex_special', 'simple_special', 'position', 'positional', 'unknown'):
+            assert parsed['is_special'], (nickname, parsed)
+
+
+def test_position_nickname_name(manager):
+    """Из должностного никнейма выделяется И.Фамилия"""
+    for position, short_name, expected_format in POSITION_NICKNAMES:
+        parsed = manager.parse_nickname(f"[{position}] {short_name}")
+        assert parsed['format_type'] == expected_format, (short_name, parsed)
+        if expected_format == 'position':
+            assert parsed['name'] == short_name, parsed
+
+
+def test_build_parse_build_round_trip(manager):
+    """build -> parse -> build возвращает тот же никнейм, лимит длины соблюдается"""
+    rng = random.Random(SEED)
+    for _ in range(CORPUS_SIZE):
+        subdivision, rank, first_name, last_name = _generate_identity(rng)
+        nickname = manager.build_service_nickname(subdivision, rank, first_name, last_name)
+        assert len(nickname) <= manager.MAX_NICKNAME_LENGTH, nickname
+
+        parsed = manager.parse_nickname(nickname)
+        assert parsed['format_type'] == 'standard', (nickname, parsed)
+        assert parsed['subdivision'] == subdivision
+        assert parsed['rank'] == rank
+
+        rebuilt_first, rebuilt_last = manager.extract_name_parts(parsed['name'])
+        rebuilt = manager.build_service_nickname(parsed['subdivision'], parsed['rank'], rebuilt_first, rebuilt_last)
+        assert rebuilt == nickname, (nickname, parsed)
+
+
+def test_dismissed_round_trip(manager):
+    """Никнейм уволенного сохраняет ФИО и помещается в лимит"""
+    rng = random.Random(SEED)
+    for _ in range(500):
+        _, _, first_name, last_name = _generate_identity(rng)
+        nickname = manager.build_dismissed_nickname(first_name, last_name)
+        assert len(nickname) <= manager.MAX_NICKNAME_LENGTH, nickname
+
+        parsed = manager.parse_nickname(nickname)
+        rebuilt = manager.build_dismissed_nickname(*manager.extract_name_parts(parsed['name']))
+        assert rebuilt == nickname, (nickname, parsed)
+
+
+def test_format_name_respects_limit(manager):
+    """format_name_for_nickname не превышает доступную длину"""
+    rng = random.Random(SEED)
+    for _ in range(CORPUS_SIZE):
+        _, _, first_name, last_name = _generate_identity(rng)
+        max_length = rng.randint(3, 32)
+        formatted = manager.format_name_for_nickname(first_name, last_name, max_length)
+        assert 0 < len(formatted) <= max_length, (first_name, last_name, max_length, formatted)
+
+
+def test_subgroup_parsing(manager):
+    parsed = manager.parse_nickname("РОиО[ПГ] | Ст. Л-т | Виктор Верпов")
+    assert parsed['format_type'] == 'standard_with_subgroup'
+    assert (parsed['subdivision'], parsed['subgroup'], parsed['rank'], parsed['name']) == \
+        ('РОиО', 'ПГ', 'Ст. Л-т', 'Виктор Верпов')
+
+
+def run_benchmark(manager, rounds: int = 5):
+    """
+    Скорость разбора корпуса
+
+    Returns:
+        Dict: parses_per_second, corpus_size, best_round_seconds
+    """
+    nicknames = [nickname for nickname, _ in generate_corpus(manager)]
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for nickname in nicknames:
+            manager.parse_nickname(nickname)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        'corpus_size': len(nicknames),
+        'best_round_seconds': round(best, 4),
+        'parses_per_second': int(len(nicknames) / best) if best else 0,
+    }
+
+
+def test_parse_benchmark(manager):
+    """Бенчмарк разбора (результат выводится с pytest -s)"""
+    result = run_benchmark(manager)
+    print(f"\nparse_nickname: {result['parses_per_second']} разборов/с "
+          f"(корпус {result['corpus_size']}, лучший проход {result['best_round_seconds']}с)")
+    assert result['parses_per_second'] > 0
+
+
+if __name__ == "__main__":
+    with mock.patch.object(nickname_module, 'load_config', return_value={}), \
+            mock.patch.object(nickname_module, 'get_config_version', return_value=('tests',)):
+        result = run_benchmark(nickname_module.NicknameManager())
+    print(f"parse_nickname: {result['parses_per_second']} разборов/с "
+          f"(корпус {result['corpus_size']}, лучший проход {result['best_round_seconds']}с)")
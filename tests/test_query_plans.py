@@ -0,0 +1,195 @@
+"""
+Query plan regression tests for hot personnel lookups
+Регрессионные тесты планов частых запросов
+
+Тест создаёт временную схему в локальном PostgreSQL, заполняет её синтетическими
+данными, создаёт индексы из utils.database_manager.indexes и проверяет через EXPLAIN,
+что частые запросы не деградировали до последовательного сканирования.
+
+Подключение: только переменная TEST_POSTGRES_DSN (отдельная тестовая база; настройки
+бота POSTGRES_* не используются). Без неё или без доступного PostgreSQL тесты пропускаются.
+"""
+
+import json
+import os
+import uuid
+from unittest import mock
+
+import psycopg2
+import pytest
+
+from utils.postgresql_pool import PostgreSQLConnectionPool
+
+# Менеджер нужен только ради текста запросов, пул соединений не создаётся
+with mock.patch.object(PostgreSQLConnectionPool, '_initialize_pool'):
+    from utils.database_manager.indexes import HOT_PATH_INDEXES, TRIGRAM_INDEXES, TRIGRAM_EXTENSION_SQL, _create_index
+    from utils.database_manager.manager import PersonnelManager
+    from utils.database_manager import statements
+    from utils.prepared_statements import statement_registry
+
+PERSONNEL_COUNT = 50000
+HISTORY_PER_PERSON = 6
+SUBDIVISION_COUNT = 3000
+POSITION_COUNT = 5000
+
+_SCHEMA_SQL = """
+    CREATE TABLE personnel (
+        id SERIAL PRIMARY KEY,
+        discord_id BIGINT,
+        first_name VARCHAR(100),
+        last_name VARCHAR(100),
+        static VARCHAR(50),
+        last_updated TIMESTAMP,
+        is_dismissal BOOLEAN DEFAULT false,
+        join_date DATE,
+        dismissal_date DATE,
+        dismissal_reason TEXT
+    );
+    CREATE TABLE ranks (id SERIAL PRIMARY KEY, name VARCHAR(100), role_id BIGINT,
+                        rank_level INTEGER, abbreviation VARCHAR(50));
+    CREATE TABLE subdivisions (id SERIAL PRIMARY KEY, name VARCHAR(200), abbreviation VARCHAR(50), role_id BIGINT);
+    CREATE TABLE positions (id SERIAL PRIMARY KEY, name VARCHAR(200), role_id BIGINT);
+    CREATE TABLE position_subdivision (id SERIAL PRIMARY KEY, position_id INTEGER, subdivision_id INTEGER);
+    CREATE TABLE employees (id SERIAL PRIMARY KEY, rank_id INTEGER, subdivision_id INTEGER,
+                            position_subdivision_id INTEGER, personnel_id INTEGER);
+    CREATE TABLE history (id SERIAL PRIMARY KEY, action_date TIMESTAMPTZ, details TEXT, performed_by INTEGER,
+                          action_id INTEGER, personnel_id INTEGER, changes JSONB);
+    CREATE TABLE blacklist (id SERIAL PRIMARY KEY, reason TEXT, start_date DATE, end_date DATE,
+                            last_updated TIMESTAMP, personnel_id INTEGER, added_by INTEGER);
+"""
+
+_DATA_SQL = f"""
+    INSERT INTO personnel (discord_id, first_name, last_name, static, is_dismissal, join_date)
+    SELECT 100000000000000000 + g, 'Имя' || g, 'Фамилия' || g,
+           lpad((g / 1000)::text, 3, '0') || '-' || lpad((g % 1000)::text, 3, '0'),
+           g % 5 = 0, CURRENT_DATE - (g % 365)
+    FROM generate_series(1, {PERSONNEL_COUNT}) g;
+
+    INSERT INTO subdivisions (name, abbreviation)
+    SELECT 'Подразделение ' || md5(g::text), upper(substr(md5(g::text), 1, 6))
+    FROM generate_series(1, {SUBDIVISION_COUNT}) g;
+
+    INSERT INTO positions (name)
+    SELECT 'Должность ' || md5(g::text) FROM generate_series(1, {POSITION_COUNT}) g;
+
+    INSERT INTO employees (rank_id, subdivision_id, position_subdivision_id, personnel_id)
+    SELECT NULL, 1 + g % {SUBDIVISION_COUNT}, NULL, g FROM generate_series(1, {PERSONNEL_COUNT}) g;
+
+    INSERT INTO history (action_date, action_id, personnel_id, performed_by)
+    SELECT now() - ((g * {HISTORY_PER_PERSON} + n) % 500) * interval '1 day',
+           (ARRAY[10, 1, 2, 3, 9, 10])[n + 1], g, 1
+    FROM generate_series(1, {PERSONNEL_COUNT}) g, generate_series(0, {HISTORY_PER_PERSON - 1}) n;
+
+    INSERT INTO blacklist (reason, start_date, end_date, personnel_id, added_by)
+    SELECT 'Неустойка', CURRENT_DATE - (g % 30), CURRENT_DATE - (g % 30) + 14, g, 1
+    FROM generate_series(1, {PERSONNEL_COUNT}, 7) g;
+"""
+
+DISCORD_ID = 100000000000012346
+
+# (запрос, таблицы, которые нельзя сканировать последовательно, параметры)
+# Проверяются запросы, которые выполняет бот: подготовленные запросы кадрового учёта
+# (utils/database_manager/statements.py) и расчёт текущего периода службы
+_PREPARED_HOT_QUERIES = [
+    (statements.PERSONNEL_ID_BY_DISCORD, {'personnel'}, (DISCORD_ID,)),
+    (statements.ACTIVE_PERSONNEL_ID_BY_DISCORD, {'personnel'}, (DISCORD_ID,)),
+    (statements.STATIC_BY_DISCORD, {'personnel'}, (DISCORD_ID,)),
+    (statements.PERSONNEL_SUMMARY, {'personnel', 'employees'}, (DISCORD_ID,)),
+    (statements.PERSONNEL_ACTION_CONTEXT, {'personnel', 'employees'}, (DISCORD_ID, DISCORD_ID + 1)),
+]
+
+# (название, таблицы, которые нельзя сканировать последовательно, SQL, параметры)
+HOT_QUERIES = [
+    (name, tables, statement_registry.get_sql(name), params)
+    for name, tables, params in _PREPARED_HOT_QUERIES
+] + [
+    ('service_period_single', {'history'},
+     PersonnelManager._SERVICE_PERIODS_QUERY.format(personnel_filter="AND personnel_id = ANY(%s)"),
+     ([12346],)),
+]
+
+TRIGRAM_QUERIES = [
+    ('position_name_ilike', {'positions'},
+     "SELECT id, name FROM positions WHERE name ILIKE %s;",
+     ('%c4ca4238a0b9%',)),
+    ('subdivision_name_or_abbreviation_ilike', {'subdivisions'},
+     "SELECT id, name FROM subdivisions WHERE name ILIKE %s OR abbreviation ILIKE %s;",
+     ('%c4ca4238a0b9%', '%C4CA42%')),
+]
+
+
+def _connect():
+    # Только явно заданная тестовая база: POSTGRES_* из .env бота указывают на рабочую БД
+    dsn = os.getenv('TEST_POSTGRES_DSN')
+    if not dsn:
+        pytest.skip("TEST_POSTGRES_DSN не задан")
+    return psycopg2.connect(dsn, connect_timeout=3)
+
+
+@pytest.fixture(scope="module")
+def plan_db():
+    """Временная схема с синтетическими данными и индексами"""
+    try:
+        conn = _connect()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL недоступен: {e}")
+
+    conn.autocommit = True
+    schema = f"plan_check_{uuid.uuid4().hex[:8]}"
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"CREATE SCHEMA {schema};")
+        cursor.execute(f"SET search_path TO {schema}, public;")
+        cursor.execute(_SCHEMA_SQL)
+        cursor.execute(_DATA_SQL)
+
+        trigram_available = True
+        try:
+            cursor.execute(TRIGRAM_EXTENSION_SQL)
+        except psycopg2.Error:
+            trigram_available = False
+
+        indexes = HOT_PATH_INDEXES + (TRIGRAM_INDEXES if trigram_available else [])
+        for name, definition in indexes:
+            _create_index(cursor, name, definition, concurrently=False)
+        cursor.execute("ANALYZE;")
+
+        yield cursor, trigram_available
+    finally:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE;")
+        cursor.close()
+        conn.close()
+
+
+def _iter_plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _iter_plan_nodes(child)
+
+
+def _sequential_scans(cursor, sql: str, params) -> set:
+    cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return {
+        node.get('Relation Name')
+        for node in _iter_plan_nodes(plan[0]['Plan'])
+        if node['Node Type'] == 'Seq Scan'
+    }
+
+
+@pytest.mark.parametrize('name, tables, sql, params', HOT_QUERIES, ids=[query[0] for query in HOT_QUERIES])
+def test_hot_query_uses_index(plan_db, name, tables, sql, params):
+    cursor, _ = plan_db
+    scanned = _sequential_scans(cursor, sql, params) & tables
+    assert not scanned, f"{name}: последовательное сканирование {scanned}"
+
+
+@pytest.mark.parametrize('name, tables, sql, params', TRIGRAM_QUERIES, ids=[query[0] for query in TRIGRAM_QUERIES])
+def test_ilike_query_uses_trigram_index(plan_db, name, tables, sql, params):
+    cursor, trigram_available = plan_db
+    if not trigram_available:
+        pytest.skip("Расширение pg_trgm недоступно")
+    scanned = _sequential_scans(cursor, sql, params) & tables
+    assert not scanned, f"{name}: последовательное сканирование {scanned}"
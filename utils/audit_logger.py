@@ -13,11 +13,14 @@ Key features:
 - Consistent thumbnail and timestamp formatting
 """
 
+import asyncio
+import time
 import discord
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, Iterable, Union
 from enum import Enum
 from utils.message_manager import get_audit_embed_field, get_audit_config, get_blacklist_config
+from utils.audit_outbox import audit_outbox
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -184,6 +187,88 @@ class AuditAction:
         return await cls.get("Внесение изменений в Имя или Фамилию")
 
 
+def format_moderator_display(first_name: Optional[str], last_name: Optional[str],
+                             static: Optional[str]) -> Optional[str]:
+    """Format moderator as "Имя Фамилия | static" (or whatever part is available)"""
+    full_name = f"{first_name or ''} {last_name or ''}".strip()
+    static = static or ''
+    
+    if full_name and static:
+        return f"{full_name} | {static}"
+    elif full_name:
+        return full_name
+    elif static:
+        return static
+    return None
+
+
+class ModeratorIdentityCache:
+    """
+    TTL cache of moderator display names for audit embeds.
+    
+    Audit embeds are produced by the same handful of moderators over and over,
+    so their "Имя Фамилия | static" is kept in memory. The cache is warmed from
+    the bulk personnel preload and invalidated when a profile name changes.
+    Moderators missing from personnel are cached too, with a shorter TTL.
+    """
+    
+    TTL_SECONDS = 1800
+    NEGATIVE_TTL_SECONDS = 120
+    
+    def __init__(self):
+        # {discord_id: (display or None, expires_at)}
+        self._entries: Dict[int, Tuple[Optional[str], float]] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'warmed': 0}
+    
+    def get(self, discord_id: int) -> Tuple[bool, Optional[str]]:
+        """
+        Returns:
+            Tuple[bool, Optional[str]]: (found in cache, display)
+        """
+        entry = self._entries.get(discord_id)
+        if entry and entry[1] > time.monotonic():
+            self._stats['hits'] += 1
+            return True, entry[0]
+        if entry:
+            del self._entries[discord_id]
+        self._stats['misses'] += 1
+        return False, None
+    
+    def set(self, discord_id: int, display: Optional[str]):
+        ttl = self.TTL_SECONDS if display else self.NEGATIVE_TTL_SECONDS
+        self._entries[discord_id] = (display, time.monotonic() + ttl)
+    
+    def invalidate(self, discord_id: int):
+        self._entries.pop(discord_id, None)
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def warm(self, personnel_rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Fill the cache from personnel rows (discord_id, first_name, last_name, static).
+        
+        Returns:
+            int: number of cached moderators
+        """
+        expires_at = time.monotonic() + self.TTL_SECONDS
+        warmed = 0
+        for row in personnel_rows:
+            discord_id = row.get('discord_id')
+            display = format_moderator_display(row.get('first_name'), row.get('last_name'), row.get('static'))
+            if discord_id and display:
+                self._entries[discord_id] = (display, expires_at)
+                warmed += 1
+        self._stats['warmed'] = warmed
+        return warmed
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {'size': len(self._entries), **self._stats}
+
+
+moderator_identity_cache = ModeratorIdentityCache()
+
+
 class PersonnelAuditLogger:
     """
     Centralized personnel audit logger with PostgreSQL integration.
@@ -232,11 +317,15 @@ class PersonnelAuditLogger:
         moderator: discord.User,
         personnel_data: Dict[str, Any],
         config: Optional[Dict] = None,
-        custom_fields: Optional[Dict[str, str]] = None
-    ) -> Optional[str]:
+        custom_fields: Optional[Dict[str, str]] = None,
+        wait: bool = True,
+        merge: bool = False
+    ) -> Optional[Union[str, asyncio.Future]]:
         """
         Send standardized personnel audit notification to audit channel.
         
+        The message is published through audit_outbox, in order with other audit records.
+        
         Args:
             guild: Discord guild where action occurred
             action: Type of action (string from AuditAction or direct action name)
@@ -251,9 +340,13 @@ class PersonnelAuditLogger:
                 - reason: Reason for action (optional, for dismissals/hirings)
             config: Bot configuration (loaded if not provided)
             custom_fields: Additional custom fields to add to embed
+            wait: Wait until the message is posted; if False, return the outbox future
+                right after the record is enqueued
+            merge: Allow merging with neighbouring records into one message (mass operations)
             
         Returns:
             str: Jump URL of audit message if sent successfully, None otherwise
+            (asyncio.Future with the jump URL when wait=False)
         """
         try:
             # Load config if not provided
@@ -298,13 +391,14 @@ class PersonnelAuditLogger:
                     embed.add_field(name=field_name, value=field_value, inline=False)
             
             # Send to audit channel with user mention
-            audit_message = await audit_channel.send(
-                content=f"<@{target_user.id}>",
-                embed=embed
-            )
+            future = audit_outbox.publish(audit_channel, embed, content=f"<@{target_user.id}>", merge=merge)
+            if not wait:
+                logger.info(f"Queued audit notification for {target_user.id} - {personnel_data.get('name')} - {action}")
+                return future
             
+            audit_message_url = await future
             logger.info(f"Sent audit notification for {target_user.id} - {personnel_data.get('name')} - {action}")
-            return audit_message.jump_url
+            return audit_message_url
             
         except Exception as e:
             logger.error("Error sending audit notification: %s", e)
@@ -316,48 +410,47 @@ class PersonnelAuditLogger:
         """
         Get moderator info from PostgreSQL personnel database.
         
+        Served from moderator_identity_cache; the database is queried (off the
+        event loop) only on a cache miss.
+        
         Returns:
             str: "Имя Фамилия | static" or None if not found
         """
+        found, display = moderator_identity_cache.get(moderator_discord_id)
+        if found:
+            return display
+        
         try:
-            from utils.postgresql_pool import get_db_cursor
-            
-            # Query personnel table directly (without is_dismissal check for moderators)
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT 
-                        first_name,
-                        last_name,
-                        static
-                    FROM personnel
-                    WHERE discord_id = %s
-                    ORDER BY id DESC
-                    LIMIT 1;
-                """, (moderator_discord_id,))
-                
-                result = cursor.fetchone()
-                
-                if result:
-                    first_name = result['first_name'] or ''
-                    last_name = result['last_name'] or ''
-                    static = result['static'] or ''
-                    
-                    full_name = f"{first_name} {last_name}".strip()
-                    
-                    if full_name and static:
-                        return f"{full_name} | {static}"
-                    elif full_name:
-                        return full_name
-                    elif static:
-                        return static
-            
-            return None
-            
+            display = await asyncio.to_thread(self._fetch_moderator_display, moderator_discord_id)
         except Exception as e:
             logger.info("Could not get moderator info from personnel DB: %s", e)
-            import traceback
-            traceback.print_exc()
             return None
+        
+        moderator_identity_cache.set(moderator_discord_id, display)
+        return display
+    
+    @staticmethod
+    def _fetch_moderator_display(moderator_discord_id: int) -> Optional[str]:
+        """Query personnel table directly (without is_dismissal check for moderators)"""
+        from utils.postgresql_pool import get_db_cursor
+        
+        with get_db_cursor() as cursor:
+            cursor.execute("""
+                SELECT 
+                    first_name,
+                    last_name,
+                    static
+                FROM personnel
+                WHERE discord_id = %s
+                ORDER BY id DESC
+                LIMIT 1;
+            """, (moderator_discord_id,))
+            
+            result = cursor.fetchone()
+        
+        if not result:
+            return None
+        return format_moderator_display(result['first_name'], result['last_name'], result['static'])
     
     async def _create_base_embed(
         self,
@@ -569,6 +662,8 @@ class PersonnelAuditLogger:
         """
         try:
             from utils.postgresql_pool import get_db_cursor
+            from utils.prepared_statements import execute_prepared
+            from utils.database_manager.statements import PERSONNEL_ID_BY_DISCORD
             from datetime import timedelta
             
             # Load config if not provided
@@ -591,10 +686,7 @@ class PersonnelAuditLogger:
             moderator_personnel_id = None
             try:
                 with get_db_cursor() as cursor:
-                    cursor.execute(
-                        "SELECT id FROM personnel WHERE discord_id = %s;",
-                        (moderator.id,)
-                    )
+                    execute_prepared(cursor, PERSONNEL_ID_BY_DISCORD, (moderator.id,))
                     result = cursor.fetchone()
                     if result:
                         moderator_personnel_id = result['id']
@@ -652,6 +744,9 @@ class PersonnelAuditLogger:
                     
                     blacklist_id = cursor.fetchone()['id']
                     logger.info("Added blacklist record #%s for personnel %s", blacklist_id, personnel_id)
+                
+                from utils.database_manager import personnel_manager
+                personnel_manager.invalidate_blacklist_cache(discord_id=target_user.id)
                     
             except Exception as e:
                 logger.error("Error adding blacklist record to database: %s", e)
@@ -731,13 +826,14 @@ class PersonnelAuditLogger:
             ping_content = " ".join([f"<@&{role_id}>" for role_id in blacklist_ping_roles])
             
             # Send to blacklist channel with pings
-            blacklist_message = await blacklist_channel.send(
-                content="-# " + ping_content if ping_content else None,
-                embed=embed
+            blacklist_message_url = await audit_outbox.publish(
+                blacklist_channel,
+                embed,
+                content="-# " + ping_content if ping_content else None
             )
             
             logger.info("Sent blacklist notification for %s (auto: %s)", name, auto_generated)
-            return blacklist_message.jump_url
+            return blacklist_message_url
             
         except Exception as e:
             logger.error("Error sending blacklist notification: %s", e)
@@ -777,22 +873,13 @@ class PersonnelAuditLogger:
             # Проверяет, есть ли у пользователя какие-либо записи о приеме во фракцию
             # (чтобы избежать ложного черного списка для устаревших пользователей)
             # Фиксит баг с legacy пользователями, у которых нет записей о приеме во фракцию
-            from utils.postgresql_pool import get_db_cursor
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT COUNT(*) as hiring_count 
-                    FROM history 
-                    WHERE personnel_id = %s AND action_id = 10;
-                """, (personnel_id,))
-                hiring_result = cursor.fetchone()
-                has_hiring_records = hiring_result['hiring_count'] > 0 if hiring_result else False
-            
-            if not has_hiring_records:
+            # Период службы и наличие приёма определяются одним запросом
+            service_period = (await personnel_manager.get_current_service_periods([personnel_id])).get(personnel_id)
+            if not service_period:
                 logger.info(f"No hiring records found for {personnel_data.get('name')} - skipping auto-blacklist check")
                 return False
             
-            # Calculate total service time
-            total_days = await personnel_manager.calculate_total_service_time(personnel_id)
+            total_days = service_period['service_days']
             
             # Check if served less than 5 days
             if total_days < 5:
@@ -818,7 +905,7 @@ class PersonnelAuditLogger:
                     logger.info(f"Auto-blacklist successful for {personnel_data.get('name')}")
                     # Invalidate cache for this user
                     from utils.database_manager import personnel_manager
-                    personnel_manager.invalidate_blacklist_cache(target_user.id)
+                    personnel_manager.invalidate_blacklist_cache(discord_id=target_user.id)
                     # Also invalidate general user cache since blacklist status changed
                     from utils.user_cache import invalidate_user_cache
                     invalidate_user_cache(target_user.id)
@@ -1091,9 +1178,10 @@ class PersonnelAuditLogger:
             ping_content = " ".join([f"<@&{role_id}>" for role_id in blacklist_ping_roles])
             
             # Send to blacklist channel
-            blacklist_message = await blacklist_channel.send(
-                content="-# " + ping_content if ping_content else None,
-                embed=embed
+            blacklist_message_url = await audit_outbox.publish(
+                blacklist_channel,
+                embed,
+                content="-# " + ping_content if ping_content else None
             )
             
             success_message = (
@@ -1104,7 +1192,7 @@ class PersonnelAuditLogger:
                     end_date=end_date_str,
                     moderator=moderator.display_name
                 ) + "\n\n" +
-                blacklist_config['success']['view_link'].format(link=blacklist_message.jump_url)
+                blacklist_config['success']['view_link'].format(link=blacklist_message_url)
             )
             
             logger.info(f"Manual blacklist successful for {personnel_data['name']}")
@@ -1180,6 +1268,8 @@ class PersonnelAuditLogger:
 
             # Get current data for comparison
             from utils.postgresql_pool import get_db_cursor
+            from utils.prepared_statements import execute_prepared
+            from utils.database_manager.statements import ACTIVE_PERSONNEL_ID_BY_DISCORD
             with get_db_cursor() as cursor:
                 cursor.execute("""
                     SELECT first_name, last_name, static
@@ -1211,12 +1301,11 @@ class PersonnelAuditLogger:
             if not success:
                 return False, message
             logger.info("AUDIT: UPDATE personnel завершен")
+            moderator_identity_cache.invalidate(discord_id)
 
             # Get personnel_id for the user being updated
             with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT id FROM personnel WHERE discord_id = %s AND is_dismissal = false;
-                """, (discord_id,))
+                execute_prepared(cursor, ACTIVE_PERSONNEL_ID_BY_DISCORD, (discord_id,))
                 personnel_result = cursor.fetchone()
                 
             if not personnel_result:
@@ -0,0 +1,319 @@
+"""
+Audit Outbox
+
+Очередь публикации сообщений аудита (кадровый аудит, чёрный список, административные действия).
+
+Вызывающий код ставит запись в очередь и получает future с jump URL сообщения, поэтому
+подтверждение модератору не ждёт отправки в канал.
+
+Features:
+- Один воркер на канал - сообщения публикуются строго в порядке постановки
+- Повторы при 429/5xx с паузой, остальные ошибки завершают запись
+- Записи с merge=True, стоящие в очереди подряд, объединяются в одно сообщение
+  (до 10 эмбедов) - для массовых операций
+- Записи с persist=True сохраняются на диск (отложенным снимком) и отправляются после перезапуска
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import discord
+from utils.logging_setup import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+AUDIT_OUTBOX_FILE = 'data/audit_outbox.json'
+
+# Лимиты Discord на одно сообщение
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_CONTENT_LENGTH = 2000
+
+
+class _AuditRecord:
+    """Одна запись аудита в очереди"""
+
+    __slots__ = ('record_id', 'channel_id', 'content', 'embed', 'merge', 'persist', 'future')
+
+    def __init__(self, record_id: int, channel_id: int, content: Optional[str], embed: discord.Embed,
+                 merge: bool, persist: bool, future: asyncio.Future):
+        self.record_id = record_id
+        self.channel_id = channel_id
+        self.content = content
+        self.embed = embed
+        self.merge = merge
+        self.persist = persist
+        self.future = future
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'record_id': self.record_id,
+            'channel_id': self.channel_id,
+            'content': self.content,
+            'embed': self.embed.to_dict(),
+            'merge': self.merge,
+        }
+
+
+class _ChannelState:
+    """Очередь и воркер одного канала"""
+
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        self.pending: Deque[_AuditRecord] = deque()
+        self.worker: Optional[asyncio.Task] = None
+
+
+class AuditOutbox:
+    """Упорядоченная публикация сообщений аудита"""
+
+    # Задержка сохранения снимка очереди, секунд
+    SNAPSHOT_DELAY = 1.0
+
+    def __init__(self, snapshot_file: Optional[str] = AUDIT_OUTBOX_FILE, max_attempts: int = 5):
+        self.snapshot_file = snapshot_file
+        self.max_attempts = max_attempts
+
+        self._channels: Dict[int, _ChannelState] = {}
+        self._sequence = itertools.count(int(time.time() * 1000))
+        # Записи, которые должны пережить перезапуск: {record_id: record}
+        self._persisted: Dict[int, _AuditRecord] = {}
+        # Неотправленные записи прошлого запуска (до restore): остаются в снимке,
+        # даже если новые записи публикуются раньше восстановления
+        self._carried: List[Dict[str, Any]] = []
+        self._snapshot_loaded = False
+        self._restored = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        # Статистика очереди
+        self._stats = {
+            'enqueued': 0,
+            'messages_sent': 0,
+            'records_sent': 0,
+            'merged': 0,
+            'retried': 0,
+            'failed': 0,
+            'restored': 0,
+        }
+
+    def publish(self, channel: discord.abc.Messageable, embed: discord.Embed, content: Optional[str] = None,
+                merge: bool = False, persist: bool = True) -> asyncio.Future:
+        """
+        Поставить сообщение аудита в очередь канала
+
+        Args:
+            channel: Канал аудита
+            embed: Эмбед записи
+            content: Текст сообщения (упоминания)
+            merge: Разрешить объединение с соседними записями в одно сообщение
+            persist: Сохранить запись на диск до отправки
+
+        Returns:
+            asyncio.Future: jump URL опубликованного сообщения (или исключение отправки)
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(self._log_failure)
+        record = _AuditRecord(next(self._sequence), channel.id, content, embed, merge, persist, future)
+        self._enqueue(channel, record)
+        return future
+
+    def _enqueue(self, channel: discord.abc.Messageable, record: _AuditRecord):
+        state = self._channels.get(channel.id)
+        if state is None:
+            state = self._channels[channel.id] = _ChannelState(channel)
+        state.pending.append(record)
+        self._stats['enqueued'] += 1
+
+        if record.persist:
+            self._load_snapshot()
+            self._persisted[record.record_id] = record
+            self._schedule_snapshot()
+
+        if state.worker is None or state.worker.done():
+            state.worker = asyncio.create_task(self._channel_worker(state))
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future):
+        """Забрать исключение, если результат никто не ждёт"""
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning("Сообщение аудита не опубликовано: %s", future.exception())
+
+    def _take_batch(self, state: _ChannelState) -> List[_AuditRecord]:
+        """Следующая запись и, если разрешено, идущие за ней объединяемые записи"""
+        first = state.pending.popleft()
+        batch = [first]
+        if not first.merge:
+            return batch
+
+        embed_chars = len(first.embed)
+        content_parts = [first.content] if first.content else []
+        while state.pending and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            candidate = state.pending[0]
+            if not candidate.merge:
+                break
+            if embed_chars + len(candidate.embed) > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            parts = content_parts
+            if candidate.content and candidate.content not in content_parts:
+                parts = content_parts + [candidate.content]
+            if len(" ".join(parts)) > MAX_CONTENT_LENGTH:
+                break
+            batch.append(state.pending.popleft())
+            embed_chars += len(candidate.embed)
+            content_parts = parts
+        return batch
+
+    async def _channel_worker(self, state: _ChannelState):
+        """Воркер канала: отправляет записи по одной (или пачкой), пока очередь не опустеет"""
+        while state.pending:
+            batch = self._take_batch(state)
+            try:
+                jump_url = await self._send_batch(state.channel, batch)
+            except Exception as e:
+                self._stats['failed'] += len(batch)
+                self._finish(batch, error=e)
+            else:
+                self._stats['messages_sent'] += 1
+                self._stats['records_sent'] += len(batch)
+                if len(batch) > 1:
+                    self._stats['merged'] += len(batch)
+                self._finish(batch, result=jump_url)
+
+        if self._channels.get(state.channel.id) is state and not state.pending:
+            self._channels.pop(state.channel.id, None)
+
+    async def _send_batch(self, channel: discord.abc.Messageable, batch: List[_AuditRecord]) -> str:
+        """Отправить сообщение с повторами при 429/5xx"""
+        content_parts = []
+        for record in batch:
+            if record.content and record.content not in content_parts:
+                content_parts.append(record.content)
+        content = " ".join(content_parts) or None
+        embeds = [record.embed for record in batch]
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                message = await channel.send(content=content, embeds=embeds)
+                return message.jump_url
+            except discord.RateLimited as e:
+                delay = e.retry_after
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    raise
+                delay = getattr(e, 'retry_after', None) or min(2 ** attempt, 30)
+
+            if attempt >= self.max_attempts:
+                raise RuntimeError(f"Не удалось отправить сообщение аудита после {attempt} попыток")
+            self._stats['retried'] += 1
+            logger.info("Повтор отправки аудита в канал %s через %.1f сек (попытка %s)",
+                        channel.id, delay, attempt + 1)
+            await asyncio.sleep(delay)
+
+    def _finish(self, batch: List[_AuditRecord], result: Optional[str] = None, error: Optional[Exception] = None):
+        persisted_changed = False
+        for record in batch:
+            if self._persisted.pop(record.record_id, None) is not None:
+                persisted_changed = True
+            if record.future.done():
+                continue
+            if error is not None:
+                record.future.set_exception(error)
+            else:
+                record.future.set_result(result)
+        if persisted_changed:
+            self._schedule_snapshot()
+
+    def _load_snapshot(self):
+        """Прочитать записи прошлого запуска (один раз, до первой перезаписи снимка)"""
+        if self._snapshot_loaded:
+            return
+        self._snapshot_loaded = True
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                self._carried = list(json.load(f).get('records', []))
+        except Exception as e:
+            logger.warning("AUDIT OUTBOX: Ошибка чтения очереди аудита: %s", e)
+
+    def _schedule_snapshot(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.SNAPSHOT_DELAY, self.flush)
+
+    def flush(self) -> bool:
+        """Атомарно сохранить неотправленные записи (прошлого и текущего запуска)"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self.snapshot_file or not self._snapshot_loaded:
+            return False
+        data = {'records': self._carried + [record.to_dict() for record in self._persisted.values()]}
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_file), exist_ok=True)
+            tmp_path = f"{self.snapshot_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_file)
+            return True
+        except Exception as e:
+            logger.warning("AUDIT OUTBOX: Ошибка сохранения очереди аудита: %s", e)
+            return False
+
+    async def restore(self, bot: discord.Client) -> int:
+        """
+        Поставить в очередь записи, не отправленные до перезапуска
+
+        Returns:
+            int: количество восстановленных записей
+        """
+        if self._restored or not self.snapshot_file:
+            return 0
+        self._restored = True
+
+        self._load_snapshot()
+        records, self._carried = self._carried, []
+
+        restored = 0
+        for data in records:
+            channel = bot.get_channel(data.get('channel_id'))
+            if channel is None:
+                logger.warning("AUDIT OUTBOX: Канал %s не найден, запись аудита пропущена", data.get('channel_id'))
+                continue
+            try:
+                embed = discord.Embed.from_dict(data['embed'])
+            except Exception as e:
+                logger.warning("AUDIT OUTBOX: Повреждённая запись аудита пропущена: %s", e)
+                continue
+            self.publish(channel, embed, content=data.get('content'), merge=data.get('merge', False))
+            restored += 1
+
+        self._stats['restored'] += restored
+        # Восстановленные записи снова в _persisted, пропущенные больше не нужны
+        self._schedule_snapshot()
+        if restored:
+            logger.info("AUDIT OUTBOX: Восстановлено %s неотправленных записей аудита", restored)
+        return restored
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика очереди"""
+        stats = dict(self._stats)
+        stats['pending'] = sum(len(state.pending) for state in self._channels.values())
+        stats['persisted'] = len(self._persisted)
+        return stats
+
+
+# Глобальный экземпляр очереди аудита
+audit_outbox = AuditOutbox()
@@ -16,6 +16,9 @@ CONFIG_FILE = 'data/config.json'
 BACKUP_DIR = 'data/backups'
 TEMP_CONFIG_FILE = 'data/config.json.tmp'
 
+# Счётчик сохранений конфигурации в этом процессе (см. get_config_version)
+_config_generation = 0
+
 default_config = {
     'dismissal_channel': None,
     'dismissal_message_id': None,  # ID of the pinned message with dismissal buttons
@@ -259,6 +262,7 @@ def restore_from_backup(backup_filename: str) -> bool:
         
         # Copy backup to main config
         shutil.copy2(backup_path, CONFIG_FILE)
+        _bump_config_generation()
         logger.info("Configuration restored from: %s", backup_filename)
         return True
         
@@ -292,6 +296,7 @@ def safe_save_config(config: Dict[Any, Any]) -> bool:
             create_backup("replaced")
         
         shutil.move(TEMP_CONFIG_FILE, CONFIG_FILE)
+        _bump_config_generation()
         logger.info("Configuration saved successfully")
         return True
         
@@ -307,6 +312,23 @@ def safe_save_config(config: Dict[Any, Any]) -> bool:
         
         return False
 
+def _bump_config_generation():
+    global _config_generation
+    _config_generation += 1
+
+def get_config_version() -> tuple:
+    """
+    Cheap configuration version for caches derived from the config.
+
+    Changes whenever the config is saved by this process or the file is modified
+    on disk, without reading or parsing the file (a single stat call).
+    """
+    try:
+        stat = os.stat(CONFIG_FILE)
+        return (_config_generation, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return (_config_generation, None, None)
+
 def load_config() -> Dict[Any, Any]:
     """Load configuration from JSON file with recovery capabilities."""
     try:
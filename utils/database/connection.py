@@ -1,102 +1,129 @@
 """
 Database connection management for PostgreSQL
-Simplified version using only SQLAlchemy
+SQLAlchemy models on top of the shared connection pool (utils.postgresql_pool)
 """
 import asyncio
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import declarative_base
-from sqlalchemy import text
-import os
-from typing import Optional
-from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy.pool import NullPool
+from utils.postgresql_pool import get_connection_pool
 from utils.logging_setup import get_logger
 
 # Initialize logger
 logger = get_logger(__name__)
 
-# Загружаем переменные окружения
-load_dotenv()
-
 # SQLAlchemy Base for models
 Base = declarative_base()
 
+
+class SharedPool(NullPool):
+    """SQLAlchemy pool that borrows connections from the shared psycopg2 pool
+
+    SQLAlchemy keeps no connections of its own: a checkout takes a connection
+    from the shared pool and closing it returns the connection there.
+    """
+
+    def _close_connection(self, connection, *, terminate: bool = False) -> None:
+        get_connection_pool().release(connection, close=terminate)
+
+
+class PooledSession:
+    """Async interface of a SQLAlchemy session; queries run in a worker thread"""
+
+    def __init__(self, session: Session):
+        self._session = session
+
+    async def __aenter__(self) -> "PooledSession":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.to_thread(self._session.close)
+
+    def add(self, instance):
+        self._session.add(instance)
+
+    async def execute(self, *args, **kwargs):
+        return await asyncio.to_thread(self._session.execute, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await asyncio.to_thread(self._session.get, *args, **kwargs)
+
+    async def flush(self):
+        await asyncio.to_thread(self._session.flush)
+
+    async def commit(self):
+        await asyncio.to_thread(self._session.commit)
+
+    async def rollback(self):
+        await asyncio.to_thread(self._session.rollback)
+
+
 class DatabaseConnection:
-    """Manages database connection using SQLAlchemy only"""
-    
+    """Manages SQLAlchemy access through the shared connection pool"""
+
     def __init__(self):
         self.engine = None
         self.session_factory = None
-        
-        # PostgreSQL configuration from environment variables
-        self.host = os.getenv('POSTGRES_HOST', '127.0.0.1')
-        self.port = os.getenv('POSTGRES_PORT', '5432')
-        self.database = os.getenv('POSTGRES_DB', 'postgres')
-        self.username = os.getenv('POSTGRES_USER', 'postgres')
-        self.password = os.getenv('POSTGRES_PASSWORD', 'simplepassword')
-        
-        # Build connection URL (using asyncpg with direct IP)
-        # Use direct IP to avoid DNS issues
-        direct_host = "127.0.0.1" if self.host in ["localhost", "127.0.0.1"] else self.host
-        self.async_url = f"postgresql+asyncpg://{self.username}:{self.password}@{direct_host}:{self.port}/{self.database}"
-        logger.info(f"Using PostgreSQL database: {self.database}@{self.host}")
-    
+
     async def initialize(self) -> bool:
         """Initialize database connections"""
         try:
             logger.info("Initializing PostgreSQL connections...")
-            
-            # Create SQLAlchemy async engine
-            self.engine = create_async_engine(
-                self.async_url,
-                echo=False,  # Set to True for SQL debugging
-                pool_size=10,
-                max_overflow=20,
-                pool_recycle=3600,  # Recycle connections every hour
-                pool_pre_ping=True   # Validate connections before use
+            pool = get_connection_pool()
+
+            # Connections, limits and statistics come from the shared pool
+            self.engine = create_engine(
+                "postgresql+psycopg2://",
+                creator=lambda: pool.acquire(orm=True),
+                poolclass=SharedPool,
+                use_native_hstore=False,  # avoid a type lookup on every checkout
+                echo=False  # Set to True for SQL debugging
             )
-            
+
             # Create session factory
-            self.session_factory = async_sessionmaker(
+            self.session_factory = sessionmaker(
                 bind=self.engine,
-                class_=AsyncSession,
                 expire_on_commit=False
             )
-            
+
             # Test connection
             await self.test_connection()
             logger.info("PostgreSQL connections initialized successfully!")
             return True
-            
+
         except Exception as e:
             logger.warning("Failed to initialize PostgreSQL connections: %s", e)
             return False
-    
+
+    def _test_connection_sync(self):
+        with self.engine.connect() as conn:
+            value = conn.execute(text("SELECT 1 as test")).scalar()
+            if value != 1:
+                raise Exception("Database connection test failed")
+
     async def test_connection(self):
         """Test database connection"""
         try:
-            async with self.engine.begin() as conn:
-                result = await conn.execute(text("SELECT 1 as test"))
-                value = result.scalar()
-                if value != 1:
-                    raise Exception("Database connection test failed")
-                logger.info("PostgreSQL connection test passed")
+            await asyncio.to_thread(self._test_connection_sync)
+            logger.info("PostgreSQL connection test passed")
         except Exception as e:
             logger.warning("Connection test failed: %s", e)
             raise
-    
-    def get_session(self) -> AsyncSession:
+
+    def get_session(self) -> PooledSession:
         """Get async SQLAlchemy session"""
         if not self.session_factory:
             raise Exception("Database not initialized")
-        return self.session_factory()
-    
+        return PooledSession(self.session_factory())
+
     async def close(self):
         """Close all database connections"""
         try:
             if self.engine:
-                await self.engine.dispose()
+                # Connections belong to the shared pool, which is closed separately (close_pool)
+                self.engine.dispose()
                 logger.info("SQLAlchemy engine disposed")
-                
+
         except Exception as e:
             logger.warning("Error closing database connections: %s", e)
 
@@ -108,4 +135,4 @@ async def get_database_connection():
     """Get database engine for compatibility with existing code"""
     if not db_connection.engine:
         await db_connection.initialize()
-    return db_connection.engine
\ No newline at end of file
+    return db_connection.engine
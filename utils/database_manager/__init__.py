@@ -9,5 +9,7 @@ from .manager import PersonnelManager, personnel_manager
 from .department import DepartmentOperations
 from .rank_manager import RankManager, rank_manager
 from .position_service import PositionService, position_service
+from .unit_of_work import PersonnelUnitOfWork, personnel_transaction
 
-__all__ = ['PersonnelManager', 'personnel_manager', 'DepartmentOperations', 'RankManager', 'rank_manager', 'PositionService', 'position_service']
+__all__ = ['PersonnelManager', 'personnel_manager', 'DepartmentOperations', 'RankManager', 'rank_manager', 'PositionService', 'position_service',
+           'PersonnelUnitOfWork', 'personnel_transaction']
@@ -0,0 +1,149 @@
+"""
+Active Blacklist Index
+
+Индекс активных записей чёрного списка в памяти.
+
+Активных записей немного, и меняются они редко, поэтому индекс загружается целиком
+одним запросом и проверка ЧС сводится к поиску в словаре по static (Discord ID
+сначала приводится к текущему static участника).
+Каждая запись действует до своей end_date: истёкшие записи отбрасываются при обращении,
+без периодического опроса. Индекс перечитывается после изменений ЧС
+(invalidate) и не реже раза в FULL_RELOAD_INTERVAL на случай правок в обход бота.
+"""
+
+import asyncio
+import time
+from datetime import date, datetime, time as dt_time
+from typing import Any, Dict, List, Optional
+
+from ..postgresql_pool import get_db_cursor
+from ..prepared_statements import execute_prepared
+from .statements import ACTIVE_BLACKLIST, STATIC_BY_DISCORD
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Полная перезагрузка индекса (секунды)
+FULL_RELOAD_INTERVAL = 600
+
+
+def _expires_at(end_date: Any) -> Optional[float]:
+    """Момент окончания записи (timestamp) или None для бессрочной"""
+    if end_date is None:
+        return None
+    if isinstance(end_date, datetime):
+        return end_date.timestamp()
+    if isinstance(end_date, date):
+        # Дата окончания: запись активна, пока сегодня < end_date
+        return datetime.combine(end_date, dt_time.min).timestamp()
+    return None
+
+
+class ActiveBlacklistIndex:
+    """Активные записи ЧС по static"""
+
+    def __init__(self):
+        # static -> записи static, новые первыми (по start_date)
+        self._by_static: Dict[str, List[Dict[str, Any]]] = {}
+        self._generation = 0
+        self._loaded_generation: Optional[int] = None
+        self._loaded_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _is_stale(self) -> bool:
+        return (self._loaded_generation != self._generation
+                or time.monotonic() - self._loaded_at > FULL_RELOAD_INTERVAL)
+
+    def invalidate(self):
+        """Пометить индекс устаревшим; он будет перечитан при следующей проверке"""
+        self._generation += 1
+
+    @staticmethod
+    def _fetch_active() -> List[Dict[str, Any]]:
+        with get_db_cursor() as cursor:
+            execute_prepared(cursor, ACTIVE_BLACKLIST)
+            return cursor.fetchall()
+
+    @staticmethod
+    def _fetch_static(discord_id: int) -> Optional[str]:
+        with get_db_cursor() as cursor:
+            execute_prepared(cursor, STATIC_BY_DISCORD, (discord_id,))
+            row = cursor.fetchone()
+            return row['static'] if row and row['static'] else None
+
+    async def _ensure_loaded(self):
+        if not self._is_stale():
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._is_stale():
+                return
+            generation = self._generation
+            rows = await asyncio.to_thread(self._fetch_active)
+
+            by_static: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                entry = {
+                    'id': row['id'],
+                    'reason': row['reason'],
+                    'start_date': row['start_date'],
+                    'end_date': row['end_date'],
+                    'full_name': f"{row['first_name']} {row['last_name']}".strip(),
+                    'static': row['static'],
+                    'expires_at': _expires_at(row['end_date']),
+                }
+                if row['static']:
+                    by_static.setdefault(row['static'], []).append(entry)
+
+            self._by_static = by_static
+            # Изменение ЧС во время загрузки оставит индекс устаревшим
+            self._loaded_generation = generation
+            self._loaded_at = time.monotonic()
+            logger.info("Blacklist index loaded: %s active entries", len(rows))
+
+    @staticmethod
+    def _first_active(entries: Optional[List[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Самая новая действующая запись; истёкшие удаляются из списка"""
+        if not entries:
+            return None
+        now = time.time()
+        entries[:] = [entry for entry in entries if entry['expires_at'] is None or entry['expires_at'] > now]
+        return entries[0] if entries else None
+
+    async def lookup(self, static_or_discord: Any) -> Optional[Dict[str, Any]]:
+        """
+        Активная запись ЧС по static (str) или discord_id (int)
+
+        Discord ID приводится к текущему static участника: запись ЧС действует
+        на static, даже если участник сменил Discord-аккаунт.
+
+        Returns:
+            Optional[Dict]: id, reason, start_date, end_date, full_name, static
+
+        Raises:
+            Exception: при недоступности БД во время загрузки индекса
+        """
+        if static_or_discord is None:
+            return None
+        await self._ensure_loaded()
+
+        if isinstance(static_or_discord, int):
+            static = await asyncio.to_thread(self._fetch_static, static_or_discord)
+        else:
+            static = str(static_or_discord).strip()
+
+        entry = self._first_active(self._by_static.get(static)) if static else None
+        if not entry:
+            return None
+        return {key: entry[key] for key in ('id', 'reason', 'start_date', 'end_date', 'full_name', 'static')}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'statics': len(self._by_static),
+            'stale': self._is_stale(),
+        }
+
+
+# Глобальный экземпляр
+blacklist_index = ActiveBlacklistIndex()
@@ -8,6 +8,8 @@ import logging
 from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timezone, timedelta
 from ..postgresql_pool import get_db_cursor
+from ..prepared_statements import execute_prepared
+from .statements import PERSONNEL_ID_BY_DISCORD
 from utils.logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -240,9 +242,7 @@ class DepartmentOperations:
         try:
             with get_db_cursor() as cursor:
                 # Get moderator personnel ID
-                cursor.execute("""
-                    SELECT id FROM personnel WHERE discord_id = %s;
-                """, (moderator_discord_id,))
+                execute_prepared(cursor, PERSONNEL_ID_BY_DISCORD, (moderator_discord_id,))
                 moderator_result = cursor.fetchone()
                 
                 if not moderator_result:
@@ -0,0 +1,135 @@
+"""
+Hot Path Indexes
+
+Индексы для частых запросов к кадровым таблицам.
+
+Индексы создаются при старте бота через CREATE INDEX CONCURRENTLY (без блокировки записи),
+поэтому повторный запуск дешёв: существующие индексы пропускаются, а невалидные
+(оставшиеся после прерванного CONCURRENTLY) пересоздаются.
+Планы запросов проверяются тестом tests/test_query_plans.py.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from ..postgresql_pool import get_db_connection
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Фоновая задача создания индексов (start_hot_path_indexes)
+_index_task: Optional[asyncio.Task] = None
+
+# Расширение для триграммных индексов (поиск ILIKE '%...%')
+TRIGRAM_EXTENSION_SQL = "CREATE EXTENSION IF NOT EXISTS pg_trgm;"
+
+# (имя индекса, определение после "ON")
+HOT_PATH_INDEXES: List[Tuple[str, str]] = [
+    # Поиск действующего сотрудника по Discord ID (WHERE discord_id = %s AND is_dismissal = false)
+    ('idx_personnel_active_discord_id', "personnel (discord_id) WHERE is_dismissal = false"),
+    # Последняя запись по Discord ID без учёта увольнения (ORDER BY id DESC LIMIT 1)
+    ('idx_personnel_discord_id', "personnel (discord_id, id DESC)"),
+    ('idx_personnel_static', "personnel (static)"),
+    # История по сотруднику и типу действия (приём/увольнение/период службы)
+    ('idx_history_personnel_action_date', "history (personnel_id, action_id, action_date DESC)"),
+    # Последний приём на службу (action_id = 10) для расчёта периода службы
+    ('idx_history_hiring_personnel_date', "history (personnel_id, action_date DESC) WHERE action_id = 10"),
+    ('idx_employees_personnel_id', "employees (personnel_id)"),
+]
+
+# Триграммные индексы для ILIKE по справочникам (требуют pg_trgm)
+TRIGRAM_INDEXES: List[Tuple[str, str]] = [
+    ('idx_positions_name_trgm', "positions USING gin (name gin_trgm_ops)"),
+    ('idx_subdivisions_name_trgm', "subdivisions USING gin (name gin_trgm_ops)"),
+    ('idx_subdivisions_abbreviation_trgm', "subdivisions USING gin (abbreviation gin_trgm_ops)"),
+]
+
+
+def _create_index(cursor, name: str, definition: str, concurrently: bool = True) -> str:
+    """
+    Создать индекс, если его нет или он невалиден
+
+    Returns:
+        str: 'created', 'exists'
+    """
+    cursor.execute(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s);",
+        (name,)
+    )
+    row = cursor.fetchone()
+    if row and row[0]:
+        return 'exists'
+
+    mode = "CONCURRENTLY " if concurrently else ""
+    if row:
+        logger.warning("Индекс %s невалиден, пересоздаём", name)
+        cursor.execute(f"DROP INDEX {mode}IF EXISTS {name};")
+    cursor.execute(f"CREATE INDEX {mode}IF NOT EXISTS {name} ON {definition};")
+    return 'created'
+
+
+def apply_hot_path_indexes(concurrently: bool = True) -> Dict[str, str]:
+    """
+    Создать индексы частых запросов (синхронно, вызывать вне event loop)
+
+    Args:
+        concurrently: CREATE INDEX CONCURRENTLY (без блокировки записи в таблицы)
+
+    Returns:
+        Dict[str, str]: имя индекса -> 'created' / 'exists' / 'skipped' / 'failed'
+    """
+    results = {}
+    with get_db_connection() as conn:
+        previous_autocommit = conn.autocommit
+        # CONCURRENTLY нельзя выполнять внутри транзакции
+        conn.rollback()
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                indexes = list(HOT_PATH_INDEXES)
+                try:
+                    cursor.execute(TRIGRAM_EXTENSION_SQL)
+                    indexes.extend(TRIGRAM_INDEXES)
+                except Exception as e:
+                    logger.warning("Расширение pg_trgm недоступно, триграммные индексы пропущены: %s", e)
+                    results.update({name: 'skipped' for name, _ in TRIGRAM_INDEXES})
+
+                for name, definition in indexes:
+                    try:
+                        results[name] = _create_index(cursor, name, definition, concurrently)
+                    except Exception as e:
+                        logger.error("Ошибка создания индекса %s: %s", name, e)
+                        results[name] = 'failed'
+        finally:
+            conn.autocommit = previous_autocommit
+
+    created = [name for name, status in results.items() if status == 'created']
+    if created:
+        logger.info("Созданы индексы частых запросов: %s", ", ".join(created))
+    return results
+
+
+async def _apply_hot_path_indexes_task():
+    try:
+        results = await asyncio.to_thread(apply_hot_path_indexes)
+        failed = [name for name, status in results.items() if status == 'failed']
+        if failed:
+            logger.warning("Индексы частых запросов проверены, ошибки: %s", ", ".join(failed))
+        else:
+            logger.info("Индексы частых запросов проверены (%s)", len(results))
+    except Exception as e:
+        logger.error("Ошибка создания индексов частых запросов: %s", e)
+
+
+def start_hot_path_indexes():
+    """
+    Создать индексы частых запросов в фоне
+
+    CREATE INDEX CONCURRENTLY ждёт завершения открытых транзакций и на большой
+    таблице history может идти минуты, поэтому запуск бота его не ждёт.
+    Повторный вызов, пока задача выполняется, ничего не делает.
+    """
+    global _index_task
+    if _index_task and not _index_task.done():
+        return
+    _index_task = asyncio.create_task(_apply_hot_path_indexes_task())
@@ -12,6 +12,10 @@ from typing import Optional, Dict, Any, List, Tuple
 import logging
 from ..postgresql_pool import get_db_cursor, get_connection_pool
 from ..user_cache import invalidate_user_cache
+from ..prepared_statements import execute_prepared
+from .blacklist_index import blacklist_index
+from .unit_of_work import personnel_transaction
+from .statements import ALL_ACTIVE_PERSONNEL, PERSONNEL_ID_BY_DISCORD, PERSONNEL_SUMMARY
 from utils.logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -45,25 +49,31 @@ class PersonnelManager:
             
             # Only military recruits go to database
             if application_type == "military":
-                # Step 1: Ensure personnel record exists
-                personnel_id, personnel_created = await self._ensure_personnel_record(application_data, user_discord_id)
-                if not personnel_id:
-                    return False, "Не удалось создать запись в таблице personnel"
-                
-                # Step 2: Create employee record
-                employee_created = await self._create_employee_record(
-                    personnel_id, 
-                    application_data, 
-                    moderator_info
-                )
-                if employee_created:
-                    status_msg = f"Создана запись военнослужащего (Personnel: {'создан' if personnel_created else 'обновлен'}, Employee: создан)"
-                else:
-                    status_msg = f"Personnel {'создан' if personnel_created else 'обновлен'}, но не удалось создать Employee запись"
-                
-                # Step 3: Log the approval action
-                await self._log_approval_action(personnel_id, application_data, moderator_discord_id, moderator_info)
+                # Personnel, employee and history records are written in one transaction
+                with personnel_transaction() as uow:
+                    # Step 1: Ensure personnel record exists
+                    personnel_id, personnel_created = await self._ensure_personnel_record(application_data, user_discord_id, uow.cursor)
+                    if not personnel_id:
+                        uow.abort(f"personnel record not created for {user_discord_id}")
+                        return False, "Не удалось создать запись в таблице personnel"
+                    
+                    # Step 2: Create employee record
+                    employee_created = await self._create_employee_record(
+                        personnel_id, 
+                        application_data, 
+                        moderator_info,
+                        uow.cursor
+                    )
+                    if employee_created:
+                        status_msg = f"Создана запись военнослужащего (Personnel: {'создан' if personnel_created else 'обновлен'}, Employee: создан)"
+                    else:
+                        status_msg = f"Personnel {'создан' if personnel_created else 'обновлен'}, но не удалось создать Employee запись"
+                    
+                    # Step 3: Log the approval action
+                    await self._log_approval_action(personnel_id, application_data, moderator_discord_id, moderator_info, uow.cursor)
                 
+                invalidate_user_cache(user_discord_id)
+                logger.info("CACHE INVALIDATE: Personnel record updated for user %s", user_discord_id)
                 return True, status_msg
                     
             elif application_type == "civilian":
@@ -87,7 +97,7 @@ class PersonnelManager:
             logger.error(f"process_role_application_approval failed: {e}")
             return False, error_msg
     
-    async def _ensure_personnel_record(self, application_data: Dict, user_discord_id: int) -> Tuple[Optional[int], bool]:
+    async def _ensure_personnel_record(self, application_data: Dict, user_discord_id: int, cursor) -> Tuple[Optional[int], bool]:
         """
         Ensure personnel record exists, create if needed
         
@@ -95,23 +105,20 @@ class PersonnelManager:
             Tuple[Optional[int], bool]: (personnel_id, was_created)
         """
         try:
-            with get_db_cursor() as cursor:
-                # Check if personnel record exists
-                cursor.execute("""
-                    SELECT id FROM personnel WHERE discord_id = %s;
-                """, (user_discord_id,))
-                existing = cursor.fetchone()
+            # Check if personnel record exists
+            execute_prepared(cursor, PERSONNEL_ID_BY_DISCORD, (user_discord_id,))
+            existing = cursor.fetchone()
+            
+            if existing:
+                # Update existing record
+                personnel_id = existing['id']
+                await self._update_personnel_record(personnel_id, application_data, cursor)
+                return personnel_id, False
+            else:
+                # Create new personnel record
+                personnel_id = await self._create_personnel_record(application_data, user_discord_id, cursor)
+                return personnel_id, True
                 
-                if existing:
-                    # Update existing record
-                    personnel_id = existing['id']
-                    await self._update_personnel_record(personnel_id, application_data, cursor)
-                    return personnel_id, False
-                else:
-                    # Create new personnel record
-                    personnel_id = await self._create_personnel_record(application_data, user_discord_id, cursor)
-                    return personnel_id, True
-                    
         except Exception as e:
             logger.error(f"_ensure_personnel_record failed: {e}")
             return None, False
@@ -194,101 +201,92 @@ class PersonnelManager:
             """, (first_name, last_name, static_id, datetime.now().date(), datetime.now(timezone.utc), personnel_id))
             
             logger.info("Обновлена запись personnel: %s %s (ID: %s)", first_name, last_name, personnel_id)
-            
-            # Get discord_id for cache invalidation
-            cursor.execute("SELECT discord_id FROM personnel WHERE id = %s;", (personnel_id,))
-            result = cursor.fetchone()
-            if result:
-                discord_id = result['discord_id']
-                # Lazy import to avoid circular dependency
-                from ..user_cache import invalidate_user_cache
-                invalidate_user_cache(discord_id)
-                logger.info("CACHE INVALIDATE: Personnel record updated for user %s", discord_id)
+            # static мог измениться при повторном приёме
+            blacklist_index.invalidate()
             
         except Exception as e:
             logger.error(f"_update_personnel_record failed: {e}")
     
-    async def _create_employee_record(self, personnel_id: int, application_data: Dict, moderator_info: str) -> bool:
+    async def _create_employee_record(self, personnel_id: int, application_data: Dict, moderator_info: str, cursor) -> bool:
         """Create employee record for military personnel"""
         try:
-            with get_db_cursor() as cursor:
-                # Check if employee record already exists
-                cursor.execute("""
-                    SELECT id FROM employees WHERE personnel_id = %s;
-                """, (personnel_id,))
-                existing = cursor.fetchone()
-                
-                if existing:
-                    logger.info("Employee запись уже существует для personnel_id %s", personnel_id)
-                    return True
-                
-                # Get rank ID
-                rank_name = application_data.get("rank", "Рядовой")
-                rank_id = await self._get_or_create_rank_id(rank_name, cursor)
+            # Check if employee record already exists
+            cursor.execute("""
+                SELECT id FROM employees WHERE personnel_id = %s;
+            """, (personnel_id,))
+            existing = cursor.fetchone()
+            
+            if existing:
+                logger.info("Employee запись уже существует для personnel_id %s", personnel_id)
+                return True
+            
+            # Get rank ID
+            rank_name = application_data.get("rank", "Рядовой")
+            rank_id = await self._get_or_create_rank_id(rank_name, cursor)
 
-                # Получаем ID подразделения: из заявки, иначе дефолт из конфига
-                subdivision_name = application_data.get("subdivision")
-                if not subdivision_name:
-                    try:
-                        from utils.config_manager import load_config
-                        cfg = load_config().get('recruitment', {}) or {}
-                        default_id = cfg.get('default_subdivision_id')
-                        default_key = cfg.get('default_subdivision_key')
-                        if default_id:
-                            cursor.execute("SELECT name FROM subdivisions WHERE id = %s", (default_id,))
-                            r = cursor.fetchone()
-                            if r:
-                                subdivision_name = r['name']
-                        elif default_key:
-                            # Пытаемся найти по аббревиатуре (ключу)
-                            cursor.execute("SELECT name FROM subdivisions WHERE abbreviation = %s", (default_key,))
-                            r = cursor.fetchone()
-                            if r:
-                                subdivision_name = r['name']
-                    except Exception as ce:
-                        logger.error("Failed to resolve default subdivision from config: %s", ce)
-                subdivision_id = await self._get_subdivision_id(subdivision_name or "", cursor)
+            # Получаем ID подразделения: из заявки, иначе дефолт из конфига
+            subdivision_name = application_data.get("subdivision")
+            if not subdivision_name:
                 try:
-                    logger.debug(
-                        "DB MANAGER: employee create subdivision_name=%s -> id=%s (source=%s)",
-                        subdivision_name or '<none>',
-                        subdivision_id,
-                        'application' if application_data.get('subdivision') else ('config_id' if cfg.get('default_subdivision_id') else ('config_key' if cfg.get('default_subdivision_key') else 'none'))
-                    )
-                except Exception:
-                    pass
-
-                # For new recruits (Рядовой), no specific position is assigned
-                # Only officers and specialists have positions
-                position_subdivision_id = None
-                if rank_name not in ["Рядовой", "Ефрейтор"]:
-                    # Only assign position to higher ranks
-                    position_name = application_data.get("position")
-                    if position_name:
-                        position_subdivision_id = await self._get_position_subdivision_id(
-                            position_name, subdivision_id, cursor
-                        )                # Create employee record (using only existing columns)
-                cursor.execute("""
-                    INSERT INTO employees (
-                        personnel_id, rank_id, subdivision_id, position_subdivision_id
-                    ) VALUES (%s, %s, %s, %s)
-                    RETURNING id;
-                """, (
-                    personnel_id,
-                    rank_id,
+                    from utils.config_manager import load_config
+                    cfg = load_config().get('recruitment', {}) or {}
+                    default_id = cfg.get('default_subdivision_id')
+                    default_key = cfg.get('default_subdivision_key')
+                    if default_id:
+                        cursor.execute("SELECT name FROM subdivisions WHERE id = %s", (default_id,))
+                        r = cursor.fetchone()
+                        if r:
+                            subdivision_name = r['name']
+                    elif default_key:
+                        # Пытаемся найти по аббревиатуре (ключу)
+                        cursor.execute("SELECT name FROM subdivisions WHERE abbreviation = %s", (default_key,))
+                        r = cursor.fetchone()
+                        if r:
+                            subdivision_name = r['name']
+                except Exception as ce:
+                    logger.error("Failed to resolve default subdivision from config: %s", ce)
+            subdivision_id = await self._get_subdivision_id(subdivision_name or "", cursor)
+            try:
+                logger.debug(
+                    "DB MANAGER: employee create subdivision_name=%s -> id=%s (source=%s)",
+                    subdivision_name or '<none>',
                     subdivision_id,
-                    position_subdivision_id
-                ))
-                
-                result = cursor.fetchone()
-                employee_id = result['id'] if result else None
-                
-                if employee_id:
-                    logger.info("Создана запись employee: %s (subdivision_id=%s, employee_id=%s)", rank_name, subdivision_id, employee_id)
-                    return True
-                
-                return False
-                
+                    'application' if application_data.get('subdivision') else ('config_id' if cfg.get('default_subdivision_id') else ('config_key' if cfg.get('default_subdivision_key') else 'none'))
+                )
+            except Exception:
+                pass
+
+            # For new recruits (Рядовой), no specific position is assigned
+            # Only officers and specialists have positions
+            position_subdivision_id = None
+            if rank_name not in ["Рядовой", "Ефрейтор"]:
+                # Only assign position to higher ranks
+                position_name = application_data.get("position")
+                if position_name:
+                    position_subdivision_id = await self._get_position_subdivision_id(
+                        position_name, subdivision_id, cursor
+                    )                # Create employee record (using only existing columns)
+            cursor.execute("""
+                INSERT INTO employees (
+                    personnel_id, rank_id, subdivision_id, position_subdivision_id
+                ) VALUES (%s, %s, %s, %s)
+                RETURNING id;
+            """, (
+                personnel_id,
+                rank_id,
+                subdivision_id,
+                position_subdivision_id
+            ))
+            
+            result = cursor.fetchone()
+            employee_id = result['id'] if result else None
+            
+            if employee_id:
+                logger.info("Создана запись employee: %s (subdivision_id=%s, employee_id=%s)", rank_name, subdivision_id, employee_id)
+                return True
+            
+            return False
+            
         except Exception as e:
             logger.error(f"_create_employee_record failed: {e}")
             return False
@@ -465,76 +463,75 @@ class PersonnelManager:
             logger.error(f"_get_position_subdivision_id failed: {e}")
             return 527  # Fallback to the created Курсант + Военная Академия link
     
-    async def _log_approval_action(self, personnel_id: int, application_data: Dict, moderator_discord_id: int, moderator_info: str):
+    async def _log_approval_action(self, personnel_id: int, application_data: Dict, moderator_discord_id: int, moderator_info: str, cursor):
         """Log approval action using existing history table"""
         try:
-            with get_db_cursor() as cursor:
-                import json
-                
-                # СТРОГИЙ поиск модератора по discord_id
-                if moderator_discord_id == 0:
-                    # Fallback для случаев, когда moderator_discord_id недоступен
-                    logger.warning("Warning: moderator_discord_id = 0, using fallback personnel ID 1")
-                    performed_by_id = 0  # Используем первую запись как fallback
-                else:
-                    cursor.execute("SELECT id FROM personnel WHERE discord_id = %s;", (moderator_discord_id,))
-                    moderator_personnel = cursor.fetchone()
-                    
-                    if not moderator_personnel:
-                        raise ValueError(f"Модератор с discord_id {moderator_discord_id} не найден в системе personnel")
-                    
-                    performed_by_id = moderator_personnel['id']
-                
-                # УПРОЩЕННЫЕ details - пустое значение вместо текста
-                details = None
+            import json
+            
+            # СТРОГИЙ поиск модератора по discord_id
+            if moderator_discord_id == 0:
+                # Fallback для случаев, когда moderator_discord_id недоступен
+                logger.warning("Warning: moderator_discord_id = 0, using fallback personnel ID 1")
+                performed_by_id = 0  # Используем первую запись как fallback
+            else:
+                execute_prepared(cursor, PERSONNEL_ID_BY_DISCORD, (moderator_discord_id,))
+                moderator_personnel = cursor.fetchone()
                 
-                # ГРОМОЗДКИЙ JSON для changes (как требуется)
-                rank_name = application_data.get('rank', 'Рядовой')
-                subdivision_name = application_data.get('subdivision')
-                if not subdivision_name:
-                    try:
-                        from utils.config_manager import load_config
-                        cfg = load_config().get('recruitment', {}) or {}
-                        default_key = cfg.get('default_subdivision_key')
-                        if default_key:
-                            cursor.execute("SELECT name FROM subdivisions WHERE abbreviation = %s;", (default_key,))
-                            r = cursor.fetchone()
-                            if r:
-                                subdivision_name = r['name']
-                    except Exception as ce:
-                        logger.error("_log_approval_action: failed default subdivision resolve: %s", ce)
+                if not moderator_personnel:
+                    raise ValueError(f"Модератор с discord_id {moderator_discord_id} не найден в системе personnel")
                 
-                changes = {
-                    "rank": {
-                        "new": rank_name,
-                        "previous": None
-                    },
-                    "position": {
-                        "new": None,  # Рядовые без должности
-                        "previous": None
-                    },
-                    "subdivision": {
-                        "new": subdivision_name,
-                        "previous": None
-                    }
+                performed_by_id = moderator_personnel['id']
+            
+            # УПРОЩЕННЫЕ details - пустое значение вместо текста
+            details = None
+            
+            # ГРОМОЗДКИЙ JSON для changes (как требуется)
+            rank_name = application_data.get('rank', 'Рядовой')
+            subdivision_name = application_data.get('subdivision')
+            if not subdivision_name:
+                try:
+                    from utils.config_manager import load_config
+                    cfg = load_config().get('recruitment', {}) or {}
+                    default_key = cfg.get('default_subdivision_key')
+                    if default_key:
+                        cursor.execute("SELECT name FROM subdivisions WHERE abbreviation = %s;", (default_key,))
+                        r = cursor.fetchone()
+                        if r:
+                            subdivision_name = r['name']
+                except Exception as ce:
+                    logger.error("_log_approval_action: failed default subdivision resolve: %s", ce)
+            
+            changes = {
+                "rank": {
+                    "new": rank_name,
+                    "previous": None
+                },
+                "position": {
+                    "new": None,  # Рядовые без должности
+                    "previous": None
+                },
+                "subdivision": {
+                    "new": subdivision_name,
+                    "previous": None
                 }
-                
-                # Insert into existing history table
-                cursor.execute("""
-                    INSERT INTO history (
-                        action_date, details, performed_by, action_id, personnel_id, changes
-                    ) VALUES (%s, %s, %s, %s, %s, %s);
-                """, (
-                    datetime.now(),  # action_date
-                    details,  # details (простой текст)
-                    performed_by_id,  # performed_by (строго найденный модератор)
-                    10,  # action_id = 10 (Принят на службу)
-                    personnel_id,  # personnel_id
-                    json.dumps(changes)  # changes (громоздкий JSON)
-                ))
-                
-                logger.info("Логирование в history для personnel_id %s (действие выполнил: %s)", personnel_id, performed_by_id)
-                
+            }
+            
+            # Insert into existing history table
+            cursor.execute("""
+                INSERT INTO history (
+                    action_date, details, performed_by, action_id, personnel_id, changes
+                ) VALUES (%s, %s, %s, %s, %s, %s);
+            """, (
+                datetime.now(),  # action_date
+                details,  # details (простой текст)
+                performed_by_id,  # performed_by (строго найденный модератор)
+                10,  # action_id = 10 (Принят на службу)
+                personnel_id,  # personnel_id
+                json.dumps(changes)  # changes (громоздкий JSON)
+            ))
+            
+            logger.info("Логирование в history для personnel_id %s (действие выполнил: %s)", personnel_id, performed_by_id)
+            
         except Exception as e:
             # Non-critical error, just log it
             logger.error(f"_log_approval_action failed (non-critical): {e}")
@@ -543,27 +540,7 @@ class PersonnelManager:
         """Get comprehensive personnel summary for user"""
         try:
             with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT 
-                        p.id as personnel_id,
-                        p.first_name,
-                        p.last_name,
-                        p.static,
-                        p.discord_id,
-                        p.join_date,
-                        p.last_updated,
-                        e.id as employee_id,
-                        pos.name as position_name,
-                        sub.name as subdivision_name,
-                        r.name as rank_name
-                    FROM personnel p
-                    LEFT JOIN employees e ON p.id = e.personnel_id
-                    LEFT JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
-                    LEFT JOIN positions pos ON ps.position_id = pos.id
-                    LEFT JOIN subdivisions sub ON e.subdivision_id = sub.id
-                    LEFT JOIN ranks r ON e.rank_id = r.id
-                    WHERE p.discord_id = %s AND p.is_dismissal = false;
-                """, (user_discord_id,))
+                execute_prepared(cursor, PERSONNEL_SUMMARY, (user_discord_id,))
                 
                 result = cursor.fetchone()
                 
@@ -673,9 +650,7 @@ class PersonnelManager:
                 }
                 
                 # Step 4: Get moderator's personnel ID for proper foreign key reference
-                cursor.execute("""
-                    SELECT id FROM personnel WHERE discord_id = %s
-                """, (moderator_discord_id,))
+                execute_prepared(cursor, PERSONNEL_ID_BY_DISCORD, (moderator_discord_id,))
                 
                 moderator_record = cursor.fetchone()
                 if not moderator_record:
@@ -929,6 +904,8 @@ class PersonnelManager:
                 
                 if cursor.rowcount > 0:
                     logger.info(f"{message} (ID: {discord_id})")
+                    # Static/ФИО записей ЧС берутся из personnel
+                    self.invalidate_blacklist_cache(discord_id=discord_id)
                     # Invalidate user cache after profile update
                     # Lazy import to avoid circular dependency
                     from ..user_cache import invalidate_user_cache
@@ -983,7 +960,7 @@ class PersonnelManager:
             # Find moderator's personnel_id
             moderator_personnel_id = None
             with get_db_cursor() as cursor:
-                cursor.execute("SELECT id FROM personnel WHERE discord_id = %s;", (moderator_discord_id,))
+                execute_prepared(cursor, PERSONNEL_ID_BY_DISCORD, (moderator_discord_id,))
                 result = cursor.fetchone()
                 if result:
                     moderator_personnel_id = result['id']
@@ -1066,105 +1043,16 @@ class PersonnelManager:
             traceback.print_exc()
             return False
 
-    # Blacklist cache - keyed по static, чтобы избегать лишних запросов
-    _blacklist_cache: Dict[str, Optional[Dict[str, Any]]] = {}
-    _blacklist_cache_timestamps: Dict[str, datetime] = {}
-    _blacklist_cache_ttl = 60  # 60 seconds TTL
-
-    async def _resolve_static_for_blacklist(self, static_or_discord: Any) -> Optional[str]:
-        """Приводит вход к stаtic: принимает static или discord_id (int)."""
-        if static_or_discord is None:
-            return None
-        try:
-            # Discord ID (int) → достаём static из personnel
-            if isinstance(static_or_discord, int):
-                with get_db_cursor() as cursor:
-                    cursor.execute(
-                        """
-                        SELECT static
-                        FROM personnel
-                        WHERE discord_id = %s
-                        ORDER BY id DESC
-                        LIMIT 1;
-                        """,
-                        (static_or_discord,)
-                    )
-                    row = cursor.fetchone()
-                    return row['static'] if row and row['static'] else None
-            # Уже string → просто чистим
-            static_str = str(static_or_discord).strip()
-            return static_str or None
-        except Exception as e:
-            logger.error("Error resolving static for blacklist: %s", e)
-            return None
-
     async def check_active_blacklist(self, static_or_discord: Any) -> Optional[Dict[str, Any]]:
         """
-        Проверка активного ЧС по static или discord_id (с кэшем).
+        Проверка активного ЧС по static или discord_id (по индексу в памяти).
 
-        Активный ЧС: end_date IS NULL (бессрочно) или end_date > today.
-        Cache TTL: 60 секунд.
+        Активный ЧС: end_date IS NULL (бессрочно) или end_date ещё не наступила.
         """
         try:
-            resolved_static = await self._resolve_static_for_blacklist(static_or_discord)
-            if not resolved_static:
-                logger.info("Blacklist check skipped: static not resolved (input=%s)", static_or_discord)
-                return None
-
-            now = datetime.now()
-            if resolved_static in self._blacklist_cache:
-                cache_age = (now - self._blacklist_cache_timestamps.get(resolved_static, now)).total_seconds()
-                if cache_age < self._blacklist_cache_ttl:
-                    cached_result = self._blacklist_cache[resolved_static]
-                    logger.info("Blacklist check (CACHED): static=%s, active=%s", resolved_static, cached_result is not None)
-                    return cached_result
-
-            with get_db_cursor() as cursor:
-                cursor.execute(
-                    """
-                    SELECT 
-                        bl.id,
-                        bl.reason,
-                        bl.start_date,
-                        bl.end_date,
-                        p.first_name,
-                        p.last_name,
-                        p.static
-                    FROM blacklist bl
-                    INNER JOIN personnel p ON bl.personnel_id = p.id
-                    WHERE p.static = %s 
-                      AND (bl.end_date IS NULL OR bl.end_date > CURRENT_DATE)
-                    ORDER BY bl.start_date DESC
-                    LIMIT 1;
-                    """,
-                    (resolved_static,),
-                )
-
-                result = cursor.fetchone()
-
-                if result:
-                    full_name = f"{result['first_name']} {result['last_name']}".strip()
-
-                    blacklist_info = {
-                        'id': result['id'],
-                        'reason': result['reason'],
-                        'start_date': result['start_date'],
-                        'end_date': result['end_date'],
-                        'full_name': full_name,
-                        'static': result['static'],
-                    }
-
-                    self._blacklist_cache[resolved_static] = blacklist_info
-                    self._blacklist_cache_timestamps[resolved_static] = now
-
-                    logger.info("Blacklist check (DB): static=%s, active=True", resolved_static)
-                    return blacklist_info
-                else:
-                    self._blacklist_cache[resolved_static] = None
-                    self._blacklist_cache_timestamps[resolved_static] = now
-
-                    logger.info("Blacklist check (DB): static=%s, active=False", resolved_static)
-                    return None
+            blacklist_info = await blacklist_index.lookup(static_or_discord)
+            logger.info("Blacklist check: key=%s, active=%s", static_or_discord, blacklist_info is not None)
+            return blacklist_info
 
         except Exception as e:
             logger.error("Error checking active blacklist: %s", e)
@@ -1173,77 +1061,106 @@ class PersonnelManager:
             return None
 
     def invalidate_blacklist_cache(self, static: Optional[str] = None, discord_id: int = None):
-        """Инвалидирует кэш ЧС: по static, discord_id или целиком."""
-        cache_key = static
-        if cache_key is None and discord_id is not None:
-            cache_key = str(discord_id)
+        """Помечает индекс ЧС устаревшим (перечитывается целиком при следующей проверке)."""
+        blacklist_index.invalidate()
+        logger.info("Blacklist index invalidated (static=%s, discord_id=%s)", static, discord_id)
 
-        if cache_key:
-            self._blacklist_cache.pop(cache_key, None)
-            self._blacklist_cache_timestamps.pop(cache_key, None)
-            logger.info("Blacklist cache invalidated for key=%s", cache_key)
-        else:
-            self._blacklist_cache.clear()
-            self._blacklist_cache_timestamps.clear()
-            logger.info("Blacklist cache fully cleared")
+    # Текущий период службы: последний приём (action_id = 10) и первое увольнение (action_id = 3) после него
+    _SERVICE_PERIODS_QUERY = """
+        WITH last_hiring AS (
+            SELECT DISTINCT ON (personnel_id)
+                personnel_id,
+                action_date AS hire_date
+            FROM history
+            WHERE action_id = 10 {personnel_filter}
+            ORDER BY personnel_id, action_date DESC
+        )
+        SELECT
+            lh.personnel_id,
+            lh.hire_date,
+            dismissal.action_date AS dismissal_date
+        FROM last_hiring lh
+        LEFT JOIN LATERAL (
+            SELECT h.action_date
+            FROM history h
+            WHERE h.personnel_id = lh.personnel_id
+              AND h.action_id = 3
+              AND h.action_date > lh.hire_date
+            ORDER BY h.action_date ASC
+            LIMIT 1
+        ) dismissal ON true;
+    """
 
-    async def calculate_total_service_time(self, personnel_id: int) -> int:
+    async def get_current_service_periods(self, personnel_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, Any]]:
         """
-        Calculate current service period in days for a personnel member.
+        Get current service periods for many personnel in one query.
         
-        Only considers the most recent service period (from last hiring to dismissal or current time).
-        Previous service periods are ignored for blacklist calculations.
+        Only the most recent service period is considered (from last hiring to the
+        dismissal after it, or to current time). Personnel without hiring records
+        are absent from the result.
         
         Args:
-            personnel_id: Internal personnel.id from database
+            personnel_ids: Internal personnel.id list; None - all personnel (service length report)
             
         Returns:
-            int: Days in current/most recent service period
+            Dict[int, Dict]: personnel_id -> hire_date, dismissal_date, service_days
         """
+        if personnel_ids is not None:
+            personnel_ids = list(personnel_ids)
+            if not personnel_ids:
+                return {}
+        
         try:
-            # Get the most recent hiring event (action_id = 10)
             with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT action_date 
-                    FROM history 
-                    WHERE personnel_id = %s AND action_id = 10
-                    ORDER BY action_date DESC
-                    LIMIT 1;
-                """, (personnel_id,))
-                
-                latest_hiring = cursor.fetchone()
-                if not latest_hiring:
-                    return 0
-                
-                hire_date = latest_hiring['action_date']
-                
-                # Get the dismissal after this hiring (if any)
-                cursor.execute("""
-                    SELECT action_date 
-                    FROM history 
-                    WHERE personnel_id = %s AND action_id = 3 AND action_date > %s
-                    ORDER BY action_date ASC
-                    LIMIT 1;
-                """, (personnel_id, hire_date))
-                
-                dismissal_result = cursor.fetchone()
-                
-                if dismissal_result:
-                    # Person was dismissed after this hiring
-                    dismiss_date = dismissal_result['action_date']
-                    service_days = (dismiss_date - hire_date).days
+                if personnel_ids is None:
+                    cursor.execute(self._SERVICE_PERIODS_QUERY.format(personnel_filter=""))
                 else:
-                    # Person is still serving
-                    current_time = datetime.now()
-                    service_days = (current_time - hire_date).days
-                
-                return service_days
-                
+                    cursor.execute(
+                        self._SERVICE_PERIODS_QUERY.format(personnel_filter="AND personnel_id = ANY(%s)"),
+                        (personnel_ids,)
+                    )
+                rows = cursor.fetchall()
         except Exception as e:
-            logger.error("Error calculating service time: %s", e)
+            logger.error("Error loading service periods: %s", e)
             import traceback
             traceback.print_exc()
-            return 0
+            return {}
+        
+        periods = {}
+        for row in rows:
+            hire_date = row['hire_date']
+            dismissal_date = row['dismissal_date']
+            if dismissal_date:
+                # Person was dismissed after this hiring
+                service_days = (dismissal_date - hire_date).days
+            else:
+                # Person is still serving
+                current_time = datetime.now(hire_date.tzinfo) if hire_date.tzinfo else datetime.now()
+                service_days = (current_time - hire_date).days
+            
+            periods[row['personnel_id']] = {
+                'hire_date': hire_date,
+                'dismissal_date': dismissal_date,
+                'service_days': service_days,
+            }
+        return periods
+
+    async def calculate_total_service_time(self, personnel_id: int) -> int:
+        """
+        Calculate current service period in days for a personnel member.
+        
+        Only considers the most recent service period (from last hiring to dismissal or current time).
+        Previous service periods are ignored for blacklist calculations.
+        
+        Args:
+            personnel_id: Internal personnel.id from database
+            
+        Returns:
+            int: Days in current/most recent service period
+        """
+        periods = await self.get_current_service_periods([personnel_id])
+        period = periods.get(personnel_id)
+        return period['service_days'] if period else 0
 
     async def add_to_blacklist(self, discord_id: int, moderator_discord_id: int, reason: str, duration_days: int = 14) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
         """
@@ -1304,10 +1221,7 @@ class PersonnelManager:
             # Get moderator's personnel_id for "added_by"
             moderator_personnel_id = None
             with get_db_cursor() as cursor:
-                cursor.execute(
-                    "SELECT id FROM personnel WHERE discord_id = %s;",
-                    (moderator_discord_id,)
-                )
+                execute_prepared(cursor, PERSONNEL_ID_BY_DISCORD, (moderator_discord_id,))
                 result = cursor.fetchone()
                 if result:
                     moderator_personnel_id = result['id']
@@ -1495,29 +1409,7 @@ class PersonnelManager:
         """
         try:
             with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT
-                        p.id as personnel_id,
-                        p.discord_id,
-                        p.first_name,
-                        p.last_name,
-                        p.static,
-                        p.is_dismissal,
-                        p.join_date,
-                        p.dismissal_date,
-                        r.name as rank,
-                        pos.name as position,
-                        sub.name as subdivision,
-                        sub.abbreviation as subdivision_abbr
-                    FROM personnel p
-                    LEFT JOIN employees e ON p.id = e.personnel_id
-                    LEFT JOIN ranks r ON e.rank_id = r.id
-                    LEFT JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
-                    LEFT JOIN positions pos ON ps.position_id = pos.id
-                    LEFT JOIN subdivisions sub ON e.subdivision_id = sub.id
-                    WHERE p.is_dismissal = false
-                    ORDER BY p.id
-                """)
+                execute_prepared(cursor, ALL_ACTIVE_PERSONNEL)
 
                 results = cursor.fetchall()
 
@@ -6,6 +6,11 @@ New Position Service Layer
 import discord
 from typing import Optional, Dict, Any, List, Tuple, Set
 from utils.postgresql_pool import get_db_cursor
+from utils.prepared_statements import execute_prepared
+from .statements import (
+    ACTIVE_PERSONNEL_ID_BY_DISCORD, PERSONNEL_ID_BY_DISCORD, POSITION_BY_ID, POSITION_SUBDIVISION_BY_ROLE,
+    POSITIONS_WITH_ROLES, SUBDIVISION_ID_BY_ROLE, USER_POSITION_BY_DISCORD,
+)
 from utils.message_manager import get_role_reason, get_moderator_display_name
 from utils.logging_setup import get_logger
 
@@ -62,7 +67,7 @@ class PositionService:
             
             try:
                 with get_db_cursor() as cursor:
-                    cursor.execute("SELECT id, role_id FROM positions WHERE role_id IS NOT NULL")
+                    execute_prepared(cursor, POSITIONS_WITH_ROLES)
                     position_roles = cursor.fetchall()
                     
                     # Создаем два маппинга для быстрого поиска
@@ -606,7 +611,7 @@ class PositionService:
         """Get personnel ID by Discord ID"""
         try:
             with get_db_cursor() as cursor:
-                cursor.execute("SELECT id FROM personnel WHERE discord_id = %s", (discord_id,))
+                execute_prepared(cursor, PERSONNEL_ID_BY_DISCORD, (discord_id,))
                 result = cursor.fetchone()
                 return result['id'] if result else None
         except Exception:
@@ -638,14 +643,7 @@ class PositionService:
         """
         try:
             with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT p.id, p.name, p.role_id, s.name as subdivision_name, s.abbreviation as subdivision_abbr
-                    FROM positions p
-                    JOIN position_subdivision ps ON p.id = ps.position_id
-                    JOIN subdivisions s ON ps.subdivision_id = s.id
-                    WHERE p.id = %s
-                    LIMIT 1
-                """, (position_id,))
+                execute_prepared(cursor, POSITION_BY_ID, (position_id,))
                 
                 result = cursor.fetchone()
                 return dict(result) if result else None
@@ -666,16 +664,7 @@ class PositionService:
         """
         try:
             with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT p.id, p.name, p.role_id, s.name as subdivision_name, s.abbreviation as subdivision_abbr
-                    FROM employees e
-                    JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
-                    JOIN positions p ON ps.position_id = p.id
-                    JOIN subdivisions s ON ps.subdivision_id = s.id
-                    JOIN personnel pr ON e.personnel_id = pr.id
-                    WHERE pr.discord_id = %s AND pr.is_dismissal = false
-                    LIMIT 1
-                """, (user_id,))
+                execute_prepared(cursor, USER_POSITION_BY_DISCORD, (user_id,))
                 
                 result = cursor.fetchone()
                 if result and result['id']:
@@ -725,7 +714,7 @@ class PositionService:
             subdivision_id = None
             try:
                 with get_db_cursor() as cursor:
-                    cursor.execute("SELECT id FROM subdivisions WHERE role_id = %s", (role_id,))
+                    execute_prepared(cursor, SUBDIVISION_ID_BY_ROLE, (role_id,))
                     result = cursor.fetchone()
                     if result:
                         subdivision_id = result['id']
@@ -739,7 +728,7 @@ class PositionService:
             
             with get_db_cursor() as cursor:
                 # Get personnel_id
-                cursor.execute("SELECT id FROM personnel WHERE discord_id = %s AND is_dismissal = false;", (user_discord_id,))
+                execute_prepared(cursor, ACTIVE_PERSONNEL_ID_BY_DISCORD, (user_discord_id,))
                 personnel_result = cursor.fetchone()
                 if not personnel_result:
                     logger.info("Could not find personnel record for user %s", user_discord_id)
@@ -747,13 +736,7 @@ class PositionService:
                 personnel_id = personnel_result['id']
                 
                 # Find position_subdivision_id by matching Discord role ID
-                cursor.execute("""
-                    SELECT ps.id, p.name as position_name, p.role_id
-                    FROM position_subdivision ps
-                    JOIN positions p ON ps.position_id = p.id
-                    WHERE ps.subdivision_id = %s AND p.role_id = %s
-                    LIMIT 1;
-                """, (subdivision_id, position_role_id))
+                execute_prepared(cursor, POSITION_SUBDIVISION_BY_ROLE, (subdivision_id, position_role_id))
                 
                 ps_result = cursor.fetchone()
                 if not ps_result:
@@ -771,7 +754,7 @@ class PositionService:
                 """, (position_subdivision_id, personnel_id))
                 
                 # Get moderator personnel ID for history
-                cursor.execute("SELECT id FROM personnel WHERE discord_id = %s;", (moderator_discord_id,))
+                execute_prepared(cursor, PERSONNEL_ID_BY_DISCORD, (moderator_discord_id,))
                 moderator_result = cursor.fetchone()
                 if not moderator_result:
                     logger.info("Could not find moderator personnel record for %s", moderator_discord_id)
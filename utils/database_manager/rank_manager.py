@@ -7,6 +7,7 @@ for rank CRUD, hierarchy management, and rank data retrieval.
 """
 
 import logging
+import threading
 from typing import Optional, Dict, Any, List, Tuple
 from ..postgresql_pool import get_db_cursor
 from utils.config_manager import load_config, save_config
@@ -22,11 +23,127 @@ class RankManager:
     Provides database operations for rank management including CRUD operations,
     hierarchy management, and rank data retrieval. Does not handle Discord
     role assignments - use role_utils.py for that functionality.
+    
+    Active ranks (role_id IS NOT NULL) are loaded once into an in-memory index
+    ordered by rank_level and keyed by name, id, role_id, level and abbreviation.
+    The index is dropped by every write method and reloaded on the next lookup.
     """
     
     def __init__(self):
+        self._rank_index: Optional[Dict[str, Any]] = None
+        self._index_lock = threading.Lock()
         logger.info("RankManager инициализирован")
     
+    # ================================================================
+    # In-memory rank index
+    # ================================================================
+    
+    def invalidate_cache(self):
+        """Drop the rank index; the next lookup reloads it from the database"""
+        self._rank_index = None
+    
+    def _get_rank_index(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the rank index, loading it from the database if needed
+        
+        Returns:
+            Optional[Dict[str, Any]]: Index or None if the database is unavailable
+        """
+        index = self._rank_index
+        if index is not None:
+            return index
+        
+        with self._index_lock:
+            if self._rank_index is not None:
+                return self._rank_index
+            
+            try:
+                with get_db_cursor() as cursor:
+                    cursor.execute("""
+                        SELECT id, name, role_id, rank_level, abbreviation
+                        FROM ranks 
+                        WHERE role_id IS NOT NULL
+                        ORDER BY rank_level, id;
+                    """)
+                    rows = cursor.fetchall() or []
+            except Exception as e:
+                logger.error(f"Error loading rank index: {e}")
+                return None
+            
+            ordered = [
+                {
+                    'id': row['id'],
+                    'name': row['name'],
+                    'role_id': row['role_id'],
+                    'rank_level': row['rank_level'],
+                    'abbreviation': row.get('abbreviation'),
+                }
+                for row in rows
+            ]
+            index = {
+                'ordered': ordered,
+                'by_name': {},
+                'by_id': {},
+                'by_role_id': {},
+                'by_level': {},
+                'by_abbreviation': {},
+            }
+            for position, rank in enumerate(ordered):
+                index['by_name'].setdefault(rank['name'], position)
+                index['by_id'][rank['id']] = position
+                index['by_role_id'].setdefault(rank['role_id'], position)
+                index['by_level'].setdefault(rank['rank_level'], position)
+                if rank['abbreviation']:
+                    index['by_abbreviation'].setdefault(rank['abbreviation'], position)
+            
+            self._rank_index = index
+            logger.info(f"Rank index loaded: {len(ordered)} active ranks")
+            return index
+    
+    def _lookup(self, key: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Find a rank in the index by one of its keys (returns a copy)"""
+        index = self._get_rank_index()
+        if not index:
+            return None
+        position = index[key].get(value)
+        return dict(index['ordered'][position]) if position is not None else None
+    
+    def get_rank_by_role_id(self, role_id: int) -> Optional[Dict[str, Any]]:
+        """Get active rank by Discord role ID"""
+        return self._lookup('by_role_id', role_id)
+    
+    def get_rank_by_level(self, rank_level: int) -> Optional[Dict[str, Any]]:
+        """Get active rank by hierarchy level"""
+        return self._lookup('by_level', rank_level)
+    
+    def get_rank_by_abbreviation(self, abbreviation: str) -> Optional[Dict[str, Any]]:
+        """Get active rank by its abbreviation"""
+        return self._lookup('by_abbreviation', abbreviation)
+    
+    def get_all_rank_role_ids(self) -> set:
+        """Get Discord role IDs of all active ranks"""
+        index = self._get_rank_index()
+        return set(index['by_role_id']) if index else set()
+    
+    def _get_adjacent_rank(self, current_rank_name: str, step: int) -> Optional[str]:
+        """Get the nearest rank with a strictly higher (step=1) or lower (step=-1) level"""
+        index = self._get_rank_index()
+        if not index:
+            return None
+        
+        position = index['by_name'].get(current_rank_name)
+        if position is None:
+            return None
+        
+        ordered = index['ordered']
+        current_level = ordered[position]['rank_level']
+        position += step
+        while 0 <= position < len(ordered):
+            if ordered[position]['rank_level'] != current_level:
+                return ordered[position]['name']
+            position += step
+        return None
+    
     async def add_rank_to_database(self, rank_name: str, role_id: int, rank_level: int) -> Tuple[bool, str]:
         """
         Add rank to database when added through /settings
@@ -65,7 +182,8 @@ class RankManager:
                     message = f"Ранг '{rank_name}' добавлен в базу данных"
                     logger.info(f"Added new rank to DB: {rank_name} -> role_id: {role_id}, level: {rank_level}")
                 
-                return True, message
+            self.invalidate_cache()
+            return True, message
                 
         except Exception as e:
             error_msg = f"Ошибка при добавлении ранга в БД: {str(e)}"
@@ -112,7 +230,8 @@ class RankManager:
                     message = f"Ранг '{rank_name}' удален из базы данных"
                     logger.info(f"Deleted rank from DB: {rank_name}")
                 
-                return True, message
+            self.invalidate_cache()
+            return True, message
                 
         except Exception as e:
             error_msg = f"Ошибка при удалении ранга из БД: {str(e)}"
@@ -128,21 +247,8 @@ class RankManager:
         Returns:
             List of rank dictionaries
         """
-        try:
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT id, name, role_id, rank_level
-                    FROM ranks 
-                    WHERE role_id IS NOT NULL
-                    ORDER BY rank_level;
-                """)
-                
-                results = cursor.fetchall()
-                return [dict(row) for row in results] if results else []
-                
-        except Exception as e:
-            logger.error(f"Error getting active ranks: {e}")
-            return []
+        index = self._get_rank_index()
+        return [dict(rank) for rank in index['ordered']] if index else []
     
     async def get_next_rank(self, current_rank_name: str) -> Optional[str]:
         """
@@ -154,36 +260,7 @@ class RankManager:
         Returns:
             Next rank name or None if at highest level
         """
-        try:
-            with get_db_cursor() as cursor:
-                # Get current rank level
-                cursor.execute("""
-                    SELECT rank_level 
-                    FROM ranks 
-                    WHERE name = %s AND role_id IS NOT NULL;
-                """, (current_rank_name,))
-                
-                current_result = cursor.fetchone()
-                if not current_result:
-                    return None
-                
-                current_level = current_result['rank_level']
-                
-                # Get next rank
-                cursor.execute("""
-                    SELECT name 
-                    FROM ranks 
-                    WHERE rank_level > %s AND role_id IS NOT NULL
-                    ORDER BY rank_level 
-                    LIMIT 1;
-                """, (current_level,))
-                
-                next_result = cursor.fetchone()
-                return next_result['name'] if next_result else None
-                
-        except Exception as e:
-            logger.error(f"Error getting next rank for '{current_rank_name}': {e}")
-            return None
+        return self._get_adjacent_rank(current_rank_name, 1)
     
     async def get_previous_rank(self, current_rank_name: str) -> Optional[str]:
         """
@@ -195,36 +272,7 @@ class RankManager:
         Returns:
             Previous rank name or None if at lowest level
         """
-        try:
-            with get_db_cursor() as cursor:
-                # Get current rank level
-                cursor.execute("""
-                    SELECT rank_level 
-                    FROM ranks 
-                    WHERE name = %s AND role_id IS NOT NULL;
-                """, (current_rank_name,))
-                
-                current_result = cursor.fetchone()
-                if not current_result:
-                    return None
-                
-                current_level = current_result['rank_level']
-                
-                # Get previous rank
-                cursor.execute("""
-                    SELECT name 
-                    FROM ranks 
-                    WHERE rank_level < %s AND role_id IS NOT NULL
-                    ORDER BY rank_level DESC
-                    LIMIT 1;
-                """, (current_level,))
-                
-                prev_result = cursor.fetchone()
-                return prev_result['name'] if prev_result else None
-                
-        except Exception as e:
-            logger.error(f"Error getting previous rank for '{current_rank_name}': {e}")
-            return None
+        return self._get_adjacent_rank(current_rank_name, -1)
 
     def get_rank_by_name(self, rank_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -236,29 +284,7 @@ class RankManager:
         Returns:
             Optional[Dict[str, Any]]: Rank data or None if not found
         """
-        try:
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT name, role_id, rank_level, abbreviation
-                    FROM ranks 
-                    WHERE name = %s AND role_id IS NOT NULL;
-                """, (rank_name,))
-                
-                result = cursor.fetchone()
-                
-                if result:
-                    return {
-                        'name': result['name'],
-                        'role_id': result['role_id'],
-                        'rank_level': result['rank_level'],
-                        'abbreviation': result.get('abbreviation', rank_name[:3].upper())
-                    }
-                    
-                return None
-                
-        except Exception as e:
-            logger.error(f"Ошибка получения ранга {rank_name}: {str(e)}")
-            return None
+        return self._lookup('by_name', rank_name)
     
     async def get_rank_by_id(self, rank_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -270,30 +296,7 @@ class RankManager:
         Returns:
             Optional[Dict[str, Any]]: Rank data or None if not found
         """
-        try:
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT id, name, role_id, rank_level, abbreviation
-                    FROM ranks 
-                    WHERE id = %s AND role_id IS NOT NULL;
-                """, (rank_id,))
-                
-                result = cursor.fetchone()
-                
-                if result:
-                    return {
-                        'id': result['id'],
-                        'name': result['name'],
-                        'role_id': result['role_id'],
-                        'rank_level': result['rank_level'],
-                        'abbreviation': result.get('abbreviation', result['name'][:3].upper())
-                    }
-                    
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting rank by ID '{rank_id}': {e}")
-            return None
+        return self._lookup('by_id', rank_id)
     
     async def get_first_rank(self) -> Optional[Dict[str, Any]]:
         """
@@ -302,32 +305,8 @@ class RankManager:
         Returns:
             Optional[Dict[str, Any]]: First rank data or None if not found
         """
-        try:
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT id, name, role_id, rank_level, abbreviation
-                    FROM ranks 
-                    WHERE role_id IS NOT NULL
-                    ORDER BY rank_level ASC
-                    LIMIT 1;
-                """)
-                
-                result = cursor.fetchone()
-                
-                if result:
-                    return {
-                        'id': result['id'],
-                        'name': result['name'],
-                        'role_id': result['role_id'],
-                        'rank_level': result['rank_level'],
-                        'abbreviation': result.get('abbreviation', result['name'][:3].upper())
-                    }
-                    
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting first rank: {e}")
-            return None
+        index = self._get_rank_index()
+        return dict(index['ordered'][0]) if index and index['ordered'] else None
 
     async def get_default_recruit_rank(self) -> Optional[str]:
         """
@@ -336,44 +315,15 @@ class RankManager:
         Returns:
             Rank name or None if no ranks found
         """
-        try:
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT name
-                    FROM ranks 
-                    WHERE role_id IS NOT NULL
-                    ORDER BY rank_level ASC
-                    LIMIT 1;
-                """)
-                
-                result = cursor.fetchone()
-                return result['name'] if result else None
-                
-        except Exception as e:
-            logger.error(f"Ошибка получения начального звания: {str(e)}")
-            return None
+        return self.get_default_recruit_rank_sync()
 
     def get_default_recruit_rank_sync(self) -> Optional[str]:
         """
         Synchronous version of get_default_recruit_rank
         Use only when async is not possible
         """
-        try:
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT name
-                    FROM ranks
-                    WHERE role_id IS NOT NULL
-                    ORDER BY rank_level ASC
-                    LIMIT 1;
-                """)
-
-                result = cursor.fetchone()
-                return result['name'] if result else None
-
-        except Exception as e:
-            logger.error(f"Ошибка в синхронном получении начального звания: {str(e)}")
-            return None
+        index = self._get_rank_index()
+        return index['ordered'][0]['name'] if index and index['ordered'] else None
 
     async def update_rank_in_database(self, rank_name: str, new_role_id: int, new_rank_level: int, new_abbreviation: str = None) -> Tuple[bool, str]:
         """
@@ -407,7 +357,9 @@ class RankManager:
 
                 message = f"Ранг '{rank_name}' обновлен в базе данных"
                 logger.info(f"Updated rank in DB: {rank_name} -> role_id: {new_role_id}, level: {new_rank_level}, abbr: {new_abbreviation}")
-                return True, message
+
+            self.invalidate_cache()
+            return True, message
 
         except Exception as e:
             logger.error(f"Error updating rank '{rank_name}': {e}")
@@ -444,7 +396,9 @@ class RankManager:
 
                 message = f"Discord роль ранга '{rank_name}' удалена из базы данных"
                 logger.info(f"Removed Discord role from rank: {rank_name}")
-                return True, message
+
+            self.invalidate_cache()
+            return True, message
 
         except Exception as e:
             logger.error(f"Error deleting rank '{rank_name}': {e}")
@@ -0,0 +1,154 @@
+"""
+Hot Path Statements
+
+Именованные запросы кадрового учёта, подготавливаемые один раз на соединение
+(см. utils/prepared_statements.py). Вызывающий код выполняет их через
+execute_prepared(cursor, ИМЯ, params).
+"""
+
+from utils.prepared_statements import statement_registry
+
+PERSONNEL_ID_BY_DISCORD = statement_registry.register(
+    'personnel_id_by_discord',
+    "SELECT id FROM personnel WHERE discord_id = %s"
+)
+
+ACTIVE_PERSONNEL_ID_BY_DISCORD = statement_registry.register(
+    'active_personnel_id_by_discord',
+    "SELECT id FROM personnel WHERE discord_id = %s AND is_dismissal = false"
+)
+
+PERSONNEL_SUMMARY = statement_registry.register('personnel_summary', """
+    SELECT
+        p.id as personnel_id,
+        p.first_name,
+        p.last_name,
+        p.static,
+        p.discord_id,
+        p.join_date,
+        p.last_updated,
+        e.id as employee_id,
+        pos.name as position_name,
+        sub.name as subdivision_name,
+        r.name as rank_name
+    FROM personnel p
+    LEFT JOIN employees e ON p.id = e.personnel_id
+    LEFT JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
+    LEFT JOIN positions pos ON ps.position_id = pos.id
+    LEFT JOIN subdivisions sub ON e.subdivision_id = sub.id
+    LEFT JOIN ranks r ON e.rank_id = r.id
+    WHERE p.discord_id = %s AND p.is_dismissal = false
+""")
+
+ALL_ACTIVE_PERSONNEL = statement_registry.register('all_active_personnel', """
+    SELECT
+        p.id as personnel_id,
+        p.discord_id,
+        p.first_name,
+        p.last_name,
+        p.static,
+        p.is_dismissal,
+        p.join_date,
+        p.dismissal_date,
+        r.name as rank,
+        pos.name as position,
+        sub.name as subdivision,
+        sub.abbreviation as subdivision_abbr
+    FROM personnel p
+    LEFT JOIN employees e ON p.id = e.personnel_id
+    LEFT JOIN ranks r ON e.rank_id = r.id
+    LEFT JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
+    LEFT JOIN positions pos ON ps.position_id = pos.id
+    LEFT JOIN subdivisions sub ON e.subdivision_id = sub.id
+    WHERE p.is_dismissal = false
+    ORDER BY p.id
+""")
+
+# Текущий static участника для проверки ЧС (последняя запись personnel)
+STATIC_BY_DISCORD = statement_registry.register(
+    'static_by_discord',
+    "SELECT static FROM personnel WHERE discord_id = %s ORDER BY id DESC LIMIT 1"
+)
+
+ACTIVE_BLACKLIST = statement_registry.register('active_blacklist', """
+    SELECT
+        bl.id,
+        bl.reason,
+        bl.start_date,
+        bl.end_date,
+        p.first_name,
+        p.last_name,
+        p.static
+    FROM blacklist bl
+    INNER JOIN personnel p ON bl.personnel_id = p.id
+    WHERE bl.end_date IS NULL OR bl.end_date > CURRENT_DATE
+    ORDER BY bl.start_date DESC
+""")
+
+# Должности и их роли (PositionService)
+POSITIONS_WITH_ROLES = statement_registry.register(
+    'positions_with_roles',
+    "SELECT id, role_id FROM positions WHERE role_id IS NOT NULL"
+)
+
+POSITION_BY_ID = statement_registry.register('position_by_id', """
+    SELECT p.id, p.name, p.role_id, s.name as subdivision_name, s.abbreviation as subdivision_abbr
+    FROM positions p
+    JOIN position_subdivision ps ON p.id = ps.position_id
+    JOIN subdivisions s ON ps.subdivision_id = s.id
+    WHERE p.id = %s
+    LIMIT 1
+""")
+
+USER_POSITION_BY_DISCORD = statement_registry.register('user_position_by_discord', """
+    SELECT p.id, p.name, p.role_id, s.name as subdivision_name, s.abbreviation as subdivision_abbr
+    FROM employees e
+    JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
+    JOIN positions p ON ps.position_id = p.id
+    JOIN subdivisions s ON ps.subdivision_id = s.id
+    JOIN personnel pr ON e.personnel_id = pr.id
+    WHERE pr.discord_id = %s AND pr.is_dismissal = false
+    LIMIT 1
+""")
+
+SUBDIVISION_ID_BY_ROLE = statement_registry.register(
+    'subdivision_id_by_role',
+    "SELECT id FROM subdivisions WHERE role_id = %s"
+)
+
+POSITION_SUBDIVISION_BY_ROLE = statement_registry.register('position_subdivision_by_role', """
+    SELECT ps.id, p.name as position_name, p.role_id
+    FROM position_subdivision ps
+    JOIN positions p ON ps.position_id = p.id
+    WHERE ps.subdivision_id = %s AND p.role_id = %s
+    LIMIT 1
+""")
+
+# Состояние сотрудника и personnel_id модератора для кадровой операции (unit_of_work)
+PERSONNEL_ACTION_CONTEXT = statement_registry.register('personnel_action_context', """
+    SELECT
+        target.id as personnel_id,
+        target.first_name,
+        target.last_name,
+        target.static,
+        e.id as employee_id,
+        e.rank_id,
+        r.name as rank_name,
+        e.subdivision_id,
+        sub.name as subdivision_name,
+        sub.role_id as subdivision_role_id,
+        e.position_subdivision_id,
+        ps.position_id,
+        pos.name as position_name,
+        moderator.id as moderator_personnel_id
+    FROM (SELECT 1) AS anchor
+    LEFT JOIN personnel target ON target.discord_id = %s AND target.is_dismissal = false
+    LEFT JOIN employees e ON e.personnel_id = target.id
+    LEFT JOIN ranks r ON e.rank_id = r.id
+    LEFT JOIN subdivisions sub ON e.subdivision_id = sub.id
+    LEFT JOIN position_subdivision ps ON e.position_subdivision_id = ps.id
+    LEFT JOIN positions pos ON ps.position_id = pos.id
+    LEFT JOIN LATERAL (
+        SELECT id FROM personnel WHERE discord_id = %s ORDER BY id DESC LIMIT 1
+    ) moderator ON true
+""")
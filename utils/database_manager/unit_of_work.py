@@ -0,0 +1,131 @@
+"""
+Personnel Unit of Work
+
+Кадровая операция (приём, увольнение, назначение должности, перевод) целиком
+на одном соединении пула и в одной транзакции.
+
+Состояние сотрудника и personnel_id модератора читаются одним запросом
+(load_context), изменения накапливаются и отправляются на сервер одним пакетом
+перед следующим чтением или при фиксации. Если операция прерывается
+(abort или исключение), транзакция откатывается целиком:
+
+    with personnel_transaction() as uow:
+        context = uow.load_context(user_id, moderator_id)
+        if not context['personnel_id']:
+            uow.abort("сотрудник не найден")
+            return False
+        uow.execute("UPDATE employees SET rank_id = %s WHERE personnel_id = %s", (rank_id, context['personnel_id']))
+        uow.add_history(context['personnel_id'], 1, context['moderator_personnel_id'], changes)
+"""
+
+import json
+from contextlib import contextmanager
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+from psycopg2.extras import RealDictCursor
+
+from ..postgresql_pool import get_db_connection
+from ..prepared_statements import execute_prepared
+from .statements import PERSONNEL_ACTION_CONTEXT
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Время записей истории кадровых действий (МСК)
+MOSCOW_TZ = timezone(timedelta(hours=3))
+
+
+class PersonnelUnitOfWork:
+    """Запросы одной кадровой операции в общей транзакции"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self._pending: List[Tuple[str, Optional[Sequence[Any]]]] = []
+        self.aborted = False
+        self.abort_reason: Optional[str] = None
+
+    def load_context(self, target_discord_id: int, moderator_discord_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Текущее состояние сотрудника и personnel_id модератора одним запросом
+
+        Returns:
+            Dict: personnel_id (None, если активный сотрудник не найден), first_name, last_name,
+            static, employee_id, rank_id, rank_name, subdivision_id, subdivision_name, subdivision_role_id,
+            position_subdivision_id, position_id, position_name, moderator_personnel_id
+        """
+        self.flush()
+        execute_prepared(self.cursor, PERSONNEL_ACTION_CONTEXT, (target_discord_id, moderator_discord_id))
+        return dict(self.cursor.fetchone())
+
+    def fetchone(self, sql: str, params: Optional[Sequence[Any]] = None) -> Optional[Dict[str, Any]]:
+        """Выполнить чтение (после отправки накопленных изменений)"""
+        self.flush()
+        self.cursor.execute(sql, params)
+        return self.cursor.fetchone()
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None):
+        """Добавить изменение в пакет; результат запроса не читается"""
+        self._pending.append((sql, params))
+
+    def add_history(self, personnel_id: int, action_id: int, performed_by: Optional[int],
+                    changes: Dict[str, Any], details: Optional[str] = None,
+                    action_date: Optional[datetime] = None):
+        """Добавить запись в history"""
+        self.execute("""
+            INSERT INTO history (personnel_id, action_id, performed_by, details, changes, action_date)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (
+            personnel_id,
+            action_id,
+            performed_by,
+            details,
+            json.dumps(changes, ensure_ascii=False),
+            action_date or datetime.now(MOSCOW_TZ)
+        ))
+
+    def flush(self):
+        """Отправить накопленные изменения одним обращением к серверу"""
+        if not self._pending:
+            return
+        batch = b";\n".join(
+            self.cursor.mogrify(sql.strip().rstrip(';'), params) for sql, params in self._pending
+        )
+        self._pending.clear()
+        self.cursor.execute(batch)
+
+    def abort(self, reason: str):
+        """Отменить операцию: все изменения транзакции будут откачены"""
+        self.aborted = True
+        self.abort_reason = reason
+        self._pending.clear()
+
+
+@contextmanager
+def personnel_transaction():
+    """
+    Открыть кадровую операцию на одном соединении пула
+
+    Транзакция фиксируется при нормальном выходе из блока и откатывается
+    при исключении или после uow.abort().
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        uow = PersonnelUnitOfWork(cursor)
+        try:
+            yield uow
+            if uow.aborted:
+                conn.rollback()
+                logger.info("Кадровая операция отменена: %s", uow.abort_reason)
+                return
+            uow.flush()
+            # Ошибка запроса, перехваченная внутри операции, оставляет транзакцию прерванной
+            if conn.get_transaction_status() == TRANSACTION_STATUS_INERROR:
+                raise RuntimeError("Транзакция прервана ошибкой запроса, изменения отменены")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
@@ -0,0 +1,329 @@
+"""
+Disband Jobs
+
+Фоновые задачи расформирования ролей (/расформ) с сохранением прогресса.
+
+Features:
+- Задача сохраняется в data/disband_jobs.json со снимком участников и курсором
+- Обработка порциями через общую очередь изменений Discord (массовый приоритет)
+- Контрольная точка после каждой порции - после перезапуска задача продолжается
+- Сообщение прогресса в канале, редактируется не чаще раза в несколько секунд
+- Отмена через кнопку на сообщении прогресса
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import discord
+from utils.audit_outbox import audit_outbox
+from utils.config_manager import load_config
+from utils.discord_mutation_queue import mutation_queue, MutationPriority
+from utils.message_manager import get_role_reason
+from utils.logging_setup import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+STATUS_RUNNING = 'running'
+STATUS_CANCELLED = 'cancelled'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+
+
+class DisbandJobManager:
+    """Менеджер фоновых задач расформирования"""
+
+    DATA_FILE = "data/disband_jobs.json"
+    CHUNK_SIZE = 25  # Участников между контрольными точками
+    PROGRESS_EDIT_INTERVAL = 5.0  # Секунд между редактированиями сообщения прогресса
+    FINISHED_JOBS_TTL_DAYS = 7  # Сколько хранить завершённые задачи
+
+    def __init__(self, bot, control_view_factory: Optional[Callable[[], discord.ui.View]] = None):
+        self.bot = bot
+        self.control_view_factory = control_view_factory
+        self._jobs: Dict[str, Dict[str, Any]] = self._load_jobs()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._save_lock = asyncio.Lock()
+
+    # Хранилище
+
+    def _load_jobs(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            if os.path.exists(self.DATA_FILE):
+                with open(self.DATA_FILE, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('jobs', {})
+        except Exception as e:
+            logger.error("Ошибка загрузки задач расформирования: %s", e)
+        return {}
+
+    def _write_jobs(self, snapshot: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.DATA_FILE), exist_ok=True)
+        tmp_path = f"{self.DATA_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'jobs': snapshot}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.DATA_FILE)
+
+    async def _save(self):
+        """Атомарно сохранить все задачи (запись вне event loop)"""
+        self._prune_finished_jobs()
+        snapshot = json.loads(json.dumps(self._jobs))
+        async with self._save_lock:
+            try:
+                await asyncio.to_thread(self._write_jobs, snapshot)
+            except Exception as e:
+                logger.error("Ошибка сохранения задач расформирования: %s", e)
+
+    def _prune_finished_jobs(self):
+        cutoff = (datetime.now() - timedelta(days=self.FINISHED_JOBS_TTL_DAYS)).isoformat()
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job['status'] != STATUS_RUNNING and job['updated_at'] < cutoff
+        ]:
+            del self._jobs[job_id]
+
+    # Публичный API
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    def get_job_by_message(self, message_id: int) -> Optional[Dict[str, Any]]:
+        for job in self._jobs.values():
+            if job.get('message_id') == message_id:
+                return job
+        return None
+
+    def find_conflicting_job(self, guild_id: int, role_ids: List[int]) -> Optional[Dict[str, Any]]:
+        """Найти активную задачу, которая уже расформировывает одну из этих ролей"""
+        role_ids = set(role_ids)
+        for job in self._jobs.values():
+            if job['status'] == STATUS_RUNNING and job['guild_id'] == guild_id and role_ids & set(job['role_ids']):
+                return job
+        return None
+
+    async def start_job(self, channel: discord.abc.Messageable, roles: List[discord.Role],
+                        admin_user: discord.Member, members: List[discord.Member]) -> Dict[str, Any]:
+        """
+        Создать задачу, опубликовать сообщение прогресса и запустить обработку
+
+        Returns:
+            Dict: запись задачи
+        """
+        now = datetime.now().isoformat()
+        job = {
+            'job_id': uuid.uuid4().hex[:12],
+            'guild_id': admin_user.guild.id,
+            'channel_id': channel.id,
+            'message_id': None,
+            'role_ids': [role.id for role in roles],
+            'admin_id': admin_user.id,
+            'admin_name': admin_user.display_name,
+            'member_ids': sorted(member.id for member in members),
+            'cursor': 0,
+            'succeeded': 0,
+            'failed_ids': [],
+            'status': STATUS_RUNNING,
+            'created_at': now,
+            'updated_at': now,
+        }
+
+        message = await channel.send(embed=self.build_progress_embed(job), view=self._make_control_view())
+        job['message_id'] = message.id
+        self._jobs[job['job_id']] = job
+        await self._save()
+
+        self._spawn(job)
+        logger.info("Запущена задача расформирования %s: %s участников", job['job_id'], len(job['member_ids']))
+        return job
+
+    async def cancel_job(self, job_id: str) -> bool:
+        """Запросить отмену задачи; обработка остановится после текущей порции"""
+        job = self._jobs.get(job_id)
+        if not job or job['status'] != STATUS_RUNNING:
+            return False
+
+        job['status'] = STATUS_CANCELLED
+        job['updated_at'] = datetime.now().isoformat()
+        await self._save()
+        logger.info("Задача расформирования %s отменена", job_id)
+        return True
+
+    async def resume_jobs(self):
+        """Продолжить незавершённые задачи после перезапуска бота"""
+        for job in list(self._jobs.values()):
+            if job['status'] == STATUS_RUNNING and job['job_id'] not in self._tasks:
+                logger.info("Возобновление задачи расформирования %s с позиции %s/%s",
+                            job['job_id'], job['cursor'], len(job['member_ids']))
+                self._spawn(job)
+
+    # Выполнение
+
+    def _spawn(self, job: Dict[str, Any]):
+        task = asyncio.create_task(self._run_job(job))
+        self._tasks[job['job_id']] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job['job_id'], None))
+
+    def _make_control_view(self) -> Optional[discord.ui.View]:
+        return self.control_view_factory() if self.control_view_factory else None
+
+    async def _run_job(self, job: Dict[str, Any]):
+        guild = self.bot.get_guild(job['guild_id'])
+        message = await self._fetch_progress_message(job)
+
+        try:
+            if not guild:
+                raise RuntimeError(f"Сервер {job['guild_id']} недоступен")
+
+            roles = [role for role in (guild.get_role(role_id) for role_id in job['role_ids']) if role]
+            reason = get_role_reason(guild.id, "role_removal.administrative", "Административное снятие роли").format(
+                moderator=f"<@{job['admin_id']}>"
+            )
+            last_progress_edit = 0.0
+
+            while job['status'] == STATUS_RUNNING and job['cursor'] < len(job['member_ids']):
+                chunk = job['member_ids'][job['cursor']:job['cursor'] + self.CHUNK_SIZE]
+                factories = []
+                for member_id in chunk:
+                    member = guild.get_member(member_id)
+                    roles_to_remove = [role for role in roles if member and role in member.roles]
+                    if roles_to_remove:
+                        factories.append((member_id, self._make_removal(member, roles_to_remove, reason)))
+
+                results = await mutation_queue.run_batch(
+                    ('roles', guild.id),
+                    [factory for _, factory in factories],
+                    priority=MutationPriority.BULK
+                )
+                for (member_id, _), result in zip(factories, results):
+                    if isinstance(result, Exception):
+                        logger.warning("Не удалось снять роли у %s: %s", member_id, result)
+                        job['failed_ids'].append(member_id)
+
+                # Ушедшие участники и участники без ролей считаются обработанными
+                job['succeeded'] += len(chunk) - sum(1 for result in results if isinstance(result, Exception))
+                job['cursor'] += len(chunk)
+                job['updated_at'] = datetime.now().isoformat()
+                await self._save()
+
+                now = time.monotonic()
+                if now - last_progress_edit >= self.PROGRESS_EDIT_INTERVAL:
+                    last_progress_edit = now
+                    await self._edit_progress(message, job)
+
+            if job['status'] == STATUS_RUNNING:
+                job['status'] = STATUS_COMPLETED
+                job['updated_at'] = datetime.now().isoformat()
+                await self._save()
+                await self._send_audit_log(guild, job)
+
+        except Exception as e:
+            logger.error("Ошибка выполнения задачи расформирования %s: %s", job['job_id'], e)
+            job['status'] = STATUS_FAILED
+            job['updated_at'] = datetime.now().isoformat()
+            await self._save()
+
+        await self._edit_progress(message, job, final=True)
+
+    @staticmethod
+    def _make_removal(member: discord.Member, roles: List[discord.Role], reason: str):
+        async def remove():
+            await member.remove_roles(*roles, reason=reason)
+        return remove
+
+    async def _fetch_progress_message(self, job: Dict[str, Any]) -> Optional[discord.Message]:
+        channel = self.bot.get_channel(job['channel_id'])
+        if not channel or not job.get('message_id'):
+            return None
+        try:
+            return await channel.fetch_message(job['message_id'])
+        except Exception as e:
+            logger.warning("Сообщение прогресса задачи %s недоступно: %s", job['job_id'], e)
+            return None
+
+    async def _edit_progress(self, message: Optional[discord.Message], job: Dict[str, Any], final: bool = False):
+        if not message:
+            return
+        try:
+            view = None if final else self._make_control_view()
+            await message.edit(embed=self.build_progress_embed(job), view=view)
+        except Exception as e:
+            logger.warning("Не удалось обновить прогресс задачи %s: %s", job['job_id'], e)
+
+    def build_progress_embed(self, job: Dict[str, Any]) -> discord.Embed:
+        """Собрать embed прогресса/результата задачи"""
+        total = len(job['member_ids'])
+        status = job['status']
+
+        titles = {
+            STATUS_RUNNING: ("🔄 Расформирование ролей", discord.Color.orange()),
+            STATUS_COMPLETED: ("✅ Расформирование завершено", discord.Color.green()),
+            STATUS_CANCELLED: ("⏹️ Расформирование отменено", discord.Color.dark_grey()),
+            STATUS_FAILED: ("❌ Ошибка расформирования", discord.Color.red()),
+        }
+        title, color = titles.get(status, titles[STATUS_RUNNING])
+
+        embed = discord.Embed(
+            title=title,
+            description=f"Обработка: {job['cursor']}/{total} пользователей",
+            color=color
+        )
+        embed.add_field(
+            name="Расформированные роли",
+            value=", ".join(f"<@&{role_id}>" for role_id in job['role_ids']),
+            inline=False
+        )
+        embed.add_field(
+            name="Статистика",
+            value=f"**Успешно:** {job['succeeded']}\n**Ошибок:** {len(job['failed_ids'])}",
+            inline=False
+        )
+
+        failed_ids = job['failed_ids']
+        if failed_ids:
+            failed_mentions = [f"<@{user_id}>" for user_id in failed_ids[:10]]  # Show max 10
+            if len(failed_ids) > 10:
+                failed_mentions.append(f"... и ещё {len(failed_ids) - 10}")
+            embed.add_field(name="⚠️ Не удалось обработать", value=", ".join(failed_mentions), inline=False)
+
+        embed.set_footer(text=f"Расформировал: {job['admin_name']} • Задача {job['job_id']}")
+        embed.timestamp = discord.utils.utcnow()
+        return embed
+
+    async def _send_audit_log(self, guild: discord.Guild, job: Dict[str, Any]):
+        """Send audit log message"""
+        try:
+            config = load_config()
+            audit_channel_id = config.get('audit_channel')
+
+            if not audit_channel_id:
+                logger.info("No audit channel configured")
+                return
+
+            audit_channel = guild.get_channel(audit_channel_id)
+            if not audit_channel:
+                logger.info("Audit channel not found: %s", audit_channel_id)
+                return
+
+            audit_embed = discord.Embed(
+                title="🔧 Административное действие",
+                description=f"<@{job['admin_id']}> расформировал роли",
+                color=discord.Color.blue()
+            )
+            audit_embed.add_field(
+                name="Расформированные роли",
+                value=", ".join(f"<@&{role_id}>" for role_id in job['role_ids']),
+                inline=False
+            )
+            audit_embed.add_field(name="Затронуто пользователей", value=str(job['succeeded']), inline=True)
+            audit_embed.set_footer(text=f"ID администратора: {job['admin_id']}")
+            audit_embed.timestamp = discord.utils.utcnow()
+
+            await audit_outbox.publish(audit_channel, audit_embed)
+            logger.info("Sent audit log for role disband job %s", job['job_id'])
+
+        except Exception as e:
+            logger.warning("Error sending audit log: %s", e)
@@ -0,0 +1,283 @@
+"""
+Discord Mutation Queue
+
+Общая очередь изменяющих запросов к Discord (роли, никнеймы) с учётом rate limit.
+
+Features:
+- Маршруты (route) по типу запроса и гильдии - совпадают с bucket'ами Discord
+- Ограничение параллельности на маршрут
+- Приоритеты: интерактивные действия модераторов обгоняют массовые операции
+- Backpressure: массовые операции ждут, если очередь переполнена
+- Повторы при 429/5xx с учётом retry_after
+- Статистика выполнения и rate limit'ов
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import discord
+from utils.logging_setup import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+
+class MutationPriority(IntEnum):
+    """Приоритет запроса: меньшее значение выполняется раньше"""
+    INTERACTIVE = 0
+    BULK = 10
+
+
+class _MutationJob:
+    """Одна операция в очереди"""
+
+    __slots__ = ('factory', 'future', 'priority', 'description', 'attempts')
+
+    def __init__(self, factory: Callable[[], Awaitable[Any]], future: asyncio.Future,
+                 priority: int, description: str):
+        self.factory = factory
+        self.future = future
+        self.priority = priority
+        self.description = description
+        self.attempts = 0
+
+
+class _RouteState:
+    """Состояние одного маршрута: куча заданий, активные воркеры, пауза после 429"""
+
+    def __init__(self):
+        self.heap: List[Tuple[int, int, _MutationJob]] = []
+        self.workers = 0
+        self.in_flight = 0
+        self.blocked_until = 0.0
+
+
+class DiscordMutationQueue:
+    """Планировщик изменяющих запросов к Discord"""
+
+    def __init__(self, route_concurrency: int = 2, max_pending_bulk: int = 100, max_attempts: int = 4):
+        self.route_concurrency = route_concurrency
+        self.max_pending_bulk = max_pending_bulk
+        self.max_attempts = max_attempts
+
+        self._routes: Dict[Tuple[str, int], _RouteState] = {}
+        self._sequence = itertools.count()
+        self._bulk_slots: Optional[asyncio.Semaphore] = None
+
+        # Статистика очереди
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'retried': 0,
+            'rate_limited': 0,
+            'retry_after_total': 0.0,
+            'retry_after_max': 0.0,
+            'bulk_waits': 0,
+        }
+
+    def _get_bulk_slots(self) -> asyncio.Semaphore:
+        """Семафор создаётся лениво, чтобы привязаться к работающему event loop"""
+        if self._bulk_slots is None:
+            self._bulk_slots = asyncio.Semaphore(self.max_pending_bulk)
+        return self._bulk_slots
+
+    async def submit(self, route: Tuple[str, int], factory: Callable[[], Awaitable[Any]],
+                     priority: int = MutationPriority.INTERACTIVE, description: str = "") -> Any:
+        """
+        Поставить операцию в очередь и дождаться результата
+
+        Args:
+            route: Ключ маршрута, например ('roles', guild_id)
+            factory: Функция без аргументов, создающая корутину запроса (вызывается на каждую попытку)
+            priority: Приоритет операции
+            description: Описание для логов
+
+        Returns:
+            Результат корутины; исключения Discord пробрасываются вызывающему
+        """
+        bulk = priority >= MutationPriority.BULK
+        slots = self._get_bulk_slots() if bulk else None
+
+        if slots is not None:
+            if slots.locked():
+                self._stats['bulk_waits'] += 1
+            await slots.acquire()
+
+        try:
+            future = asyncio.get_running_loop().create_future()
+            job = _MutationJob(factory, future, int(priority), description)
+            self._stats['submitted'] += 1
+            self._enqueue(route, job)
+            return await future
+        finally:
+            if slots is not None:
+                slots.release()
+
+    def _enqueue(self, route: Tuple[str, int], job: _MutationJob):
+        state = self._routes.setdefault(route, _RouteState())
+        heapq.heappush(state.heap, (job.priority, next(self._sequence), job))
+
+        if state.workers < self.route_concurrency:
+            state.workers += 1
+            asyncio.create_task(self._route_worker(route, state))
+
+    async def _route_worker(self, route: Tuple[str, int], state: _RouteState):
+        """Воркер маршрута: выполняет задания по приоритету, пока куча не опустеет"""
+        try:
+            while state.heap:
+                delay = state.blocked_until - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                _, _, job = heapq.heappop(state.heap)
+                if job.future.cancelled():
+                    continue
+
+                state.in_flight += 1
+                try:
+                    await self._run_job(route, state, job)
+                finally:
+                    state.in_flight -= 1
+        finally:
+            state.workers -= 1
+            if state.workers == 0 and not state.heap:
+                self._routes.pop(route, None)
+
+    async def _run_job(self, route: Tuple[str, int], state: _RouteState, job: _MutationJob):
+        job.attempts += 1
+        try:
+            result = await job.factory()
+        except discord.RateLimited as e:
+            self._register_rate_limit(route, state, e.retry_after)
+            self._retry_or_fail(route, job, e)
+            return
+        except discord.HTTPException as e:
+            if e.status == 429 or e.status >= 500:
+                if e.status == 429:
+                    retry_after = getattr(e, 'retry_after', None) or 1.0
+                    self._register_rate_limit(route, state, retry_after)
+                else:
+                    state.blocked_until = max(state.blocked_until, time.monotonic() + min(2 ** job.attempts, 30))
+                self._retry_or_fail(route, job, e)
+                return
+            self._fail(job, e)
+            return
+        except Exception as e:
+            self._fail(job, e)
+            return
+
+        self._stats['completed'] += 1
+        if not job.future.done():
+            job.future.set_result(result)
+
+    def _register_rate_limit(self, route: Tuple[str, int], state: _RouteState, retry_after: float):
+        self._stats['rate_limited'] += 1
+        self._stats['retry_after_total'] += retry_after
+        self._stats['retry_after_max'] = max(self._stats['retry_after_max'], retry_after)
+        state.blocked_until = max(state.blocked_until, time.monotonic() + retry_after)
+        logger.warning("Rate limit на маршруте %s: пауза %.2f сек", route, retry_after)
+
+    def _retry_or_fail(self, route: Tuple[str, int], job: _MutationJob, error: Exception):
+        if job.attempts >= self.max_attempts:
+            self._fail(job, error)
+            return
+
+        self._stats['retried'] += 1
+        logger.info("Повтор операции %s (попытка %s): %s", job.description or route, job.attempts + 1, error)
+        self._enqueue(route, job)
+
+    def _fail(self, job: _MutationJob, error: Exception):
+        self._stats['failed'] += 1
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    async def run_batch(self, route: Tuple[str, int], factories: Iterable[Callable[[], Awaitable[Any]]],
+                        priority: int = MutationPriority.BULK,
+                        progress_callback: Optional[Callable[[int, int], Awaitable[None]]] = None) -> List[Any]:
+        """
+        Выполнить набор операций через очередь с отчётом о прогрессе
+
+        Args:
+            route: Ключ маршрута
+            factories: Фабрики корутин
+            priority: Приоритет (по умолчанию массовый)
+            progress_callback: async-функция (выполнено, всего), вызывается после каждой операции
+
+        Returns:
+            List: результаты или исключения в порядке factories
+        """
+        factories = list(factories)
+        total = len(factories)
+        done = 0
+
+        async def run_one(factory):
+            nonlocal done
+            try:
+                return await self.submit(route, factory, priority)
+            except Exception as e:
+                return e
+            finally:
+                done += 1
+                if progress_callback:
+                    try:
+                        await progress_callback(done, total)
+                    except Exception as e:
+                        logger.warning("Ошибка callback прогресса: %s", e)
+
+        return await asyncio.gather(*(run_one(factory) for factory in factories))
+
+    # Типовые операции
+
+    async def remove_roles(self, member: discord.Member, *roles: discord.Role, reason: Optional[str] = None,
+                           priority: int = MutationPriority.INTERACTIVE):
+        """Снять роли у участника через очередь"""
+        return await self.submit(
+            ('roles', member.guild.id),
+            lambda: member.remove_roles(*roles, reason=reason),
+            priority,
+            f"remove_roles {member.id}"
+        )
+
+    async def add_roles(self, member: discord.Member, *roles: discord.Role, reason: Optional[str] = None,
+                        priority: int = MutationPriority.INTERACTIVE):
+        """Выдать роли участнику через очередь"""
+        return await self.submit(
+            ('roles', member.guild.id),
+            lambda: member.add_roles(*roles, reason=reason),
+            priority,
+            f"add_roles {member.id}"
+        )
+
+    async def edit_member(self, member: discord.Member, priority: int = MutationPriority.INTERACTIVE, **fields):
+        """Изменить участника (никнейм и т.п.) через очередь"""
+        return await self.submit(
+            ('member_edit', member.guild.id),
+            lambda: member.edit(**fields),
+            priority,
+            f"edit {member.id}"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика очереди и текущая загрузка маршрутов"""
+        stats = dict(self._stats)
+        stats['pending'] = sum(len(state.heap) for state in self._routes.values())
+        stats['in_flight'] = sum(state.in_flight for state in self._routes.values())
+        stats['routes'] = {
+            f"{kind}:{guild_id}": {
+                'pending': len(state.heap),
+                'in_flight': state.in_flight,
+                'blocked_for': round(max(0.0, state.blocked_until - time.monotonic()), 2),
+            }
+            for (kind, guild_id), state in self._routes.items()
+        }
+        return stats
+
+
+# Глобальный экземпляр очереди
+mutation_queue = DiscordMutationQueue()
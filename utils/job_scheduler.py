@@ -0,0 +1,348 @@
+"""
+Job Scheduler
+
+Единый планировщик периодических задач бота.
+
+Features:
+- Триггеры: интервальный, cron (час/минута в часовом поясе), динамический (задача сама возвращает задержку)
+- Персистентное хранение last_run/next_run в data/scheduler_state.json
+- Догоняющий запуск пропущенных выполнений после простоя (с окном misfire_grace)
+- Jitter, повтор с задержкой после ошибки
+- Метрики выполнения по каждой задаче
+- Один супервизор на все задачи: повторный start() после переподключения ничего не дублирует
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+import pytz
+from utils.logging_setup import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+IntOrGetter = Union[int, Callable[[], int]]
+
+
+def _resolve(value: IntOrGetter) -> int:
+    return value() if callable(value) else value
+
+
+class IntervalTrigger:
+    """Запуск каждые N секунд"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def next_fire_time(self, after: datetime) -> datetime:
+        return after + timedelta(seconds=self.seconds)
+
+
+class CronTrigger:
+    """
+    Ежедневный запуск в заданные час и минуту
+
+    hour/minute могут быть функциями - значение читается при каждом расчёте,
+    так время из конфигурации применяется без перезапуска.
+    """
+
+    def __init__(self, hour: IntOrGetter = 0, minute: IntOrGetter = 0, timezone: str = 'Europe/Moscow'):
+        self.hour = hour
+        self.minute = minute
+        self.timezone = pytz.timezone(timezone)
+
+    def next_fire_time(self, after: datetime) -> datetime:
+        local_after = after.astimezone(self.timezone)
+        target = local_after.replace(hour=_resolve(self.hour), minute=_resolve(self.minute), second=0, microsecond=0)
+        if target <= local_after:
+            target = self.timezone.normalize(target + timedelta(days=1))
+        return target
+
+
+class DynamicTrigger:
+    """
+    Время следующего запуска определяет сама задача: она возвращает задержку в секундах
+    или None (ждать до run_soon)
+    """
+
+    def __init__(self, error_delay: float = 15.0):
+        self.error_delay = error_delay
+
+    def next_fire_time(self, after: datetime) -> datetime:
+        return after
+
+
+class ScheduledJob:
+    """Зарегистрированная задача и её метрики"""
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[Any]], trigger,
+                 jitter: float = 0.0, catch_up: bool = True, misfire_grace: Optional[float] = None,
+                 retry_delay: float = 300.0):
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.misfire_grace = misfire_grace
+        self.retry_delay = retry_delay
+
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[datetime] = None
+        self.running = False
+        self.rerun_requested = False
+
+        self.stats = {
+            'runs': 0,
+            'failures': 0,
+            'last_duration': None,
+            'total_duration': 0.0,
+            'max_duration': 0.0,
+            'last_error': None,
+        }
+
+    @property
+    def persistent(self) -> bool:
+        return not isinstance(self.trigger, DynamicTrigger)
+
+    @property
+    def stateful(self) -> bool:
+        """Время запуска сохраняется между перезапусками: cron-задачи и задачи с догоняющим запуском"""
+        return self.persistent and (isinstance(self.trigger, CronTrigger) or self.catch_up)
+
+    def schedule_next(self, now: datetime):
+        next_run = self.trigger.next_fire_time(now)
+        if self.jitter:
+            next_run += timedelta(seconds=random.uniform(0, self.jitter))
+        self.next_run = next_run
+
+
+class JobScheduler:
+    """Супервизор всех периодических задач"""
+
+    STATE_FILE = "data/scheduler_state.json"
+
+    def __init__(self):
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._state: Dict[str, Dict[str, str]] = self._load_state()
+        self._task: Optional[asyncio.Task] = None
+        self._wake_event: Optional[asyncio.Event] = None
+
+    # Хранилище состояния
+
+    def _load_state(self) -> Dict[str, Dict[str, str]]:
+        try:
+            if os.path.exists(self.STATE_FILE):
+                with open(self.STATE_FILE, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning("Ошибка загрузки состояния планировщика: %s", e)
+        return {}
+
+    def _save_state(self):
+        try:
+            os.makedirs(os.path.dirname(self.STATE_FILE), exist_ok=True)
+            tmp_path = f"{self.STATE_FILE}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.STATE_FILE)
+        except Exception as e:
+            logger.warning("Ошибка сохранения состояния планировщика: %s", e)
+
+    def _persist_job(self, job: ScheduledJob):
+        # Частые интервальные задачи без catch_up не пишут состояние на диск после каждого запуска
+        if not job.stateful:
+            return
+        self._state[job.name] = {
+            'last_run': job.last_run.isoformat() if job.last_run else None,
+            'next_run': job.next_run.isoformat() if job.next_run else None,
+        }
+        self._save_state()
+
+    # Регистрация
+
+    def add_job(self, name: str, func: Callable[[], Awaitable[Any]], trigger,
+                jitter: float = 0.0, catch_up: bool = True, misfire_grace: Optional[float] = None,
+                retry_delay: float = 300.0) -> ScheduledJob:
+        """
+        Зарегистрировать задачу (повторная регистрация с тем же именем заменяет функцию и триггер)
+
+        Args:
+            name: Уникальное имя задачи
+            func: async-функция без аргументов
+            trigger: IntervalTrigger, CronTrigger или DynamicTrigger
+            jitter: Случайная добавка к времени запуска, секунд
+            catch_up: Выполнить пропущенный во время простоя запуск
+            misfire_grace: Максимальное опоздание (секунд) для догоняющего запуска; None - без ограничения
+            retry_delay: Задержка повтора после ошибки, секунд
+        """
+        now = datetime.now(pytz.utc)
+        existing = self._jobs.get(name)
+
+        if existing:
+            # Переподключение/перезагрузка: обновляем задачу на месте, расписание и метрики сохраняются
+            existing.func, existing.trigger, existing.jitter = func, trigger, jitter
+            existing.catch_up, existing.misfire_grace, existing.retry_delay = catch_up, misfire_grace, retry_delay
+            self._wake()
+            return existing
+
+        job = ScheduledJob(name, func, trigger, jitter, catch_up, misfire_grace, retry_delay)
+
+        if job.stateful and name in self._state:
+            saved = self._state[name]
+            job.last_run = datetime.fromisoformat(saved['last_run']) if saved.get('last_run') else None
+            saved_next = datetime.fromisoformat(saved['next_run']) if saved.get('next_run') else None
+
+            if saved_next and saved_next <= now and catch_up and (
+                misfire_grace is None or (now - saved_next).total_seconds() <= misfire_grace
+            ):
+                logger.info("Задача %s пропустила запуск %s - будет выполнена сейчас", name, saved_next.isoformat())
+                job.next_run = now
+            elif saved_next and saved_next > now:
+                job.next_run = saved_next
+            else:
+                job.schedule_next(now)
+        elif job.persistent:
+            job.schedule_next(now)
+        else:
+            job.next_run = now
+
+        self._jobs[name] = job
+        self._persist_job(job)
+        self._wake()
+        return job
+
+    def remove_job(self, name: str):
+        self._jobs.pop(name, None)
+        self._wake()
+
+    def run_soon(self, name: str):
+        """Запустить задачу при ближайшей возможности"""
+        job = self._jobs.get(name)
+        if not job:
+            return
+        if job.running:
+            job.rerun_requested = True
+        else:
+            job.next_run = datetime.now(pytz.utc)
+            self._wake()
+
+    def reschedule(self, name: str):
+        """Пересчитать время следующего запуска (например, после изменения времени в настройках)"""
+        job = self._jobs.get(name)
+        if job and job.persistent and not job.running:
+            job.schedule_next(datetime.now(pytz.utc))
+            self._persist_job(job)
+            self._wake()
+
+    def has_job(self, name: str) -> bool:
+        return name in self._jobs
+
+    # Супервизор
+
+    def start(self):
+        """Запустить супервизор (повторный вызов ничего не делает)"""
+        if self._task and not self._task.done():
+            return
+        self._wake_event = asyncio.Event()
+        self._task = asyncio.create_task(self._supervisor_loop())
+        logger.info("Планировщик задач запущен (%s задач)", len(self._jobs))
+
+    def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            logger.info("Планировщик задач остановлен")
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._task and not self._task.done())
+
+    def _wake(self):
+        if self._wake_event:
+            self._wake_event.set()
+
+    async def _supervisor_loop(self):
+        while True:
+            try:
+                self._wake_event.clear()
+                now = datetime.now(pytz.utc)
+
+                for job in list(self._jobs.values()):
+                    if not job.running and job.next_run and job.next_run <= now:
+                        job.running = True
+                        asyncio.create_task(self._run_job(job))
+
+                pending = [job.next_run for job in self._jobs.values() if job.next_run and not job.running]
+                timeout = max(0.0, (min(pending) - now).total_seconds()) if pending else None
+
+                try:
+                    await asyncio.wait_for(self._wake_event.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Ошибка супервизора планировщика: %s", e)
+                await asyncio.sleep(5)
+
+    async def _run_job(self, job: ScheduledJob):
+        started = time.monotonic()
+        result = None
+        failed = False
+
+        try:
+            result = await job.func()
+        except Exception as e:
+            failed = True
+            job.stats['failures'] += 1
+            job.stats['last_error'] = str(e)
+            logger.warning("Ошибка выполнения задачи %s: %s", job.name, e)
+        finally:
+            duration = time.monotonic() - started
+            job.stats['runs'] += 1
+            job.stats['last_duration'] = round(duration, 3)
+            job.stats['total_duration'] += duration
+            job.stats['max_duration'] = max(job.stats['max_duration'], duration)
+
+            now = datetime.now(pytz.utc)
+            job.last_run = now
+            job.running = False
+
+            # Задачу могли перерегистрировать или удалить, пока она выполнялась
+            if self._jobs.get(job.name) is job:
+                if job.rerun_requested:
+                    # run_soon() во время выполнения
+                    job.rerun_requested = False
+                    job.next_run = now
+                elif isinstance(job.trigger, DynamicTrigger):
+                    delay = job.trigger.error_delay if failed else result
+                    job.next_run = now + timedelta(seconds=delay) if delay is not None else None
+                else:
+                    job.schedule_next(now)
+                    if failed:
+                        job.next_run = min(job.next_run, now + timedelta(seconds=job.retry_delay))
+                self._persist_job(job)
+                self._wake()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Метрики всех задач"""
+        result = {}
+        for name, job in self._jobs.items():
+            stats = dict(job.stats)
+            stats['avg_duration'] = round(stats['total_duration'] / stats['runs'], 3) if stats['runs'] else None
+            stats['total_duration'] = round(stats['total_duration'], 3)
+            stats['max_duration'] = round(stats['max_duration'], 3)
+            stats['running'] = job.running
+            stats['last_run'] = job.last_run.isoformat() if job.last_run else None
+            stats['next_run'] = job.next_run.isoformat() if job.next_run else None
+            result[name] = stats
+        return result
+
+
+# Глобальный экземпляр планировщика
+job_scheduler = JobScheduler()
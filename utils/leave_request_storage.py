@@ -1,47 +1,145 @@
 """
 Storage system for leave requests
 Handles daily data with automatic cleanup at midnight MSK
+
+Requests are stored in SQLite (data/leave_requests.db): primary key lookup by
+request id, index on (day, user_id), single-row transactional updates.
+All rows are also kept in memory, so reads never touch the disk.
 """
 import json
 import os
-from datetime import datetime, timedelta
+import sqlite3
+import threading
+from datetime import datetime
 import pytz
-from typing import List, Optional
-import asyncio
+from typing import Dict, List, Optional, Tuple
+from utils.job_scheduler import job_scheduler, CronTrigger
 from utils.logging_setup import get_logger
 
 # Initialize logger
 logger = get_logger(__name__)
 
+# Request fields in table column order
+_COLUMNS = (
+    "id", "day", "user_id", "guild_id", "name", "static", "start_time", "end_time",
+    "duration_minutes", "reason", "department", "status", "timestamp",
+    "reviewer_id", "reviewer_name", "review_timestamp", "rejection_reason",
+)
+
+_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS leave_requests (
+        id TEXT PRIMARY KEY,
+        day TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        guild_id INTEGER,
+        name TEXT,
+        static TEXT,
+        start_time TEXT,
+        end_time TEXT,
+        duration_minutes INTEGER,
+        reason TEXT,
+        department TEXT,
+        status TEXT NOT NULL DEFAULT 'pending',
+        timestamp TEXT NOT NULL,
+        reviewer_id INTEGER,
+        reviewer_name TEXT,
+        review_timestamp TEXT,
+        rejection_reason TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_leave_requests_day_user ON leave_requests (day, user_id);
+"""
+
 
 class LeaveRequestStorage:
     """Manages leave request data storage with daily cleanup"""
     
     MOSCOW_TZ = pytz.timezone('Europe/Moscow')
+    DB_FILE = "data/leave_requests.db"
+    # Legacy JSON storage, imported once into the database
     DATA_FILE = "data/leave_requests.json"
+    CLEANUP_JOB_NAME = 'leave_requests_cleanup'
+    
+    _conn: Optional[sqlite3.Connection] = None
+    _lock = threading.RLock()
+    # In-memory read path: request_id -> request, (day, user_id) -> [request_id]
+    _requests: Dict[str, dict] = {}
+    _by_day_user: Dict[Tuple[str, int], List[str]] = {}
     
     @classmethod
-    def _ensure_data_file(cls):
-        """Ensure data file exists"""
-        os.makedirs("data", exist_ok=True)
-        if not os.path.exists(cls.DATA_FILE):
-            cls._save_data({})
+    def _get_connection(cls) -> sqlite3.Connection:
+        """Open database on first use and load all requests into memory"""
+        if cls._conn is not None:
+            return cls._conn
+        
+        with cls._lock:
+            if cls._conn is not None:
+                return cls._conn
+            
+            os.makedirs(os.path.dirname(cls.DB_FILE), exist_ok=True)
+            conn = sqlite3.connect(cls.DB_FILE, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA_SQL)
+            cls._import_legacy_json(conn)
+            
+            cls._requests = {}
+            cls._by_day_user = {}
+            for row in conn.execute("SELECT * FROM leave_requests ORDER BY timestamp"):
+                cls._remember(dict(row))
+            
+            cls._conn = conn
+            return conn
     
     @classmethod
-    def _load_data(cls) -> dict:
-        """Load data from file"""
-        cls._ensure_data_file()
+    def _import_legacy_json(cls, conn: sqlite3.Connection):
+        """Move requests from the old JSON file into the database"""
+        if not os.path.exists(cls.DATA_FILE):
+            return
         try:
             with open(cls.DATA_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+                data = json.load(f)
+            
+            rows = []
+            for day, date_data in data.items():
+                for user_requests in date_data.values():
+                    for request in user_requests:
+                        rows.append(tuple({**request, "day": day}.get(column) for column in _COLUMNS))
+            
+            with conn:
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO leave_requests ({', '.join(_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                    rows
+                )
+            os.replace(cls.DATA_FILE, f"{cls.DATA_FILE}.migrated")
+            logger.info("Leave requests imported from %s: %s", cls.DATA_FILE, len(rows))
+        except Exception as e:
+            logger.error("Error importing leave requests from %s: %s", cls.DATA_FILE, e)
     
     @classmethod
-    def _save_data(cls, data: dict):
-        """Save data to file"""
-        with open(cls.DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def _remember(cls, request: dict):
+        """Add request to in-memory indexes"""
+        cls._requests[request["id"]] = request
+        cls._by_day_user.setdefault((request["day"], request["user_id"]), []).append(request["id"])
+    
+    @classmethod
+    def _forget(cls, request: dict):
+        """Remove request from in-memory indexes"""
+        cls._requests.pop(request["id"], None)
+        key = (request["day"], request["user_id"])
+        ids = cls._by_day_user.get(key)
+        if ids:
+            if request["id"] in ids:
+                ids.remove(request["id"])
+            if not ids:
+                del cls._by_day_user[key]
+    
+    @staticmethod
+    def _public(request: dict) -> dict:
+        """Copy of request without storage-only fields"""
+        result = dict(request)
+        result.pop("day", None)
+        return result
     
     @classmethod
     def _get_today_key(cls) -> str:
@@ -61,22 +159,17 @@ class LeaveRequestStorage:
         Add new leave request
         Returns: request_id
         """
-        data = cls._load_data()
+        conn = cls._get_connection()
         today = cls._get_today_key()
         request_id = cls._generate_request_id()
         
-        if today not in data:
-            data[today] = {}
-        
-        user_key = str(user_id)
-        if user_key not in data[today]:
-            data[today][user_key] = []
-          # Calculate duration
+        # Calculate duration
         from forms.leave_requests.utils import LeaveRequestValidator
         duration = LeaveRequestValidator.calculate_duration_minutes(start_time, end_time)
         
         request = {
             "id": request_id,
+            "day": today,
             "user_id": user_id,
             "guild_id": guild_id,
             "name": name,
@@ -94,60 +187,65 @@ class LeaveRequestStorage:
             "rejection_reason": None
         }
         
-        data[today][user_key].append(request)
-        cls._save_data(data)
+        with cls._lock, conn:
+            conn.execute(
+                f"INSERT INTO leave_requests ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                tuple(request[column] for column in _COLUMNS)
+            )
+            cls._remember(request)
         
         return request_id
     
     @classmethod
     def get_user_requests_today(cls, user_id: int) -> List[dict]:
         """Get all user's requests for today"""
-        data = cls._load_data()
-        today = cls._get_today_key()
-        user_key = str(user_id)
-        
-        if today not in data or user_key not in data[today]:
-            return []
-        
-        return data[today][user_key]
+        cls._get_connection()
+        request_ids = cls._by_day_user.get((cls._get_today_key(), user_id), [])
+        return [cls._public(cls._requests[request_id]) for request_id in request_ids]
     
     @classmethod
     def get_request_by_id(cls, request_id: str) -> Optional[dict]:
         """Get request by ID"""
-        data = cls._load_data()
-        
-        for date_data in data.values():
-            for user_requests in date_data.values():
-                for request in user_requests:
-                    if request["id"] == request_id:
-                        return request
-        
-        return None
+        cls._get_connection()
+        request = cls._requests.get(request_id)
+        return cls._public(request) if request else None
     
     @classmethod
     def update_request_status(cls, request_id: str, status: str, reviewer_id: int, 
-                            reviewer_name: str, rejection_reason: str = None) -> bool:
+                            reviewer_name: str, rejection_reason: str = None,
+                            expected_status: Optional[str] = "pending") -> bool:
         """
         Update request status
+        Only updates if current status equals expected_status (None - any status),
+        so concurrent reviews of the same request cannot overwrite each other
         Returns: True if updated successfully
         """
-        data = cls._load_data()
+        conn = cls._get_connection()
+        review_timestamp = datetime.now(cls.MOSCOW_TZ).isoformat()
         
-        for date_data in data.values():
-            for user_requests in date_data.values():
-                for request in user_requests:
-                    if request["id"] == request_id:
-                        request["status"] = status
-                        request["reviewer_id"] = reviewer_id
-                        request["reviewer_name"] = reviewer_name
-                        request["review_timestamp"] = datetime.now(cls.MOSCOW_TZ).isoformat()
-                        if rejection_reason:
-                            request["rejection_reason"] = rejection_reason
-                        
-                        cls._save_data(data)
-                        return True
-        
-        return False    
+        with cls._lock, conn:
+            request = cls._requests.get(request_id)
+            if not request:
+                return False
+            
+            query = ("UPDATE leave_requests SET status = ?, reviewer_id = ?, reviewer_name = ?, "
+                     "review_timestamp = ?, rejection_reason = COALESCE(?, rejection_reason) WHERE id = ?")
+            params = [status, reviewer_id, reviewer_name, review_timestamp, rejection_reason, request_id]
+            if expected_status is not None:
+                query += " AND status = ?"
+                params.append(expected_status)
+            
+            if conn.execute(query, params).rowcount != 1:
+                return False
+            
+            request["status"] = status
+            request["reviewer_id"] = reviewer_id
+            request["reviewer_name"] = reviewer_name
+            request["review_timestamp"] = review_timestamp
+            if rejection_reason:
+                request["rejection_reason"] = rejection_reason
+            return True
+    
     @classmethod
     def delete_request(cls, request_id: str, user_id: int, is_admin: bool = False) -> bool:
         """
@@ -158,43 +256,39 @@ class LeaveRequestStorage:
             is_admin: True if user is admin (can delete any request)
         Returns: True if deleted successfully
         """
-        data = cls._load_data()
-        
-        for date_data in data.values():
-            for user_key, user_requests in date_data.items():
-                for i, request in enumerate(user_requests):
-                    if request["id"] == request_id:
-                        # Check permissions
-                        if not is_admin and request["user_id"] != user_id:
-                            return False  # Not owner and not admin
-                        
-                        if not is_admin and request["status"] != "pending":
-                            return False  # Only pending requests can be deleted by user
-                        
-                        # Admin can delete any request, user can only delete pending own requests
-                        del user_requests[i]
-                        
-                        # Clean up empty user data
-                        if not user_requests:
-                            del date_data[user_key]
-                        
-                        cls._save_data(data)
-                        return True
+        conn = cls._get_connection()
         
-        return False
+        with cls._lock, conn:
+            request = cls._requests.get(request_id)
+            if not request:
+                return False
+            
+            # Check permissions
+            if not is_admin and request["user_id"] != user_id:
+                return False  # Not owner and not admin
+            
+            if not is_admin and request["status"] != "pending":
+                return False  # Only pending requests can be deleted by user
+            
+            # Admin can delete any request, user can only delete pending own requests
+            query = "DELETE FROM leave_requests WHERE id = ?"
+            params = [request_id]
+            if not is_admin:
+                query += " AND status = 'pending'"
+            
+            if conn.execute(query, params).rowcount != 1:
+                return False
+            
+            cls._forget(request)
+            return True
     
     @classmethod
     def get_all_requests_today(cls) -> List[dict]:
         """Get all requests for today (for moderation)"""
-        data = cls._load_data()
+        cls._get_connection()
         today = cls._get_today_key()
         
-        if today not in data:
-            return []
-        
-        all_requests = []
-        for user_requests in data[today].values():
-            all_requests.extend(user_requests)
+        all_requests = [cls._public(request) for request in cls._requests.values() if request["day"] == today]
         
         # Sort by timestamp
         all_requests.sort(key=lambda x: x["timestamp"])
@@ -203,38 +297,23 @@ class LeaveRequestStorage:
     @classmethod
     def cleanup_old_data(cls):
         """Remove data from previous days (called at midnight)"""
-        data = cls._load_data()
+        conn = cls._get_connection()
         today = cls._get_today_key()
         
         # Keep only today's data
-        cleaned_data = {today: data.get(today, {})}
-        cls._save_data(cleaned_data)
+        with cls._lock, conn:
+            conn.execute("DELETE FROM leave_requests WHERE day < ?", (today,))
+            for request in [request for request in cls._requests.values() if request["day"] < today]:
+                cls._forget(request)
         
         logger.info("Leave requests data cleaned up. Kept data for %s", today)
     
     @classmethod
-    async def start_daily_cleanup_task(cls):
-        """Start background task for daily cleanup at midnight MSK"""
-        while True:
-            try:
-                now = datetime.now(cls.MOSCOW_TZ)
-                # Calculate time until next midnight
-                tomorrow = now.replace(hour=0, minute=0, second=0, microsecond=0) + \
-                          timedelta(days=1)
-                seconds_until_midnight = (tomorrow - now).total_seconds()
-                
-                logger.info(f"⏰ Leave requests cleanup scheduled in {int(seconds_until_midnight/3600)}h {int((seconds_until_midnight%3600)/60)}m")
-                
-                # Wait until midnight
-                await asyncio.sleep(seconds_until_midnight)
-                
-                # Cleanup old data
-                cls.cleanup_old_data()
-                
-                # Wait a bit to avoid running multiple times
-                await asyncio.sleep(60)
-                
-            except Exception as e:
-                logger.warning("Error in leave requests cleanup task: %s", e)
-                # Wait 1 hour before retrying
-                await asyncio.sleep(3600)
+    def schedule_daily_cleanup(cls):
+        """Register the midnight MSK cleanup in the shared job scheduler"""
+        async def cleanup_job():
+            cls.cleanup_old_data()
+        
+        # Catch-up is safe: cleanup only keeps today's data
+        job_scheduler.add_job(cls.CLEANUP_JOB_NAME, cleanup_job, CronTrigger(hour=0, minute=0, timezone='Europe/Moscow'))
+        job_scheduler.start()
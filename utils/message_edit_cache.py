@@ -0,0 +1,104 @@
+"""
+Message Edit Cache
+
+Пропуск холостых редактирований сообщений Discord.
+
+Хранит хэш последнего отправленного содержимого (content, embeds, компоненты view)
+для каждого ID сообщения и выполняет message.edit только если содержимое изменилось.
+Поле timestamp у embed'ов в хэш не входит: периодические обновления ставят
+datetime.now() и иначе каждое редактирование считалось бы новым.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import discord
+from utils.logging_setup import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Поля message.edit, которые участвуют в сравнении
+_DIFFABLE_FIELDS = ('content', 'embed', 'embeds', 'view')
+
+
+class MessageEditCache:
+    """LRU-кэш отпечатков последних редактирований сообщений"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._fingerprints: "OrderedDict[int, str]" = OrderedDict()
+        self._stats = {
+            'edits': 0,
+            'skipped': 0,
+        }
+
+    @staticmethod
+    def _embed_to_dict(embed: Optional[discord.Embed]) -> Optional[Dict[str, Any]]:
+        if embed is None:
+            return None
+        data = embed.to_dict()
+        data.pop('timestamp', None)
+        return data
+
+    def fingerprint(self, **payload) -> str:
+        """Вычислить отпечаток содержимого редактирования"""
+        normalized = {}
+        for field in _DIFFABLE_FIELDS:
+            if field not in payload:
+                continue
+            value = payload[field]
+            if field == 'embed':
+                value = self._embed_to_dict(value)
+            elif field == 'embeds':
+                value = [self._embed_to_dict(embed) for embed in value]
+            elif field == 'view':
+                value = value.to_components() if value is not None else None
+            normalized[field] = value
+
+        raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+    async def edit_if_changed(self, message, **payload) -> bool:
+        """
+        Отредактировать сообщение, только если содержимое отличается от последнего отправленного
+
+        Args:
+            message: discord.Message или discord.PartialMessage
+            **payload: аргументы message.edit (content, embed, embeds, view, ...)
+
+        Returns:
+            bool: True если редактирование было выполнено
+        """
+        digest = self.fingerprint(**payload)
+
+        if self._fingerprints.get(message.id) == digest:
+            self._fingerprints.move_to_end(message.id)
+            self._stats['skipped'] += 1
+            return False
+
+        await message.edit(**payload)
+        self._remember(message.id, digest)
+        self._stats['edits'] += 1
+        return True
+
+    def _remember(self, message_id: int, digest: str):
+        self._fingerprints[message_id] = digest
+        self._fingerprints.move_to_end(message_id)
+        while len(self._fingerprints) > self.max_entries:
+            self._fingerprints.popitem(last=False)
+
+    def invalidate(self, message_id: int):
+        """Забыть отпечаток сообщения (следующее редактирование выполнится всегда)"""
+        self._fingerprints.pop(message_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['tracked_messages'] = len(self._fingerprints)
+        return stats
+
+
+# Глобальный экземпляр
+message_edit_cache = MessageEditCache()
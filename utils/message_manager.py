@@ -2,11 +2,17 @@
 Message management system for Army Discord Bot
 Handles loading and caching of per-guild messages from YAML files
 """
+import asyncio
+import copy
 import os
+import re
+import string
 import yaml
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from utils.logging_setup import get_logger
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Optional, Set, Tuple, List
 from pathlib import Path
 import discord
 
@@ -17,17 +23,104 @@ BACKUP_DIR = os.path.join(MESSAGES_DIR, 'backups')
 
 # Global cache for loaded messages
 _messages_cache: Dict[int, Dict[str, Any]] = {}
-# Cache for resolved messages (key_path -> resolved_message)
-_resolved_messages_cache: Dict[str, str] = {}
+# Compiled messages per guild (key_path -> message with template references expanded)
+_compiled_messages: Dict[int, Dict[str, str]] = {}
+# Parsed default messages file and its mtime (shared base for every guild)
+_default_messages: Optional[Dict[str, Any]] = None
+_default_messages_mtime: Optional[int] = None
+# File mtimes each cached guild was built from: guild_id -> (default_mtime, guild_mtime)
+_messages_mtimes: Dict[int, Tuple[Optional[int], Optional[int]]] = {}
 # Performance metrics
 _cache_hits = 0
 _cache_misses = 0
 _template_resolution_time = 0.0
-_last_cache_cleanup = time.time()
 
 # Setup logging
 logger = get_logger(__name__)
 
+# Template references like {templates.permissions.insufficient}
+_TEMPLATE_REFERENCE_PATTERN = re.compile(r'\{([^}]+)\}')
+# Only these prefixes are template references; other placeholders are format parameters
+_TEMPLATE_PREFIXES = ('templates.', 'system.', 'systems.', 'ui.', 'private_messages.', 'global.', 'moderator_notifications.', 'moderator_templates.', 'military.')
+
+# C-accelerated loader when PyYAML is built with libyaml
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Hot reload of changed message files
+MESSAGES_WATCH_JOB = 'messages_hot_reload'
+MESSAGES_WATCH_INTERVAL = 5
+
+# Maximum number of resolved non-leaf/fallback messages kept in memory
+RESOLVED_CACHE_MAX_SIZE = 1000
+
+class ResolvedMessageCache:
+    """
+    LRU cache of resolved messages keyed by (guild_id, key_path)
+    Keys are also grouped per guild, so a guild is invalidated without scanning other guilds
+    """
+
+    def __init__(self, max_size: int = RESOLVED_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[int, str], str]" = OrderedDict()
+        self._guild_keys: Dict[int, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, guild_id: int, key_path: str) -> Optional[str]:
+        key = (guild_id, key_path)
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, guild_id: int, key_path: str, value: str) -> None:
+        key = (guild_id, key_path)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._guild_keys.setdefault(guild_id, set()).add(key_path)
+
+        while len(self._entries) > self.max_size:
+            (evicted_guild, evicted_path), _ = self._entries.popitem(last=False)
+            bucket = self._guild_keys.get(evicted_guild)
+            if bucket is not None:
+                bucket.discard(evicted_path)
+                if not bucket:
+                    del self._guild_keys[evicted_guild]
+            self.evictions += 1
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        for key_path in self._guild_keys.pop(guild_id, ()):
+            self._entries.pop((guild_id, key_path), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._guild_keys.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'guilds': len(self._guild_keys),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+# Cache for resolved non-leaf paths and fallbacks
+_resolved_messages_cache = ResolvedMessageCache()
+
 def _ensure_messages_directory():
     """Ensure messages directory exists"""
     Path(MESSAGES_DIR).mkdir(parents=True, exist_ok=True)
@@ -38,52 +131,44 @@ def clear_message_cache(guild_id: Optional[int] = None):
     Clear message cache for specific guild or all guilds
     Useful for forcing reload after configuration changes
     """
-    global _messages_cache, _resolved_messages_cache, _cache_hits, _cache_misses
+    global _messages_cache, _cache_hits, _cache_misses
 
     if guild_id is None:
         _messages_cache.clear()
+        _compiled_messages.clear()
+        _messages_mtimes.clear()
         _resolved_messages_cache.clear()
+        _resolved_messages_cache.reset_stats()
         _cache_hits = 0
         _cache_misses = 0
         logger.info("Message cache cleared for all guilds")
     else:
         _messages_cache.pop(guild_id, None)
-        # Clear resolved messages that might reference this guild
-        keys_to_remove = [k for k in _resolved_messages_cache.keys() if str(guild_id) in k]
-        for key in keys_to_remove:
-            _resolved_messages_cache.pop(key, None)
+        _compiled_messages.pop(guild_id, None)
+        _messages_mtimes.pop(guild_id, None)
+        _resolved_messages_cache.invalidate_guild(guild_id)
         logger.info("Message cache cleared for guild_id=%s", guild_id)
 
 def get_cache_stats() -> Dict[str, Any]:
     """Get cache performance statistics"""
     total_requests = _cache_hits + _cache_misses
     hit_rate = (_cache_hits / total_requests * 100) if total_requests > 0 else 0
+    resolved_stats = _resolved_messages_cache.get_stats()
 
     return {
         'cache_hits': _cache_hits,
         'cache_misses': _cache_misses,
         'hit_rate': f"{hit_rate:.1f}%",
         'cached_guilds': len(_messages_cache),
-        'resolved_messages': len(_resolved_messages_cache),
+        'compiled_messages': sum(len(compiled) for compiled in _compiled_messages.values()),
+        'resolved_messages': resolved_stats['size'],
+        'resolved_max_size': resolved_stats['max_size'],
+        'resolved_hits': resolved_stats['hits'],
+        'resolved_misses': resolved_stats['misses'],
+        'resolved_evictions': resolved_stats['evictions'],
         'template_resolution_time': f"{_template_resolution_time:.4f}s"
     }
 
-def _cleanup_expired_cache():
-    """Clean up expired cache entries (run periodically)"""
-    global _last_cache_cleanup
-
-    current_time = time.time()
-    if current_time - _last_cache_cleanup > 3600:  # Clean up every hour
-        # Remove old resolved messages (keep only recent ones)
-        if len(_resolved_messages_cache) > 1000:  # Limit cache size
-            # Keep only the most recently used 500 entries
-            items = list(_resolved_messages_cache.items())
-            _resolved_messages_cache.clear()
-            _resolved_messages_cache.update(dict(items[-500:]))
-
-        _last_cache_cleanup = current_time
-        logger.debug("Message cache cleanup completed")
-
 def _load_yaml_file(file_path: str) -> Tuple[Dict[str, Any], Optional[str]]:
     """
     Load YAML file and return dictionary with error handling
@@ -94,7 +179,7 @@ def _load_yaml_file(file_path: str) -> Tuple[Dict[str, Any], Optional[str]]:
             return {}, f"File not found: {file_path}"
 
         with open(file_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=_YAML_LOADER)
 
         if data is None:
             return {}, f"Empty or invalid YAML file: {file_path}"
@@ -126,71 +211,232 @@ def _get_guild_messages_file(guild_id: int) -> str:
     """Get path to guild-specific messages file"""
     return os.path.join(MESSAGES_DIR, f'messages-{guild_id}.yml')
 
-def load_default_messages() -> Dict[str, Any]:
-    """Load default messages from template file"""
+def _get_file_mtime(file_path: str) -> Optional[int]:
+    """File modification time in nanoseconds, None if file is missing"""
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except OSError:
+        return None
+
+def _parse_default_messages(strict: bool = False) -> Tuple[Dict[str, Any], Optional[int]]:
+    """
+    Parsed default messages and their mtime, reparsed only when the file changes
+    Reads the caches but never assigns them - safe to run in a worker thread
+    strict=True raises ValueError if the changed file cannot be parsed
+    """
+    cached, cached_mtime = _default_messages, _default_messages_mtime
+
+    mtime = _get_file_mtime(DEFAULT_MESSAGES_FILE)
+    if cached is not None and mtime == cached_mtime:
+        return cached, mtime
+
     data, error = _load_yaml_file(DEFAULT_MESSAGES_FILE)
     if error:
         logger.warning("Failed to load default messages: %s", error)
-        return {}
-    return data
+        if strict:
+            raise ValueError(error)
+        # Keep the last good copy while the file is broken
+        return (cached if cached is not None else {}), mtime
+    return data, mtime
 
-def load_guild_messages(guild_id: int) -> Dict[str, Any]:
+def _store_default_messages(data: Dict[str, Any], mtime: Optional[int]):
+    """Remember parsed default messages (event loop thread only)"""
+    global _default_messages, _default_messages_mtime
+    _default_messages, _default_messages_mtime = data, mtime
+
+def _get_default_messages() -> Dict[str, Any]:
     """
-    Load messages for specific guild, with fallback to defaults
-    Uses caching for performance
+    Parsed default messages, reparsed only when the file changes
+    Returned dict is shared - callers must copy before modifying
     """
-    if guild_id in _messages_cache:
-        global _cache_hits
-        _cache_hits += 1
-        return _messages_cache[guild_id]
+    data, mtime = _parse_default_messages()
+    _store_default_messages(data, mtime)
+    return data
 
-    global _cache_misses
-    _cache_misses += 1
+def load_default_messages() -> Dict[str, Any]:
+    """Load default messages from template file"""
+    return copy.deepcopy(_get_default_messages())
+
+def _deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    result = base.copy()
+    for key, value in override.items():
+        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+            result[key] = _deep_merge(result[key], value)
+        else:
+            result[key] = value
+    return result
 
+def _build_guild_messages(guild_id: int, strict: bool = False) -> Tuple[Dict[str, Any], Dict[str, str], Tuple[Optional[int], Optional[int]], Dict[str, Any]]:
+    """
+    Parse, merge and compile messages for guild without touching the caches
+    Safe to run in a worker thread; the caller stores the parsed defaults
+    strict=True raises ValueError on a broken file instead of falling back to defaults
+    Returns: (messages, compiled_messages, (default_mtime, guild_mtime), default_messages)
+    """
     # Load defaults first
-    messages = load_default_messages()
+    defaults, default_mtime = _parse_default_messages(strict)
+    messages = copy.deepcopy(defaults)
 
     # Load guild-specific overrides
     guild_file = _get_guild_messages_file(guild_id)
+    guild_mtime = _get_file_mtime(guild_file)
     guild_overrides, error = _load_yaml_file(guild_file)
 
     if error:
+        if strict and guild_mtime is not None:
+            raise ValueError(error)
         logger.debug(f"Guild messages file not found or invalid for {guild_id}: {error}")
     else:
         # Merge overrides into defaults (deep merge)
-        def deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
-            result = base.copy()
-            for key, value in override.items():
-                if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                    result[key] = deep_merge(result[key], value)
-                else:
-                    result[key] = value
-            return result
+        messages = _deep_merge(messages, guild_overrides)
+
+    return messages, _compile_messages(messages), (default_mtime, guild_mtime), defaults
+
+def load_guild_messages(guild_id: int) -> Dict[str, Any]:
+    """
+    Load messages for specific guild, with fallback to defaults
+    Uses caching for performance
+    """
+    if guild_id in _messages_cache:
+        global _cache_hits
+        _cache_hits += 1
+        return _messages_cache[guild_id]
+
+    global _cache_misses
+    _cache_misses += 1
 
-        messages = deep_merge(messages, guild_overrides)
+    messages, compiled, mtimes, defaults = _build_guild_messages(guild_id)
 
     # Cache the result
+    _store_default_messages(defaults, mtimes[0])
     _messages_cache[guild_id] = messages
-
-    # Periodic cache cleanup
-    _cleanup_expired_cache()
+    _compiled_messages[guild_id] = compiled
+    _messages_mtimes[guild_id] = mtimes
 
     return messages
 
+def _get_changed_guilds() -> List[int]:
+    """Cached guilds whose default or guild-specific file changed on disk"""
+    default_mtime = _get_file_mtime(DEFAULT_MESSAGES_FILE)
+    return [
+        guild_id for guild_id, (cached_default, cached_guild) in list(_messages_mtimes.items())
+        if cached_default != default_mtime or cached_guild != _get_file_mtime(_get_guild_messages_file(guild_id))
+    ]
+
+async def reload_changed_messages() -> List[int]:
+    """
+    Reparse changed message files in a worker thread and swap in the result
+    Broken files are rejected - the guild keeps serving previous messages
+    Returns: list of reloaded guild ids
+    """
+    reloaded = []
+    for guild_id in _get_changed_guilds():
+        try:
+            messages, compiled, mtimes, defaults = await asyncio.to_thread(_build_guild_messages, guild_id, True)
+        except Exception as e:
+            logger.error("Changed messages for guild_id=%s rejected: %s", guild_id, e)
+            # Remember mtimes so the broken file is not reparsed until it changes again
+            if guild_id in _messages_mtimes:
+                _messages_mtimes[guild_id] = (
+                    _get_file_mtime(DEFAULT_MESSAGES_FILE), _get_file_mtime(_get_guild_messages_file(guild_id))
+                )
+            continue
+
+        # Missing sections ("⚠️") are tolerated like on a regular load, structural errors ("❌") are not
+        is_valid, errors = validate_messages_structure(guild_id, override_messages=messages)
+        structural_errors = [error for error in errors if not error.startswith("⚠️")]
+        if structural_errors:
+            if guild_id in _messages_mtimes:
+                _messages_mtimes[guild_id] = mtimes
+            logger.error("Changed messages for guild_id=%s rejected: %s", guild_id, "; ".join(structural_errors))
+            continue
+
+        # Guild cache may have been cleared while parsing - then the next lookup loads it itself
+        if guild_id not in _messages_cache:
+            continue
+
+        # Defaults are shared by all guilds: stored only once they passed validation
+        _store_default_messages(defaults, mtimes[0])
+
+        # Swap in the new messages, then drop strings resolved from the old ones
+        _compiled_messages[guild_id] = compiled
+        _messages_cache[guild_id] = messages
+        _messages_mtimes[guild_id] = mtimes
+        _resolved_messages_cache.invalidate_guild(guild_id)
+
+        reloaded.append(guild_id)
+        logger.info("Messages reloaded from disk for guild_id=%s", guild_id)
+
+    return reloaded
+
+def schedule_messages_watch():
+    """Register hot reload of message files in the shared job scheduler"""
+    from utils.job_scheduler import job_scheduler, IntervalTrigger
+
+    job_scheduler.add_job(
+        MESSAGES_WATCH_JOB,
+        reload_changed_messages,
+        IntervalTrigger(MESSAGES_WATCH_INTERVAL),
+        catch_up=False,
+        retry_delay=MESSAGES_WATCH_INTERVAL
+    )
+    job_scheduler.start()
+
+def _compile_messages(messages: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Compile merged guild messages into a flat key_path -> message dictionary
+    Template references are expanded once here instead of on every lookup
+    """
+    global _template_resolution_time
+
+    compiled: Dict[str, str] = {}
+    start_time = time.time()
+
+    def walk(node: Dict[str, Any], prefix: str) -> None:
+        for key, value in node.items():
+            if not isinstance(key, str):
+                continue
+            path = f"{prefix}.{key}" if prefix else key
+            if isinstance(value, dict):
+                walk(value, path)
+                continue
+            text = str(value)
+            if '{' in text and '}' in text:
+                text = _resolve_template_references(text, messages)
+            compiled[path] = text
+
+    walk(messages, "")
+    _template_resolution_time += time.time() - start_time
+    return compiled
+
+def _get_compiled_messages(guild_id: int) -> Dict[str, str]:
+    """Get compiled messages for guild, loading them if needed"""
+    compiled = _compiled_messages.get(guild_id)
+    if compiled is None:
+        messages = load_guild_messages(guild_id)
+        compiled = _compiled_messages.get(guild_id)
+        if compiled is None:
+            compiled = _compiled_messages[guild_id] = _compile_messages(messages)
+    return compiled
+
 def get_message(guild_id: int, key_path: str, default: str = None) -> str:
     """
     Get message by dot-separated key path (e.g., 'dismissal.ui_labels.processing')
     Supports template references like {templates.permissions.insufficient}
     Returns default if key not found
     """
-    # Create cache key
-    cache_key = f"{guild_id}:{key_path}"
-
-    # Check resolved messages cache first
-    if cache_key in _resolved_messages_cache:
+    # Compiled leaf messages: a single dict lookup
+    compiled_message = _get_compiled_messages(guild_id).get(key_path)
+    if compiled_message is not None:
         global _cache_hits
         _cache_hits += 1
-        return _resolved_messages_cache[cache_key]
+        return compiled_message
+
+    # Non-leaf paths and fallbacks are cached separately
+    resolved_message = _resolved_messages_cache.get(guild_id, key_path)
+    if resolved_message is not None:
+        _cache_hits += 1
+        return resolved_message
 
     global _cache_misses
     _cache_misses += 1
@@ -217,7 +463,7 @@ def get_message(guild_id: int, key_path: str, default: str = None) -> str:
             _template_resolution_time += time.time() - start_time
 
         # Cache the resolved result
-        _resolved_messages_cache[cache_key] = result
+        _resolved_messages_cache.set(guild_id, key_path, result)
         return result
 
     except (KeyError, TypeError) as e:
@@ -236,7 +482,7 @@ def get_message(guild_id: int, key_path: str, default: str = None) -> str:
         fallback_result = f"[{key_path}]"  # Fallback indicator
 
         # Cache the fallback result too
-        _resolved_messages_cache[cache_key] = fallback_result
+        _resolved_messages_cache.set(guild_id, key_path, fallback_result)
         return fallback_result
 
 def _find_template_fallback(key_path: str) -> str:
@@ -298,16 +544,13 @@ def _resolve_template_references(message: str, messages: Dict[str, Any]) -> str:
     Выполняет до 5 итераций, чтобы раскрыть вложенные шаблоны (например,
     permissions.insufficient → base.error_prefix).
     """
-    import re
-
-    pattern = re.compile(r'\{([^}]+)\}')
+    pattern = _TEMPLATE_REFERENCE_PATTERN
 
     def replace_template(match):
         template_path = match.group(1)
 
         # Разрешаем только известные префиксы, чтобы не трогать параметрические плейсхолдеры
-        known_prefixes = ['templates.', 'system.', 'systems.', 'ui.', 'private_messages.', 'global.', 'moderator_notifications.', 'moderator_templates.', 'military.']
-        if not any(template_path.startswith(prefix) for prefix in known_prefixes):
+        if not template_path.startswith(_TEMPLATE_PREFIXES):
             return match.group(0)
 
         try:
@@ -344,6 +587,33 @@ def _resolve_template_references(message: str, messages: Dict[str, Any]) -> str:
         logger.error("Error in template resolution for message: %s", e)
         return message
 
+class MessageTemplate:
+    """Message prepared for formatting: placeholders are parsed once"""
+
+    __slots__ = ('text', 'fields', 'error')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.error: Optional[ValueError] = None
+        fields = set()
+        try:
+            for _, field_name, _, _ in string.Formatter().parse(text):
+                if field_name:
+                    fields.add(re.split(r'[.\[]', field_name, maxsplit=1)[0])
+        except ValueError as e:
+            self.error = e
+        self.fields = frozenset(fields)
+
+    def format(self, **params) -> str:
+        if self.error:
+            raise self.error
+        return self.text.format_map(params)
+
+@lru_cache(maxsize=2048)
+def get_message_template(text: str) -> MessageTemplate:
+    """Get prepared template for message text (shared by all guilds with the same text)"""
+    return MessageTemplate(text)
+
 def get_message_with_params(guild_id: int, key_path: str, default: str = None, **params) -> str:
     """
     Get message by key path and format it with parameters
@@ -356,21 +626,19 @@ def get_message_with_params(guild_id: int, key_path: str, default: str = None, *
         return message
 
     try:
-        # Validate that message contains the required placeholders
-        import re
-        placeholders = re.findall(r'\{(\w+)\}', message)
-        missing_params = set(placeholders) - set(params.keys())
+        template = get_message_template(message)
+        missing_params = template.fields - params.keys()
 
         # Auto-fill common placeholders to avoid leaking {context}
         auto_params = dict(params)
-        if 'context' in placeholders and 'context' not in auto_params:
+        if 'context' in missing_params:
             auto_params['context'] = 'неизвестно'
 
         if missing_params:
-            logger.warning("Missing parameters for message '%s': %s", key_path, missing_params)
+            logger.warning("Missing parameters for message '%s': %s", key_path, set(missing_params))
             # Continue anyway, let format() handle missing placeholders
 
-        return message.format(**auto_params)
+        return template.format(**auto_params)
 
     except KeyError as e:
         logger.error("Missing required parameter in message '%s': %s", key_path, e)
@@ -404,7 +672,7 @@ def save_guild_messages(guild_id: int, messages: Dict[str, Any], create_backup:
             yaml.dump(messages, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
 
         # Clear cache for this guild
-        _messages_cache.pop(guild_id, None)
+        clear_message_cache(guild_id)
 
         return True
     except Exception as e:
@@ -20,12 +20,14 @@
 • Извлечение имени/фамилии из различных форматов
 """
 
+import json
 import re
 from typing import Optional, Tuple, Dict, Any
 from utils.database_manager.rank_manager import rank_manager
 from utils.database_manager import personnel_manager
-from utils.config_manager import load_config
+from utils.config_manager import load_config, get_config_version
 from utils.message_manager import get_military_ranks, get_role_reason
+from utils.discord_mutation_queue import mutation_queue
 from utils.logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -39,6 +41,8 @@ class NicknameManager:
     def __init__(self):
         # Список известных рангов (fallback для случаев недоступности БД)
         self.known_ranks = self._load_known_ranks_fallback()
+        # Скомпилированные паттерны и флаги форматов; пересобираются при изменении секции конфига
+        self._settings_cache: Optional[Dict[str, Any]] = None
         
     def _load_known_ranks_fallback(self) -> set:
         """Load minimal fallback ranks for cases when database is unavailable"""
@@ -52,15 +56,47 @@ class NicknameManager:
         logger.warning("Using fallback rank list - database ranks should be used instead")
         return fallback_ranks
         
-    def _build_patterns(self) -> Dict[str, re.Pattern]:
-        """Собирает паттерны на основе актуального конфига."""
+    def _get_settings_snapshot(self) -> Dict[str, Any]:
+        """
+        Секция nickname_auto_replacement и производные от неё данные
+
+        Пока версия конфига не изменилась, файл не читается. Если файл изменился,
+        но сама секция осталась прежней, паттерны не перекомпилируются.
+        """
+        version = get_config_version()
+        cached = self._settings_cache
+        if cached is not None and cached['version'] == version:
+            return cached
+
         try:
-            config = load_config()
-            custom_templates = config.get('nickname_auto_replacement', {}).get('custom_templates', {})
+            nickname_settings = load_config().get('nickname_auto_replacement', {}) or {}
         except Exception as e:
-            logger.error(f"Ошибка загрузки настроек шаблонов никнеймов: {e}")
-            custom_templates = {}
+            logger.error(f"Ошибка загрузки настроек никнеймов: {e}")
+            nickname_settings = {}
+
+        fingerprint = json.dumps(nickname_settings, sort_keys=True, ensure_ascii=False, default=str)
+        if cached is not None and cached['fingerprint'] == fingerprint:
+            cached['version'] = version
+            return cached
 
+        format_support = nickname_settings.get('format_support', {})
+        self._settings_cache = {
+            'version': version,
+            'fingerprint': fingerprint,
+            'settings': nickname_settings,
+            'patterns': self._build_patterns(nickname_settings.get('custom_templates', {})),
+            'format_support': format_support,
+            'known_positions': frozenset(nickname_settings.get('known_positions', [])),
+            'auto_detect_positions': format_support.get('auto_detect_positions', True),
+        }
+        return self._settings_cache
+
+    def _get_nickname_settings(self) -> Dict[str, Any]:
+        """Секция nickname_auto_replacement из конфига (кэшируется)."""
+        return self._get_settings_snapshot()['settings']
+
+    def _build_patterns(self, custom_templates: Dict[str, Any]) -> Dict[str, re.Pattern]:
+        """Собирает и компилирует паттерны с учётом пользовательских шаблонов."""
         base_patterns = {
             # Стандартный формат с подгруппами: "РОиО[ПГ] | Ст. Л-т | Виктор Верпов"
             'standard_with_subgroup': r'^([А-ЯЁA-Zа-яё]{1,15})\[([А-ЯЁA-Zа-яё]{1,10})\]\s*\|\s*([А-ЯЁа-яёA-Za-z\-\.\s]+?)\s*\|\s*(.+)$',
@@ -92,20 +128,11 @@ class NicknameManager:
 
     def _get_format_support(self) -> Dict[str, bool]:
         """Возвращает флаги поддерживаемых форматов."""
-        try:
-            config = load_config()
-            nickname_settings = config.get('nickname_auto_replacement', {})
-            return nickname_settings.get('format_support', {})
-        except Exception:
-            return {}
+        return self._get_settings_snapshot()['format_support']
 
     def _get_default_hiring_department(self) -> str:
         """Подразделение по умолчанию для приёма (fallback: ВА)."""
-        try:
-            config = load_config()
-            return config.get('nickname_auto_replacement', {}).get('default_hiring_department', 'ВА')
-        except Exception:
-            return 'ВА'
+        return self._get_nickname_settings().get('default_hiring_department', 'ВА')
 
     def get_rank_abbreviation(self, rank_name: str) -> str:
         """Получает аббревиатуру звания из БД (или возвращает пустую строку)."""
@@ -168,19 +195,11 @@ class NicknameManager:
     
     def _is_position(self, text: str) -> bool:
         """Проверяет, является ли текст должностью"""
-        try:
-            config = load_config()
-            nickname_settings = config.get('nickname_auto_replacement', {})
-            custom_positions = nickname_settings.get('known_positions', [])
-            format_support = nickname_settings.get('format_support', {})
-            auto_detect_enabled = format_support.get('auto_detect_positions', True)
-
-            if text in custom_positions:
-                return True
+        snapshot = self._get_settings_snapshot()
+        if text in snapshot['known_positions']:
+            return True
 
-            if not auto_detect_enabled:
-                return False
-        except Exception:
+        if not snapshot['auto_detect_positions']:
             return False
         
         position_keywords = ['Нач.', 'Зам.', 'Ком.', 'по', 'Отдела', 'Бриг', 'КР', 'Штаба']
@@ -193,8 +212,7 @@ class NicknameManager:
     def _is_nickname_replacement_enabled_globally(self) -> bool:
         """Проверяет, включена ли автозамена никнеймов глобально"""
         try:
-            config = load_config()
-            nickname_settings = config.get('nickname_auto_replacement', {})
+            nickname_settings = self._get_nickname_settings()
             return nickname_settings.get('enabled', True)  # По умолчанию включена
         except Exception as e:
             logger.error(f"Ошибка при проверке глобальных настроек автозамены: {e}")
@@ -203,8 +221,7 @@ class NicknameManager:
     def _is_nickname_replacement_enabled_for_department(self, subdivision_key: str) -> bool:
         """Проверяет, включена ли автозамена никнеймов для конкретного подразделения"""
         try:
-            config = load_config()
-            nickname_settings = config.get('nickname_auto_replacement', {})
+            nickname_settings = self._get_nickname_settings()
             department_settings = nickname_settings.get('departments', {})
             return department_settings.get(subdivision_key, True)  # По умолчанию включена
         except Exception as e:
@@ -214,8 +231,7 @@ class NicknameManager:
     def _is_nickname_replacement_enabled_for_module(self, module_name: str) -> bool:
         """Проверяет, включена ли автозамена никнеймов для конкретного модуля"""
         try:
-            config = load_config()
-            nickname_settings = config.get('nickname_auto_replacement', {})
+            nickname_settings = self._get_nickname_settings()
             module_settings = nickname_settings.get('modules', {})
             return module_settings.get(module_name, True)  # По умолчанию включена
         except Exception as e:
@@ -285,8 +301,9 @@ class NicknameManager:
         Returns:
             Dict с полями: subdivision, rank, position, name, format_type, is_special, subgroup
         """
-        patterns = self._build_patterns()
-        format_support = self._get_format_support()
+        snapshot = self._get_settings_snapshot()
+        patterns = snapshot['patterns']
+        format_support = snapshot['format_support']
         subgroup_enabled = format_support.get('standard_with_subgroup', True) or format_support.get('positional_with_subgroup', True)
 
         def is_enabled(flag: str) -> bool:
@@ -630,11 +647,7 @@ class NicknameManager:
         
         Format: "{status_text} {separator} Имя Фамилия"
         """
-        try:
-            config = load_config()
-            custom_templates = config.get('nickname_auto_replacement', {}).get('custom_templates', {})
-        except Exception:
-            custom_templates = {}
+        custom_templates = self._get_nickname_settings().get('custom_templates', {})
         dismissed_settings = custom_templates.get('dismissed', {})
         
         # Используем кастомные настройки или дефолтные
@@ -700,7 +713,7 @@ class NicknameManager:
             
             new_nickname = self.build_service_nickname(default_department, rank_abbr, first_name, last_name)
             
-            await member.edit(nick=new_nickname, reason=get_role_reason(member.guild.id, "nickname_change.personnel_acceptance", "Приём в организацию: изменён никнейм").format(moderator="система"))
+            await mutation_queue.edit_member(member, nick=new_nickname, reason=get_role_reason(member.guild.id, "nickname_change.personnel_acceptance", "Приём в организацию: изменён никнейм").format(moderator="система"))
             logger.info(f"✅ Никнейм при приёме: {member} -> {new_nickname}")
             
             return new_nickname
@@ -801,7 +814,7 @@ class NicknameManager:
                 new_nickname = self.build_service_nickname(subdivision_abbr, rank_abbr, first_name, last_name)
                 reason = get_role_reason(member.guild.id, "nickname_change.department_transfer", "Перевод в подразделение: изменён никнейм").format(moderator="система")
             
-            await member.edit(nick=new_nickname, reason=reason)
+            await mutation_queue.edit_member(member, nick=new_nickname, reason=reason)
             logger.info(f"✅ Никнейм при переводе: {member} -> {new_nickname}")
             
             return new_nickname
@@ -894,7 +907,7 @@ class NicknameManager:
             new_nickname = self.build_service_nickname(subdivision_abbr, new_rank_abbr, first_name, last_name)
             logger.info(f"RANK_CHANGE DEBUG: Построенный никнейм: '{new_nickname}'")
             
-            await member.edit(nick=new_nickname, reason=get_role_reason(member.guild.id, f"rank_change.{'promotion' if change_type == 'повышение' else 'demotion' if change_type == 'понижение' else 'restoration' if change_type == 'восстановление' else 'automatic'}", "Смена ранга: {old_rank} → {new_rank}").format(old_rank="предыдущий", new_rank=new_rank_name, moderator="система"))
+            await mutation_queue.edit_member(member, nick=new_nickname, reason=get_role_reason(member.guild.id, f"rank_change.{'promotion' if change_type == 'повышение' else 'demotion' if change_type == 'понижение' else 'restoration' if change_type == 'восстановление' else 'automatic'}", "Смена ранга: {old_rank} → {new_rank}").format(old_rank="предыдущий", new_rank=new_rank_name, moderator="система"))
             logger.info(f"✅ Никнейм при изменении звания ({change_type}): {member} -> {new_nickname}")
             
             return new_nickname
@@ -1000,7 +1013,7 @@ class NicknameManager:
             new_nickname = self.build_service_nickname(subdivision_abbr, rank_abbr, new_first_name, new_last_name)
             logger.info(f"NAME_CHANGE DEBUG: Построенный никнейм: '{new_nickname}'")
             
-            await member.edit(nick=new_nickname, reason=get_role_reason(member.guild.id, "nickname_change.name_change", "Изменение ФИО: {old_name} → {new_name}").format(old_name=member.display_name, new_name=new_nickname, moderator="система"))
+            await mutation_queue.edit_member(member, nick=new_nickname, reason=get_role_reason(member.guild.id, "nickname_change.name_change", "Изменение ФИО: {old_name} → {new_name}").format(old_name=member.display_name, new_name=new_nickname, moderator="система"))
             logger.info(f"✅ Никнейм при изменении ФИО: {member} -> {new_nickname}")
             
             return new_nickname
@@ -1075,7 +1088,7 @@ class NicknameManager:
                 logger.error(f"Ожидаемый никнейм был: '{new_nickname}'")
                 return None
             
-            await member.edit(nick=new_nickname, reason=get_role_reason(member.guild.id, "nickname_change.dismissal", "Увольнение: изменён никнейм").format(moderator="система"))
+            await mutation_queue.edit_member(member, nick=new_nickname, reason=get_role_reason(member.guild.id, "nickname_change.dismissal", "Увольнение: изменён никнейм").format(moderator="система"))
             logger.info(f"✅ Никнейм при увольнении: {member} -> {new_nickname}")
             
             return new_nickname
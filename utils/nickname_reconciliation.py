@@ -0,0 +1,314 @@
+"""
+Nickname Reconciliation
+
+Массовая сверка никнеймов с данными кадрового учёта.
+
+Для каждого действующего сотрудника из PostgreSQL строится ожидаемый никнейм
+(NicknameManager.build_service_nickname) и сравнивается с никнеймом участника
+из кэша гильдии. Результат - отчёт о расхождениях (dry-run); в режиме применения
+изменения отправляются через очередь изменений Discord с массовым приоритетом,
+поэтому интерактивные действия модераторов не ждут окончания сверки.
+"""
+
+import asyncio
+import io
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import discord
+from psycopg2.extras import RealDictCursor
+
+from utils.database_manager import rank_manager
+from utils.discord_mutation_queue import mutation_queue, MutationPriority
+from utils.message_manager import get_role_reason
+from utils.nickname_manager import nickname_manager
+from utils.postgresql_pool import get_db_connection
+from utils.logging_setup import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Действующие сотрудники; читаются серверным курсором порциями
+_PERSONNEL_QUERY = """
+    SELECT
+        p.discord_id,
+        p.first_name,
+        p.last_name,
+        sub.abbreviation AS subdivision_abbreviation,
+        r.name AS rank_name
+    FROM personnel p
+    JOIN employees e ON e.personnel_id = p.id
+    LEFT JOIN subdivisions sub ON e.subdivision_id = sub.id
+    LEFT JOIN ranks r ON e.rank_id = r.id
+    WHERE p.is_dismissal = false AND p.discord_id IS NOT NULL
+    ORDER BY p.id;
+"""
+
+# Форматы, которые кадровые операции сохраняют как есть
+_PRESERVED_FORMATS = {'positional', 'positional_with_subgroup', 'standard_with_subgroup'}
+
+SKIP_REASONS = {
+    'not_in_guild': "Нет на сервере",
+    'special_format': "Особый/должностной формат",
+    'unknown_format': "Нераспознанный формат",
+    'disabled': "Автозамена отключена",
+    'no_rank_abbreviation': "Нет аббревиатуры звания",
+    'no_name': "Нет ФИО в БД",
+    'hierarchy': "Выше роли бота",
+}
+
+ProgressCallback = Callable[[str, int, int], Awaitable[None]]
+
+
+class NicknameReconciler:
+    """Сверка никнеймов сотрудников с шаблоном"""
+
+    FETCH_BATCH_SIZE = 500
+    APPLY_CHUNK_SIZE = 50
+
+    def __init__(self):
+        # Гильдии, в которых сверка уже выполняется
+        self._running_guilds = set()
+
+    def is_running(self, guild_id: int) -> bool:
+        return guild_id in self._running_guilds
+
+    async def _iter_personnel_batches(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Порции действующих сотрудников; запросы к БД выполняются вне event loop"""
+        with get_db_connection() as conn:
+            cursor = conn.cursor(name='nickname_reconciliation', cursor_factory=RealDictCursor)
+            try:
+                await asyncio.to_thread(cursor.execute, _PERSONNEL_QUERY)
+                while True:
+                    rows = await asyncio.to_thread(cursor.fetchmany, self.FETCH_BATCH_SIZE)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+                # Транзакция только читала данные
+                conn.rollback()
+
+    def _check_member(self, guild: discord.Guild, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Вычислить ожидаемый никнейм сотрудника
+
+        Returns:
+            Dict: discord_id, member, current, expected, status ('changed'/'in_sync'/'skipped'), reason
+        """
+        discord_id = row['discord_id']
+        entry = {'discord_id': discord_id, 'member': None, 'current': None, 'expected': None,
+                 'status': 'skipped', 'reason': None}
+
+        member = guild.get_member(discord_id)
+        if not member:
+            entry['reason'] = 'not_in_guild'
+            return entry
+        entry['member'] = member
+        entry['current'] = member.nick
+
+        first_name, last_name = row.get('first_name'), row.get('last_name')
+        if not first_name or not last_name:
+            entry['reason'] = 'no_name'
+            return entry
+
+        parsed = nickname_manager.parse_nickname(member.display_name)
+        if parsed['format_type'] == 'unknown':
+            # Парсер помечает нераспознанные никнеймы как особые - их не трогают и кадровые операции
+            entry['reason'] = 'unknown_format'
+            return entry
+        if parsed['is_special'] or parsed['format_type'] in _PRESERVED_FORMATS:
+            entry['reason'] = 'special_format'
+            return entry
+
+        subdivision_abbr = row.get('subdivision_abbreviation') or nickname_manager._get_default_hiring_department()
+        if not nickname_manager._is_nickname_replacement_enabled_for_department(subdivision_abbr):
+            entry['reason'] = 'disabled'
+            return entry
+
+        rank_data = rank_manager.get_rank_by_name(row['rank_name']) if row.get('rank_name') else None
+        if not rank_data or not rank_data.get('abbreviation'):
+            entry['reason'] = 'no_rank_abbreviation'
+            return entry
+
+        expected = nickname_manager.build_service_nickname(
+            subdivision_abbr, rank_data['abbreviation'], first_name, last_name
+        )
+        entry['expected'] = expected
+
+        if member.nick == expected:
+            entry['status'] = 'in_sync'
+            return entry
+
+        # Бот не может менять никнейм владельцу и участникам с ролью не ниже своей
+        if member.id == guild.owner_id or (guild.me and member.top_role >= guild.me.top_role):
+            entry['reason'] = 'hierarchy'
+            return entry
+
+        entry['status'] = 'changed'
+        return entry
+
+    async def run(self, guild: discord.Guild, apply: bool = False,
+                  progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Выполнить сверку
+
+        Args:
+            guild: Гильдия
+            apply: Применить изменения (иначе только отчёт)
+            progress_callback: async-функция (этап 'scan'/'apply', выполнено, всего)
+
+        Returns:
+            Dict: отчёт (total, in_sync, changes, skipped, applied, failed, duration)
+        """
+        if guild.id in self._running_guilds:
+            raise RuntimeError("Сверка никнеймов уже выполняется")
+
+        self._running_guilds.add(guild.id)
+        started = time.monotonic()
+        report = {
+            'apply': apply,
+            'total': 0,
+            'in_sync': 0,
+            'changes': [],
+            'skipped': {},
+            'applied': 0,
+            'failed': [],
+        }
+
+        try:
+            if not nickname_manager._is_nickname_replacement_enabled_globally():
+                report['disabled'] = True
+                return report
+
+            async for rows in self._iter_personnel_batches():
+                for row in rows:
+                    entry = self._check_member(guild, row)
+                    report['total'] += 1
+                    if entry['status'] == 'in_sync':
+                        report['in_sync'] += 1
+                    elif entry['status'] == 'changed':
+                        report['changes'].append(entry)
+                    else:
+                        report['skipped'][entry['reason']] = report['skipped'].get(entry['reason'], 0) + 1
+
+                if progress_callback:
+                    await progress_callback('scan', report['total'], report['total'])
+                # Отдаём управление event loop между порциями
+                await asyncio.sleep(0)
+
+            if apply and report['changes']:
+                await self._apply_changes(guild, report, progress_callback)
+
+            return report
+
+        finally:
+            report['duration'] = round(time.monotonic() - started, 2)
+            self._running_guilds.discard(guild.id)
+            logger.info(
+                "Сверка никнеймов (%s): всего %s, расхождений %s, применено %s, ошибок %s, %.2fс",
+                'применение' if apply else 'dry-run', report['total'], len(report['changes']),
+                report['applied'], len(report['failed']), report['duration']
+            )
+
+    async def _apply_changes(self, guild: discord.Guild, report: Dict[str, Any],
+                             progress_callback: Optional[ProgressCallback]):
+        """Отправить изменения никнеймов через очередь с массовым приоритетом"""
+        reason = get_role_reason(
+            guild.id, "nickname_change.reconciliation", "Сверка никнеймов: никнейм приведён к шаблону ({moderator})"
+        ).format(moderator="система")
+        changes = report['changes']
+        total = len(changes)
+
+        for start in range(0, total, self.APPLY_CHUNK_SIZE):
+            chunk = changes[start:start + self.APPLY_CHUNK_SIZE]
+            results = await mutation_queue.run_batch(
+                ('member_edit', guild.id),
+                [self._make_edit(entry['member'], entry['expected'], reason) for entry in chunk],
+                priority=MutationPriority.BULK
+            )
+            for entry, result in zip(chunk, results):
+                if isinstance(result, Exception):
+                    logger.warning("Не удалось изменить никнейм %s: %s", entry['discord_id'], result)
+                    report['failed'].append(entry)
+                else:
+                    report['applied'] += 1
+
+            if progress_callback:
+                await progress_callback('apply', start + len(chunk), total)
+
+    @staticmethod
+    def _make_edit(member: discord.Member, nickname: str, reason: str):
+        return lambda: member.edit(nick=nickname, reason=reason)
+
+    @staticmethod
+    def build_report_file(report: Dict[str, Any]) -> discord.File:
+        """Текстовый отчёт о расхождениях"""
+        lines = []
+        failed_ids = {entry['discord_id'] for entry in report['failed']}
+        for entry in report['changes']:
+            member = entry['member']
+            marker = " [ошибка]" if entry['discord_id'] in failed_ids else ""
+            lines.append(f"{member} ({entry['discord_id']}): '{entry['current'] or ''}' -> '{entry['expected']}'{marker}")
+
+        if report['skipped']:
+            lines.append("")
+            lines.append("Пропущено:")
+            for reason, count in sorted(report['skipped'].items()):
+                lines.append(f"  {SKIP_REASONS.get(reason, reason)}: {count}")
+
+        content = "\n".join(lines) or "Расхождений нет"
+        return discord.File(io.BytesIO(content.encode('utf-8')), filename="nickname_reconciliation.txt")
+
+    @staticmethod
+    def build_report_embed(report: Dict[str, Any], preview_limit: int = 10) -> discord.Embed:
+        """Сводка сверки"""
+        if report.get('disabled'):
+            return discord.Embed(
+                title="🏷️ Сверка никнеймов",
+                description="❌ Автозамена никнеймов отключена глобально.",
+                color=discord.Color.red()
+            )
+
+        changes = report['changes']
+        if report['apply']:
+            title = "✅ Сверка никнеймов: изменения применены"
+            color = discord.Color.green() if not report['failed'] else discord.Color.orange()
+        else:
+            title = "🔍 Сверка никнеймов: предпросмотр"
+            color = discord.Color.blue()
+
+        embed = discord.Embed(title=title, color=color, timestamp=discord.utils.utcnow())
+        summary = (
+            f"**Сотрудников:** {report['total']}\n"
+            f"**Совпадают:** {report['in_sync']}\n"
+            f"**Расхождений:** {len(changes)}\n"
+            f"**Пропущено:** {sum(report['skipped'].values())}"
+        )
+        if report['apply']:
+            summary += f"\n**Применено:** {report['applied']}\n**Ошибок:** {len(report['failed'])}"
+        embed.add_field(name="📊 Итоги", value=summary, inline=False)
+
+        if changes:
+            preview = "\n".join(
+                f"{entry['member'].mention}: `{entry['current'] or '—'}` → `{entry['expected']}`"
+                for entry in changes[:preview_limit]
+            )
+            if len(changes) > preview_limit:
+                preview += f"\n... и ещё {len(changes) - preview_limit} (см. файл отчёта)"
+            embed.add_field(name="✏️ Расхождения", value=preview[:1024], inline=False)
+
+        if report['skipped']:
+            embed.add_field(
+                name="⏭️ Пропущено",
+                value="\n".join(f"{SKIP_REASONS.get(reason, reason)}: {count}"
+                                for reason, count in sorted(report['skipped'].items())),
+                inline=False
+            )
+
+        embed.set_footer(text=f"Время выполнения: {report.get('duration', 0)}с")
+        return embed
+
+
+# Глобальный экземпляр
+nickname_reconciler = NicknameReconciler()
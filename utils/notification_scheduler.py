@@ -2,12 +2,10 @@
 Notification scheduler for promotion reports
 Sends daily notifications at 21:00 MSK
 """
-import asyncio
 import discord
 import os
-from datetime import datetime, time
-import pytz
 from utils.config_manager import load_config
+from utils.job_scheduler import job_scheduler, CronTrigger
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -17,61 +15,39 @@ logger = get_logger(__name__)
 class PromotionNotificationScheduler:
     """Handles scheduling and sending of daily promotion notifications"""
     
+    JOB_NAME = 'promotion_notifications'
+    # Missed notifications are sent after downtime only if no more than 2 hours late
+    MISFIRE_GRACE_SECONDS = 2 * 3600
+    
     def __init__(self, bot):
         self.bot = bot
-        self.task = None
-        self.moscow_tz = pytz.timezone('Europe/Moscow')
         
     def start(self):
-        """Start the notification scheduler"""
-        if self.task is None or self.task.done():
-            self.task = asyncio.create_task(self._scheduler_loop())
-            logger.info("Планировщик уведомлений запущен")
+        """Register the daily notification job in the shared scheduler"""
+        job_scheduler.add_job(
+            self.JOB_NAME,
+            self._send_daily_notifications,
+            CronTrigger(hour=self._get_target_hour, minute=self._get_target_minute, timezone='Europe/Moscow'),
+            misfire_grace=self.MISFIRE_GRACE_SECONDS
+        )
+        job_scheduler.start()
+        logger.info("Планировщик уведомлений запущен")
     
     def stop(self):
-        """Stop the notification scheduler"""
-        if self.task and not self.task.done():
-            self.task.cancel()
-            logger.info("Планировщик уведомлений остановлен")
+        """Unregister the notification job"""
+        job_scheduler.remove_job(self.JOB_NAME)
+        logger.info("Планировщик уведомлений остановлен")
     
-    async def _scheduler_loop(self):
-        """Main scheduler loop"""
-        while True:
-            try:
-                # Get configured notification time
-                config = load_config()
-                schedule_config = config.get('notification_schedule', {'hour': 21, 'minute': 0})
-                target_hour = schedule_config.get('hour', 21)
-                target_minute = schedule_config.get('minute', 0)
-                
-                # Calculate seconds until next configured time MSK
-                now_moscow = datetime.now(self.moscow_tz)
-                target_time = now_moscow.replace(hour=target_hour, minute=target_minute, second=0, microsecond=0)
-                
-                # If it's already past target time today, schedule for tomorrow
-                if now_moscow >= target_time:
-                    target_time = target_time.replace(day=target_time.day + 1)
-                
-                sleep_seconds = (target_time - now_moscow).total_seconds()
-                
-                logger.info(f"⏰ Следующая отправка уведомлений: {target_time.strftime('%d.%m.%Y %H:%M')} МСК")
-                logger.info(f"⏳ Ожидание: {int(sleep_seconds // 3600)}ч {int((sleep_seconds % 3600) // 60)}м")
-                
-                # Sleep until target time
-                await asyncio.sleep(sleep_seconds)
-                
-                # Send notifications
-                await self._send_daily_notifications()
-                
-                # Wait a bit to avoid running multiple times in the same minute
-                await asyncio.sleep(60)
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.warning("Ошибка в планировщике уведомлений: %s", e)
-                # Wait 5 minutes before retrying
-                await asyncio.sleep(300)
+    @staticmethod
+    def _get_schedule_config() -> dict:
+        config = load_config()
+        return config.get('notification_schedule', {'hour': 21, 'minute': 0})
+    
+    def _get_target_hour(self) -> int:
+        return self._get_schedule_config().get('hour', 21)
+    
+    def _get_target_minute(self) -> int:
+        return self._get_schedule_config().get('minute', 0)
     
     async def _send_daily_notifications(self):
         """Send all enabled daily notifications"""
@@ -3,6 +3,11 @@
 
 Этот модуль обеспечивает эффективное управление соединениями с PostgreSQL
 для повышения производительности при частых запросах.
+
+Пул общий для всего бота: через него работают и менеджеры с сырым SQL
+(get_db_cursor / get_db_connection), и ORM-модели utils.database (SQLAlchemy
+берёт соединения через acquire/release). Размер пула задаётся переменными
+окружения POSTGRES_POOL_MIN / POSTGRES_POOL_MAX.
 """
 
 import os
@@ -63,8 +68,11 @@ class PostgreSQLConnectionPool:
             'pool_hits': 0,
             'pool_misses': 0,
             'slow_queries': 0,  # Запросы > 100ms
-            'errors': 0
+            'errors': 0,
+            'orm_checkouts': 0,
+            'health_checks_failed': 0
         }
+        self._last_health_check: Optional[Dict[str, Any]] = None
         
         self._initialize_pool()
     
@@ -84,6 +92,37 @@ class PostgreSQLConnectionPool:
             logger.error(f"Ошибка создания пула соединений: {e}")
             raise
     
+    def acquire(self, orm: bool = False):
+        """
+        Взять соединение из пула (парный вызов - release)
+        
+        Args:
+            orm: соединение для SQLAlchemy (учитывается в статистике отдельно)
+        """
+        connection = None
+        with self._lock:
+            if self._pool:
+                connection = self._pool.getconn()
+                self._stats['active_connections'] += 1
+                
+                if connection:
+                    self._stats['pool_hits'] += 1
+                    if orm:
+                        self._stats['orm_checkouts'] += 1
+                else:
+                    self._stats['pool_misses'] += 1
+                    
+        if not connection:
+            raise Exception("Не удалось получить соединение из пула")
+        return connection
+    
+    def release(self, connection, close: bool = False):
+        """Вернуть соединение в пул (close=True - закрыть его вместо возврата)"""
+        with self._lock:
+            if self._pool:
+                self._pool.putconn(connection, close=close)
+                self._stats['active_connections'] -= 1
+    
     @contextmanager
     def get_connection(self):
         """Контекстный менеджер для получения соединения из пула"""
@@ -91,19 +130,7 @@ class PostgreSQLConnectionPool:
         start_time = time.time()
         
         try:
-            with self._lock:
-                if self._pool:
-                    connection = self._pool.getconn()
-                    self._stats['active_connections'] += 1
-                    
-                    if connection:
-                        self._stats['pool_hits'] += 1
-                    else:
-                        self._stats['pool_misses'] += 1
-                        
-            if not connection:
-                raise Exception("Не удалось получить соединение из пула")
-            
+            connection = self.acquire()
             yield connection
             
         except Exception as e:
@@ -114,10 +141,7 @@ class PostgreSQLConnectionPool:
         finally:
             if connection:
                 try:
-                    with self._lock:
-                        if self._pool:
-                            self._pool.putconn(connection)
-                            self._stats['active_connections'] -= 1
+                    self.release(connection)
                             
                     # Статистика времени выполнения
                     query_time = time.time() - start_time
@@ -145,6 +169,22 @@ class PostgreSQLConnectionPool:
             finally:
                 cursor.close()
     
+    def health_check(self) -> Dict[str, Any]:
+        """Проверить доступность БД запросом SELECT 1 через пул"""
+        start_time = time.time()
+        try:
+            with self.get_cursor() as cursor:
+                cursor.execute("SELECT 1 AS ok")
+                cursor.fetchone()
+            result = {'ok': True, 'latency_ms': round((time.time() - start_time) * 1000, 2), 'error': None}
+        except Exception as e:
+            self._stats['health_checks_failed'] += 1
+            result = {'ok': False, 'latency_ms': None, 'error': str(e)}
+        
+        result['checked_at'] = time.time()
+        self._last_health_check = result
+        return result
+    
     def get_pool_stats(self) -> Dict[str, Any]:
         """Получить статистику пула соединений"""
         avg_query_time = (
@@ -168,6 +208,7 @@ class PostgreSQLConnectionPool:
                 'slow_query_rate': round((self._stats['slow_queries'] / max(self._stats['total_queries_executed'], 1)) * 100, 2)
             },
             'pool_efficiency': {
+                'orm_checkouts': self._stats['orm_checkouts'],
                 'pool_hits': self._stats['pool_hits'],
                 'pool_misses': self._stats['pool_misses'],
                 'hit_rate': round((self._stats['pool_hits'] / max(self._stats['pool_hits'] + self._stats['pool_misses'], 1)) * 100, 2)
@@ -175,6 +216,10 @@ class PostgreSQLConnectionPool:
             'errors': {
                 'total_errors': self._stats['errors'],
                 'error_rate': round((self._stats['errors'] / max(self._stats['total_queries_executed'], 1)) * 100, 2)
+            },
+            'health': {
+                'last_check': self._last_health_check,
+                'failed_checks': self._stats['health_checks_failed']
             }
         }
     
@@ -193,7 +238,7 @@ class PostgreSQLConnectionPool:
             f"   • Среднее время запроса: {stats['performance']['average_query_time']}ms\n"
             f"   • Медленных запросов: {stats['performance']['slow_queries']} ({stats['performance']['slow_query_rate']}%)\n\n"
             " Эффективность пула:\n"
-            f"   • Попадания в пул: {stats['pool_efficiency']['pool_hits']}\n"
+            f"   • Попадания в пул: {stats['pool_efficiency']['pool_hits']} (из них ORM: {stats['pool_efficiency']['orm_checkouts']})\n"
             f"   • Промахи пула: {stats['pool_efficiency']['pool_misses']}\n"
             f"   • Hit Rate: {stats['pool_efficiency']['hit_rate']}%\n\n"
             "Ошибки:\n"
@@ -215,15 +260,18 @@ class PostgreSQLConnectionPool:
 
 # Глобальный экземпляр пула соединений
 _connection_pool = None
+_connection_pool_lock = threading.Lock()
 
 def get_connection_pool() -> PostgreSQLConnectionPool:
     """Получить глобальный экземпляр пула соединений"""
     global _connection_pool
     if _connection_pool is None:
-        _connection_pool = PostgreSQLConnectionPool(
-            min_connections=3,  # Оптимальное количество для Discord bot
-            max_connections=8   # Достаточно для пиковых нагрузок
-        )
+        with _connection_pool_lock:
+            if _connection_pool is None:
+                _connection_pool = PostgreSQLConnectionPool(
+                    min_connections=int(os.getenv('POSTGRES_POOL_MIN', '3')),  # Оптимальное количество для Discord bot
+                    max_connections=int(os.getenv('POSTGRES_POOL_MAX', '8'))   # Достаточно для пиковых нагрузок
+                )
     return _connection_pool
 
 def get_pool_statistics() -> Dict[str, Any]:
@@ -231,6 +279,24 @@ def get_pool_statistics() -> Dict[str, Any]:
     pool = get_connection_pool()
     return pool.get_pool_stats()
 
+def check_database_health() -> Dict[str, Any]:
+    """Проверить доступность БД через общий пул"""
+    pool = get_connection_pool()
+    return pool.health_check()
+
+def schedule_health_checks(interval: int = 300, job_name: str = 'postgres_health_check'):
+    """Зарегистрировать периодическую проверку БД в общем планировщике"""
+    import asyncio
+    from utils.job_scheduler import job_scheduler, IntervalTrigger
+    
+    async def health_check_job():
+        result = await asyncio.to_thread(check_database_health)
+        if not result['ok']:
+            logger.warning("PostgreSQL health check failed: %s", result['error'])
+    
+    job_scheduler.add_job(job_name, health_check_job, IntervalTrigger(interval), jitter=15, catch_up=False)
+    job_scheduler.start()
+
 def print_connection_pool_status():
     """Вывести статистику пула соединений"""
     pool = get_connection_pool()
@@ -0,0 +1,151 @@
+"""
+Prepared Statements Registry
+
+Реестр именованных SQL-запросов, которые подготавливаются (PREPARE) один раз
+на каждое соединение пула и дальше выполняются через EXECUTE без повторного
+разбора и планирования.
+
+Запросы регистрируются модулями, которым они принадлежат, с обычными
+плейсхолдерами %s; вызывающий код обращается к ним по имени:
+
+    PERSONNEL_ID_BY_DISCORD = statement_registry.register(
+        'personnel_id_by_discord', "SELECT id FROM personnel WHERE discord_id = %s"
+    )
+
+    with get_db_cursor() as cursor:
+        execute_prepared(cursor, PERSONNEL_ID_BY_DISCORD, (discord_id,))
+        row = cursor.fetchone()
+
+Для каждого запроса собирается статистика: число вызовов, суммарное и максимальное время.
+"""
+
+import itertools
+import re
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Sequence
+
+from psycopg2 import errors as pg_errors
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+_PLACEHOLDER_RE = re.compile(r'%s')
+_NAME_RE = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+class StatementRegistry:
+    """Именованные запросы и их подготовка на соединениях пула"""
+
+    def __init__(self):
+        # {имя: текст PREPARE}
+        self._statements: Dict[str, str] = {}
+        # {имя: исходный текст с %s}
+        self._sources: Dict[str, str] = {}
+        # Соединение -> имена уже подготовленных на нём запросов
+        self._prepared: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def register(self, name: str, sql: str) -> str:
+        """
+        Зарегистрировать запрос
+
+        Args:
+            name: Имя запроса (идентификатор SQL)
+            sql: Текст запроса с плейсхолдерами %s
+
+        Returns:
+            str: имя запроса (для констант модуля)
+        """
+        if not _NAME_RE.match(name):
+            raise ValueError(f"Недопустимое имя запроса: {name}")
+
+        source = sql.strip().rstrip(';')
+        counter = itertools.count(1)
+        body = _PLACEHOLDER_RE.sub(lambda _: f"${next(counter)}", source)
+        prepare_sql = f"PREPARE {name} AS {body}"
+
+        existing = self._statements.get(name)
+        if existing is not None and existing != prepare_sql:
+            raise ValueError(f"Запрос {name} уже зарегистрирован с другим текстом")
+
+        self._statements[name] = prepare_sql
+        self._sources[name] = source
+        self._stats.setdefault(name, {'calls': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0, 'prepares': 0})
+        return name
+
+    def get_sql(self, name: str) -> str:
+        """Исходный текст запроса с плейсхолдерами %s (для EXPLAIN и отладки)"""
+        return self._sources[name]
+
+    def _ensure_prepared(self, cursor, name: str):
+        conn = cursor.connection
+        with self._lock:
+            prepared = self._prepared.get(conn)
+            if prepared is None:
+                prepared = self._prepared[conn] = set()
+            if name in prepared:
+                return
+
+        cursor.execute(self._statements[name])
+        with self._lock:
+            prepared.add(name)
+        self._stats[name]['prepares'] += 1
+
+    def execute(self, cursor, name: str, params: Optional[Sequence[Any]] = None):
+        """Выполнить зарегистрированный запрос на курсоре (подготовив его при первом использовании)"""
+        if name not in self._statements:
+            raise KeyError(f"Запрос {name} не зарегистрирован")
+
+        stats = self._stats[name]
+        started = time.perf_counter()
+        try:
+            self._ensure_prepared(cursor, name)
+            if params:
+                placeholders = ", ".join(["%s"] * len(params))
+                cursor.execute(f"EXECUTE {name} ({placeholders})", tuple(params))
+            else:
+                cursor.execute(f"EXECUTE {name}")
+        except pg_errors.InvalidSqlStatementName:
+            # Сессия сброшена на стороне сервера - подготовим заново при следующем вызове
+            self.forget_connection(cursor.connection)
+            stats['errors'] += 1
+            raise
+        except Exception:
+            stats['errors'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            stats['calls'] += 1
+            stats['total_time'] += elapsed
+            stats['max_time'] = max(stats['max_time'], elapsed)
+
+    def forget_connection(self, conn):
+        """Забыть подготовленные запросы соединения"""
+        with self._lock:
+            self._prepared.pop(conn, None)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Статистика по запросам (время в миллисекундах)"""
+        result = {}
+        for name, stats in self._stats.items():
+            calls = stats['calls']
+            result[name] = {
+                'calls': calls,
+                'errors': stats['errors'],
+                'prepares': stats['prepares'],
+                'avg_ms': round(stats['total_time'] / calls * 1000, 2) if calls else 0.0,
+                'max_ms': round(stats['max_time'] * 1000, 2),
+            }
+        return result
+
+
+# Глобальный реестр
+statement_registry = StatementRegistry()
+
+
+def execute_prepared(cursor, name: str, params: Optional[Sequence[Any]] = None):
+    """Выполнить именованный запрос из глобального реестра"""
+    statement_registry.execute(cursor, name, params)
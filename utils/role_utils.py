@@ -11,6 +11,7 @@ from utils.message_manager import get_role_reason
 from utils.ping_manager import ping_manager
 from utils.database_manager import rank_manager, position_service
 from utils.config_manager import load_config
+from utils.discord_mutation_queue import mutation_queue
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -42,7 +43,8 @@ class RoleUtils:
             role = user.guild.get_role(role_id)
             if role and role in user.roles:
                 try:
-                    await user.remove_roles(
+                    await mutation_queue.remove_roles(
+                        user,
                         role,
                         reason=get_role_reason(user.guild.id, reason, "Очистка ролей подразделений").format(moderator="система")
                     )
@@ -93,7 +95,8 @@ class RoleUtils:
             role = user.guild.get_role(role_id)
             if role and role in user.roles:
                 try:
-                    await user.remove_roles(
+                    await mutation_queue.remove_roles(
+                        user,
                         role,
                         reason=get_role_reason(user.guild.id, reason, "Очистка ролей должностей").format(moderator="система")
                     )
@@ -528,7 +531,8 @@ class RoleUtils:
             role = user.guild.get_role(role_id)
             if role and role in user.roles:
                 try:
-                    await user.remove_roles(
+                    await mutation_queue.remove_roles(
+                        user,
                         role,
                         reason=get_role_reason(user.guild.id, reason, "Очистка ролей рангов").format(moderator="система")
                     )
@@ -582,7 +586,7 @@ class RoleUtils:
                         else:
                             audit_reason = audit_reason.format(moderator="система")
 
-                        await user.remove_roles(role, reason=audit_reason)
+                        await mutation_queue.remove_roles(user, role, reason=audit_reason)
                         removed_roles.append(role.name)
                     except discord.Forbidden:
                         logger.info(f"Нет прав для удаления роли {role.name} у %s", user)
@@ -602,18 +606,7 @@ class RoleUtils:
         Returns:
             Set[int]: Множество ID ролей рангов
         """
-        try:
-            from utils.postgresql_pool import get_db_cursor
-            role_ids = set()
-            with get_db_cursor() as cursor:
-                cursor.execute("SELECT role_id FROM ranks WHERE role_id IS NOT NULL")
-                results = cursor.fetchall()
-                for row in results:
-                    role_ids.add(row['role_id'])
-            return role_ids
-        except Exception as e:
-            logger.error("Ошибка получения ролей рангов: %s", e)
-            return set()
+        return rank_manager.get_all_rank_role_ids()
 
     @staticmethod
     async def assign_rank_role(user: discord.Member, rank_name: str, moderator: discord.Member, reason: str = None) -> bool:
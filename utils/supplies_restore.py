@@ -7,6 +7,7 @@ from typing import Optional, Dict, Any
 from utils.config_manager import load_config
 from forms.supplies.supplies_control_view import send_supplies_control_message
 from forms.supplies.supplies_subscription_view import send_supplies_subscription_message
+from utils.message_edit_cache import message_edit_cache
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -168,59 +169,9 @@ class SuppliesRestoreManager:
                     else:
                         embeds.append(timer_embed)
                     
-                    await message.edit(embeds=embeds, view=new_view)
+                    await message_edit_cache.edit_if_changed(message, embeds=embeds, view=new_view)
                     break
             
-            # Ищем сообщение управления
-            async for message in channel.history(limit=10):
-                if (message.author == self.bot.user and 
-                    message.embeds and 
-                    message.embeds[0].title and
-                    "Управление поставками" in message.embeds[0].title):
-                    
-                    # Обновляем view с правильными состояниями кнопок
-                    from forms.supplies.supplies_control_view import SuppliesControlView
-                    new_view = SuppliesControlView()
-                    new_view._update_button_states()
-                    
-                    # Создаем обновленный embed с таймерами
-                    from forms.supplies.supplies_manager import SuppliesManager
-                    from datetime import datetime
-                    
-                    supplies_manager = SuppliesManager()
-                    active_timers = supplies_manager.get_active_timers()
-                    
-                    timer_embed = discord.Embed(
-                        title="📊 Активные поставки",
-                        color=discord.Color.blue(),
-                        timestamp=datetime.now()
-                    )
-                    
-                    if not active_timers:
-                        timer_embed.description = "🟢 Все объекты готовы к поставке"
-                    else:
-                        for object_key, timer_info in active_timers.items():
-                            object_name = timer_info.get('object_name', object_key)
-                            emoji = timer_info.get('emoji', '📦')
-                            started_by = timer_info.get('started_by_name', 'Неизвестно')
-                            remaining = supplies_manager.get_remaining_time(object_key)
-                            
-                            timer_embed.add_field(
-                                name=f"{emoji} {object_name}",
-                                value=f"⏰ Осталось: **{remaining}**\n👤 Запустил: {started_by}",
-                                inline=True
-                            )
-                    
-                    # Обновляем сообщение с новым view и embeds
-                    embeds = list(message.embeds)
-                    if len(embeds) >= 2:
-                        embeds[1] = timer_embed
-                    else:
-                        embeds.append(timer_embed)
-                    
-                    await message.edit(embeds=embeds, view=new_view)
-                    break
-                    
         except Exception as e:
             logger.warning("Ошибка обновления таймеров в сообщении управления: %s", e)
 
@@ -1,9 +1,10 @@
-import asyncio
+import heapq
 import discord
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 from utils.config_manager import load_config
 from forms.supplies.supplies_manager import SuppliesManager
+from utils.job_scheduler import job_scheduler, DynamicTrigger
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -11,22 +12,28 @@ logger = get_logger(__name__)
 
 
 class SuppliesScheduler:
-    """Планировщик уведомлений о поставках"""
+    """
+    Планировщик уведомлений о поставках
+    
+    Работает по дедлайнам: события (предупреждение, готовность, смена отображаемой минуты)
+    хранятся в min-heap, задача в общем планировщике спит до ближайшего события или до вызова wake().
+    """
+    
+    JOB_NAME = 'supplies_timers'
     
     def __init__(self, bot):
         self.bot = bot
         self.supplies_manager = SuppliesManager(bot)
-        self.task: Optional[asyncio.Task] = None
         self.is_running = False
+        # Последние отображённые минуты до готовности: {object_key: minutes}
+        self._displayed_minutes: Dict[str, int] = {}
     
     def start(self):
-        """Запускает планировщик"""
-        if self.is_running:
-            logger.info("Планировщик поставок уже запущен")
-            return
-        
+        """Регистрирует задачу таймеров в общем планировщике"""
+        # Задача возвращает задержку до ближайшего дедлайна - планировщик спит ровно столько
+        job_scheduler.add_job(self.JOB_NAME, self._check_timers, DynamicTrigger(error_delay=15.0))
+        job_scheduler.start()
         self.is_running = True
-        self.task = asyncio.create_task(self._scheduler_loop())
         logger.info("Планировщик поставок запущен")
     
     def stop(self):
@@ -34,27 +41,63 @@ class SuppliesScheduler:
         if not self.is_running:
             return
         
+        job_scheduler.remove_job(self.JOB_NAME)
         self.is_running = False
-        if self.task:
-            self.task.cancel()
         logger.info("Планировщик поставок остановлен")
     
-    async def _scheduler_loop(self):
-        """Основной цикл планировщика (проверка каждые 15 секунд для лучшего обновления)"""
-        while self.is_running:
-            try:
-                await self._check_timers()
-                await asyncio.sleep(15)  # Проверка каждые 15 секунд для лучшего UI
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.warning("Ошибка в планировщике поставок: %s", e)
-                await asyncio.sleep(15)
+    def wake(self):
+        """Разбудить планировщик досрочно (таймер запущен или отменён)"""
+        job_scheduler.run_soon(self.JOB_NAME)
+    
+    @staticmethod
+    def _build_deadline_heap(active_timers: Dict[str, Any], warning_minutes: int,
+                             current_time: datetime) -> List[Tuple[datetime, str, str]]:
+        """
+        Построить min-heap будущих событий таймеров
+        
+        События: 'warning' (end_time - warning_minutes), 'ready' (end_time)
+        и 'display' - момент, когда меняется отображаемое число минут.
+        """
+        heap = []
+        warning_delta = timedelta(minutes=warning_minutes)
+        
+        for object_key, timer_info in active_timers.items():
+            end_time = datetime.fromisoformat(timer_info["end_time"])
+            heapq.heappush(heap, (end_time, 'ready', object_key))
+            
+            if not timer_info.get("warning_sent", False):
+                heapq.heappush(heap, (end_time - warning_delta, 'warning', object_key))
+            
+            remaining = (end_time - current_time).total_seconds()
+            if remaining > 0:
+                # Отображаемые минуты = floor(remaining / 60); значение меняется в end_time - m*60
+                display_at = end_time - timedelta(minutes=int(remaining // 60))
+                if display_at <= current_time:
+                    display_at += timedelta(minutes=1)
+                heapq.heappush(heap, (display_at, 'display', object_key))
+        
+        return heap
+    
+    @staticmethod
+    def _get_displayed_minutes(active_timers: Dict[str, Any], current_time: datetime) -> Dict[str, int]:
+        """Минуты до готовности в том виде, в каком они видны в сообщениях"""
+        displayed = {}
+        for object_key, timer_info in active_timers.items():
+            remaining = (datetime.fromisoformat(timer_info["end_time"]) - current_time).total_seconds()
+            if remaining > 0:
+                displayed[object_key] = int(remaining // 60)
+        return displayed
     
-    async def _check_timers(self):
-        """Проверяет все активные таймеры и отправляет уведомления"""
+    async def _check_timers(self) -> Optional[float]:
+        """
+        Обрабатывает наступившие события таймеров
+        
+        Returns:
+            Optional[float]: секунды до следующего события или None, если таймеров нет
+        """
         try:
-            active_timers = self.supplies_manager.get_active_timers()
+            # Читаем таймеры напрямую: get_active_timers() удаляет истекшие до отправки уведомления
+            active_timers = self.supplies_manager._load_data().get("active_timers", {})
             config = load_config()
             
             # Получаем настройки
@@ -65,16 +108,15 @@ class SuppliesScheduler:
             if not notification_channel_id:
                 if active_timers:  # Логируем только если есть таймеры
                     logger.info("Канал уведомлений не настроен")
-                return
+                return None
             
             notification_channel = self.bot.get_channel(notification_channel_id)
             if not notification_channel:
                 if active_timers:  # Логируем только если есть таймеры
                     logger.info("Канал уведомлений не найден: %s", notification_channel_id)
-                return
+                return None
             
             current_time = datetime.now()
-            timers_changed = False
             expired_timers = []  # Список истекших таймеров для обработки
             
             for object_key, timer_info in active_timers.items():
@@ -104,10 +146,15 @@ class SuppliesScheduler:
                     
                     # Отмечаем, что предупреждение отправлено
                     await self._mark_warning_sent(object_key)
-                    timers_changed = True
+                    timer_info["warning_sent"] = True
+            
+            # Отображение обновляем только если изменилось видимое число минут (или набор таймеров)
+            displayed_minutes = self._get_displayed_minutes(active_timers, current_time)
+            display_changed = displayed_minutes != self._displayed_minutes
             
             # Сначала обновляем warning сообщения (пока таймеры еще существуют)
-            await self._update_warning_messages(notification_channel)
+            if display_changed:
+                await self._update_warning_messages(notification_channel)
             
             # Теперь обрабатываем истекшие таймеры
             for object_key, timer_info in expired_timers:
@@ -121,17 +168,23 @@ class SuppliesScheduler:
                 await self.supplies_manager.clear_start_message(object_key, notification_channel)
                 # Удаляем истекший таймер
                 self.supplies_manager.cancel_timer(object_key)
-                timers_changed = True
+                active_timers.pop(object_key, None)
+            
+            if display_changed:
+                await self._update_control_message()
+                await self._update_notification_messages(notification_channel)
+                self._displayed_minutes = displayed_minutes
             
-            # Обновляем сообщение управления каждую минуту (не только при изменениях)
-            # Это нужно для обновления оставшегося времени в embed'ах
-            await self._update_control_message()
+            heap = self._build_deadline_heap(active_timers, warning_minutes, current_time)
+            if not heap:
+                return None
             
-            # Обновляем сообщения в канале оповещений
-            await self._update_notification_messages(notification_channel)
+            next_event_time = heap[0][0]
+            return max(0.0, (next_event_time - datetime.now()).total_seconds())
                     
         except Exception as e:
             logger.warning("Ошибка при проверке таймеров поставок: %s", e)
+            return 15.0
     
     async def _update_control_message(self):
         """Обновляет сообщение управления поставками"""
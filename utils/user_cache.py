@@ -15,6 +15,7 @@ Features:
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Any, Tuple, List
+from utils.job_scheduler import job_scheduler, IntervalTrigger
 from utils.logging_setup import get_logger
 
 # Initialize logger
@@ -441,6 +442,10 @@ class UserDataCache:
                         error_count += 1
                         continue
                 
+                # Прогреваем кэш модераторов для эмбедов аудита
+                from utils.audit_logger import moderator_identity_cache
+                moderator_identity_cache.warm(all_users_raw)
+                
                 # Отмечаем успешную предзагрузку
                 self._bulk_preloaded = True
                 self._bulk_preload_time = datetime.now()
@@ -499,22 +504,13 @@ class UserDataCache:
         self._expiry[user_id] = datetime.now() + timedelta(seconds=bulk_ttl)
         self._stats['cache_size'] = len(self._cache)
     
-    async def background_cleanup_task(self):
-        """Фоновая задача для периодической очистки кэша"""
-        while True:
-            try:
-                await asyncio.sleep(self.CLEANUP_INTERVAL)
-                
-                # Проверяем, нужна ли очистка
-                now = datetime.now()
-                if (now - self._stats['last_cleanup']).total_seconds() >= self.CLEANUP_INTERVAL:
-                    self._cleanup_expired()
-                    
-            except asyncio.CancelledError:
-                logger.info("CACHE CLEANUP TASK: Задача очистки остановлена")
-                break
-            except Exception as e:
-                logger.error("CACHE CLEANUP ERROR: %s", e)
+    def schedule_background_cleanup(self, job_name: str = 'user_cache_cleanup'):
+        """Зарегистрировать периодическую очистку кэша в общем планировщике"""
+        async def cleanup_job():
+            self._cleanup_expired()
+        
+        job_scheduler.add_job(job_name, cleanup_job, IntervalTrigger(self.CLEANUP_INTERVAL), jitter=30, catch_up=False)
+        job_scheduler.start()
 
 
 # Глобальный экземпляр кэша
@@ -554,6 +550,13 @@ async def refresh_user_cache() -> bool:
     return result.get('success', False)
 
 
+def schedule_user_cache_cleanup() -> None:
+    """
+    Запустить периодическую очистку истекших записей кэша
+    """
+    _global_cache.schedule_background_cleanup()
+
+
 def is_cache_initialized() -> bool:
     """
     Проверить, инициализирован ли кэш
@@ -0,0 +1,122 @@
+"""
+Warehouse Request Ledger
+
+Журнал заявок склада в PostgreSQL.
+
+Каждая отправленная заявка записывается со статусом 'pending', кнопки модерации
+переводят её в 'approved'/'rejected', удаление - в 'deleted'. Проверка кулдауна
+читает последнюю заявку пользователя на сервере по индексу (guild_id, user_id, created_at)
+и не зависит от количества сообщений в канале заявок.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+from utils.postgresql_pool import get_db_cursor
+from utils.logging_setup import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Статусы заявок
+STATUS_PENDING = 'pending'
+STATUS_APPROVED = 'approved'
+STATUS_REJECTED = 'rejected'
+STATUS_DELETED = 'deleted'
+
+# Заявки с этими статусами не запускают кулдаун
+COOLDOWN_FREE_STATUSES = {STATUS_REJECTED, STATUS_DELETED}
+
+_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS warehouse_requests (
+        id BIGSERIAL PRIMARY KEY,
+        guild_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        message_id BIGINT UNIQUE,
+        items_count INTEGER NOT NULL DEFAULT 0,
+        status VARCHAR(16) NOT NULL DEFAULT 'pending',
+        moderator_id BIGINT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    CREATE INDEX IF NOT EXISTS idx_warehouse_requests_guild_user_created
+        ON warehouse_requests (guild_id, user_id, created_at DESC);
+    DROP INDEX IF EXISTS idx_warehouse_requests_user_created;
+"""
+
+
+class WarehouseRequestLedger:
+    """Журнал заявок склада"""
+
+    def __init__(self):
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _ensure_schema(self):
+        """Создать таблицу и индекс при первом обращении"""
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            with get_db_cursor() as cursor:
+                cursor.execute(_SCHEMA_SQL)
+            self._schema_ready = True
+
+    def record_request(self, guild_id: int, user_id: int, message_id: int, items_count: int) -> bool:
+        """Записать отправленную заявку"""
+        try:
+            self._ensure_schema()
+            with get_db_cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO warehouse_requests (guild_id, user_id, message_id, items_count, status)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (message_id) DO NOTHING;
+                """, (guild_id, user_id, message_id, items_count, STATUS_PENDING))
+            return True
+        except Exception as e:
+            logger.error("Ошибка записи заявки склада %s в журнал: %s", message_id, e)
+            return False
+
+    def update_status(self, message_id: int, status: str, moderator_id: Optional[int] = None) -> bool:
+        """Изменить статус заявки по ID сообщения"""
+        try:
+            self._ensure_schema()
+            with get_db_cursor() as cursor:
+                cursor.execute("""
+                    UPDATE warehouse_requests
+                    SET status = %s, moderator_id = %s, updated_at = now()
+                    WHERE message_id = %s;
+                """, (status, moderator_id, message_id))
+                if cursor.rowcount == 0:
+                    logger.info("Заявка склада %s отсутствует в журнале (статус %s не записан)", message_id, status)
+            return True
+        except Exception as e:
+            logger.error("Ошибка обновления статуса заявки склада %s: %s", message_id, e)
+            return False
+
+    def get_last_request(self, guild_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Последняя заявка пользователя на сервере
+
+        Returns:
+            Optional[Dict]: message_id, status, created_at или None
+
+        Raises:
+            Exception: при недоступности БД (вызывающий код решает, как поступить)
+        """
+        self._ensure_schema()
+        with get_db_cursor() as cursor:
+            cursor.execute("""
+                SELECT message_id, status, created_at
+                FROM warehouse_requests
+                WHERE guild_id = %s AND user_id = %s
+                ORDER BY created_at DESC
+                LIMIT 1;
+            """, (guild_id, user_id))
+            row = cursor.fetchone()
+        return dict(row) if row else None
+
+
+# Глобальный экземпляр
+warehouse_request_ledger = WarehouseRequestLedger()
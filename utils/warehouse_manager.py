@@ -8,13 +8,39 @@ import discord
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, Tuple, Any, List
 import re
-from .config_manager import load_config
+from .config_manager import load_config, get_config_version
 from .message_manager import get_warehouse_message
+from .warehouse_ledger import warehouse_request_ledger, COOLDOWN_FREE_STATUSES
 from utils.logging_setup import get_logger
 
 # Initialize logger
 logger = get_logger(__name__)
 
+# Общие лимиты склада по умолчанию (rule 4.20)
+DEFAULT_GENERAL_LIMITS = {
+    'weapons_max': 3,
+    'materials_max': 2000,
+    'armor_max': 20,
+    'medkits_max': 25,
+    'other_max': 15,
+}
+
+# Персональные лимиты, если ни должность, ни звание не найдены
+DEFAULT_USER_LIMITS = {
+    "оружие": 2,
+    "бронежилеты": 10,
+    "аптечки": 20,
+    "weapon_restrictions": []
+}
+
+# Персональные лимиты при отключённых лимитах по должностям и званиям
+UNLIMITED_USER_LIMITS = {
+    "оружие": 999,
+    "бронежилеты": 999,
+    "аптечки": 999,
+    "weapon_restrictions": []
+}
+
 class WarehouseManager:
     def __init__(self):
         # PostgreSQL-based warehouse manager - без sheets_manager
@@ -56,17 +82,16 @@ class WarehouseManager:
             "Кольт М16", "Кольт 416 Канада", "ФН СКАР-Т", 
             "Штейр АУГ-А3", "Таурус Бешеный бык"
         ]
+        # Название категории -> ключ категории
+        self._category_keys = {name: data["key"] for name, data in self.item_categories.items()}
+
+        # Таблица эффективных лимитов, пересчитывается при смене версии конфигурации
+        self._limits_table: Optional[Dict[str, Any]] = None
 
     def get_general_limits(self) -> Dict[str, int]:
         """Получить общие лимиты склада из конфигурации (rule 4.20)."""
         cfg = load_config()
-        return cfg.get('warehouse_general_limits', {
-            'weapons_max': 3,
-            'materials_max': 2000,
-            'armor_max': 20,
-            'medkits_max': 25,
-            'other_max': 15,
-        })
+        return cfg.get('warehouse_general_limits', dict(DEFAULT_GENERAL_LIMITS))
 
     def get_warehouse_channels(self) -> Tuple[Optional[int], Optional[int]]:
         """Получить каналы склада из конфигурации"""
@@ -117,7 +142,7 @@ class WarehouseManager:
         """
         Проверить кулдаун пользователя с учетом статуса заявки
         Кулдаун применяется только если последняя заявка одобрена или на рассмотрении
-        Если отклонена - можно подавать новую сразу
+        Если отклонена или удалена - можно подавать новую сразу
         Модераторы и администраторы обходят кулдаун полностью
         Возвращает (can_request, next_available_time_moscow)
         """
@@ -126,6 +151,47 @@ class WarehouseManager:
             return True, None
         
         cooldown_hours = self.get_cooldown_hours()
+        
+        # Последняя заявка из журнала (индекс по user_id, created_at)
+        try:
+            last_request = warehouse_request_ledger.get_last_request(channel.guild.id, user_id)
+        except Exception as e:
+            logger.error("COOLDOWN CHECK: Журнал заявок недоступен, проверяем историю канала: %s", e)
+            return await self._check_cooldown_from_history(user_id, channel, cooldown_hours)
+        
+        if not last_request:
+            # Заявки, отправленные до появления журнала или не записанные в него, есть только в канале
+            logger.info("COOLDOWN CHECK: Заявок в журнале нет, проверяем историю канала")
+            return await self._check_cooldown_from_history(user_id, channel, cooldown_hours)
+        
+        status = last_request['status']
+        logger.info("COOLDOWN CHECK: Найдена заявка со статусом '%s'", status)
+        
+        # Если заявка отклонена или удалена - кулдаун не применяется
+        if status in COOLDOWN_FREE_STATUSES:
+            return True, None
+        
+        # Для одобренных и на рассмотрении заявок проверяем время (московское время, без tzinfo)
+        moscow_tz = timezone(timedelta(hours=3))  # UTC+3 для Москвы
+        created_at = last_request['created_at']
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        request_time_moscow = created_at.astimezone(moscow_tz).replace(tzinfo=None)
+        current_time_moscow = datetime.now(moscow_tz).replace(tzinfo=None)
+        
+        if current_time_moscow - request_time_moscow < timedelta(hours=cooldown_hours):
+            next_time_moscow = request_time_moscow + timedelta(hours=cooldown_hours)
+            logger.info(f"COOLDOWN CHECK: Кулдаун активен! Следующий запрос: {next_time_moscow.strftime('%Y-%m-%d %H:%M:%S')} МСК")
+            return False, next_time_moscow
+        
+        return True, None
+
+    async def _check_cooldown_from_history(self, user_id: int, channel: discord.TextChannel,
+                                           cooldown_hours: int) -> Tuple[bool, Optional[datetime]]:
+        """
+        Резервная проверка кулдауна по истории канала заявок (журнал недоступен или в нём нет заявок пользователя)
+        Возвращает (can_request, next_available_time_moscow)
+        """
         moscow_tz = timezone(timedelta(hours=3))  # UTC+3 для Москвы
         
         # Ищем последнее сообщение с заявкой этого пользователя
@@ -267,40 +333,105 @@ class WarehouseManager:
             traceback.print_exc()
             return 'Неизвестно', 'Не указан', 'Не указано', 'Не указано'
 
+    @staticmethod
+    def _build_effective_limits(user_limits: Dict[str, Any], general_limits: Dict[str, int]) -> Dict[str, Any]:
+        """Эффективные лимиты по категориям: минимум из персонального и общего"""
+        weapon_restrictions = list(user_limits.get("weapon_restrictions", []) or [])
+        return {
+            "оружие": min(user_limits.get("оружие", 3), general_limits.get('weapons_max', 3)),
+            "бронежилеты": min(user_limits.get("бронежилеты", 15), general_limits.get('armor_max', 20)),
+            "аптечки": min(user_limits.get("аптечки", 20), general_limits.get('medkits_max', 25)),
+            "материалы": general_limits.get('materials_max', 2000),
+            "другое": general_limits.get('other_max', 15),
+            "weapon_restrictions": weapon_restrictions,
+            "allowed_weapons": frozenset(weapon_restrictions),
+        }
+
+    def _get_limits_table(self) -> Dict[str, Any]:
+        """
+        Таблица лимитов для текущей версии конфигурации
+
+        Конфигурация читается один раз на версию; эффективные лимиты по должностям
+        и званиям считаются сразу, комбинации (должность, звание) - при первом обращении.
+        """
+        version = get_config_version()
+        table = self._limits_table
+        if table is not None and table['version'] == version:
+            return table
+
+        config = load_config()
+        limits_mode = config.get("warehouse_limits_mode", {
+            "positions_enabled": True,
+            "ranks_enabled": False
+        })
+        general_limits = config.get('warehouse_general_limits', DEFAULT_GENERAL_LIMITS)
+        positions_enabled = limits_mode.get("positions_enabled", True)
+        ranks_enabled = limits_mode.get("ranks_enabled", False)
+        position_limits = config.get("warehouse_limits_positions", {}) if positions_enabled else {}
+        rank_limits = config.get("warehouse_limits_ranks", {}) if ranks_enabled else {}
+
+        table = {
+            'version': version,
+            'limits_disabled': not positions_enabled and not ranks_enabled,
+            'positions': position_limits,
+            'ranks': rank_limits,
+            'effective_positions': {
+                position: self._build_effective_limits(limits, general_limits)
+                for position, limits in position_limits.items()
+            },
+            'effective_ranks': {
+                rank: self._build_effective_limits(limits, general_limits)
+                for rank, limits in rank_limits.items()
+            },
+            'effective_default': self._build_effective_limits(DEFAULT_USER_LIMITS, general_limits),
+            'effective_unlimited': self._build_effective_limits(UNLIMITED_USER_LIMITS, general_limits),
+            # (должность, звание) -> эффективные лимиты
+            'resolved': {},
+        }
+        self._limits_table = table
+        return table
+
     def get_user_limits(self, position: str, rank: str) -> Dict[str, Any]:
         """
         Получить лимиты для пользователя на основе должности или звания
         """
-        limits_mode = self.get_limits_mode()
+        table = self._get_limits_table()
         
         # Если все лимиты отключены - без ограничений
-        if not limits_mode.get("positions_enabled", True) and not limits_mode.get("ranks_enabled", False):
-            return {
-                "оружие": 999,
-                "бронежилеты": 999,
-                "аптечки": 999,
-                "weapon_restrictions": []
-            }
+        if table['limits_disabled']:
+            return dict(UNLIMITED_USER_LIMITS)
         
-        # Проверка лимитов по должности (приоритет)
-        if limits_mode.get("positions_enabled", True) and position:
-            position_limits = self.get_position_limits()
-            if position in position_limits:
-                return position_limits[position]
-        
-        # Проверка лимитов по званию (fallback)
-        if limits_mode.get("ranks_enabled", False) and rank:
-            rank_limits = self.get_rank_limits()
-            if rank in rank_limits:
-                return rank_limits[rank]
+        # Проверка лимитов по должности (приоритет), затем по званию (fallback)
+        if position and position in table['positions']:
+            return table['positions'][position]
+        if rank and rank in table['ranks']:
+            return table['ranks'][rank]
         
         # Базовые лимиты по умолчанию
-        return {
-            "оружие": 2,
-            "бронежилеты": 10,
-            "аптечки": 20,
-            "weapon_restrictions": []
-        }
+        return dict(DEFAULT_USER_LIMITS)
+
+    def get_effective_limits(self, position: str, rank: str) -> Dict[str, Any]:
+        """
+        Эффективные лимиты пользователя (с учётом общих лимитов и ограничений по оружию)
+        Ключи: оружие, бронежилеты, аптечки, материалы, другое, weapon_restrictions, allowed_weapons
+        """
+        table = self._get_limits_table()
+        key = (position, rank)
+        limits = table['resolved'].get(key)
+        if limits is not None:
+            return limits
+
+        if table['limits_disabled']:
+            limits = table['effective_unlimited']
+        elif position and position in table['effective_positions']:
+            limits = table['effective_positions'][position]
+        elif rank and rank in table['effective_ranks']:
+            limits = table['effective_ranks'][rank]
+        else:
+            limits = table['effective_default']
+
+        table['resolved'][key] = limits
+        return limits
 
     def validate_item_request(self, guild_id: int, category_key: str, item_name: str, quantity: int, 
                             position: str, rank: str, current_cart_items: List = None) -> Tuple[bool, int, str]:
@@ -308,8 +439,7 @@ class WarehouseManager:
         Валидировать запрос предмета с учетом уже добавленных в корзину
         Возвращает (is_valid, corrected_quantity, message)
         """
-        user_limits = self.get_user_limits(position, rank)
-        gl = self.get_general_limits()
+        limits = self.get_effective_limits(position, rank)
         
         # Подсчитываем уже существующие предметы данного типа в корзине
         existing_quantity = 0
@@ -321,11 +451,11 @@ class WarehouseManager:
         # Специальная обработка для разных категорий
         if category_key == "оружие":
             # Эффективный лимит = минимум из персонального и общего
-            max_weapons = min(user_limits.get("оружие", 3), gl.get('weapons_max', 3))
-            weapon_restrictions = user_limits.get("weapon_restrictions", [])
+            max_weapons = limits["оружие"]
+            weapon_restrictions = limits["weapon_restrictions"]
             
             # Проверка ограничений на тип оружия
-            if weapon_restrictions and item_name not in weapon_restrictions:
+            if weapon_restrictions and item_name not in limits["allowed_weapons"]:
                 error_msg = get_warehouse_message(guild_id, "cart.error_invalid_weapon", "❌ Вам недоступен данный тип оружия. Доступно:")
                 return False, 0, f"{error_msg} {', '.join(weapon_restrictions)}"
             
@@ -340,7 +470,7 @@ class WarehouseManager:
                 return True, corrected_quantity, f"Количество уменьшено до максимально возможного: {corrected_quantity} (лимит: {max_weapons}, в корзине: {existing_quantity})"
             
         elif category_key == "бронежилеты":
-            max_armor = min(user_limits.get("бронежилеты", 15), gl.get('armor_max', 20))
+            max_armor = limits["бронежилеты"]
             
             # Проверка общего количества (существующие + новые)
             total_quantity = existing_quantity + quantity
@@ -354,7 +484,7 @@ class WarehouseManager:
                 
         elif category_key == "медикаменты":
             if item_name == "Армейская аптечка":
-                max_medkits = min(user_limits.get("аптечки", 20), gl.get('medkits_max', 25))
+                max_medkits = limits["аптечки"]
                 
                 # Проверка общего количества (существующие + новые)
                 total_quantity = existing_quantity + quantity
@@ -369,7 +499,7 @@ class WarehouseManager:
             if item_name == "Материалы":
                 # Проверка общего количества материалов по общим лимитам
                 total_quantity = existing_quantity + quantity
-                max_materials = gl.get('materials_max', 2000)
+                max_materials = limits["материалы"]
                 if total_quantity > max_materials:
                     corrected_quantity = max_materials - existing_quantity
                     if corrected_quantity <= 0:
@@ -378,7 +508,7 @@ class WarehouseManager:
             else:
                 # Общий лимит для прочих предметов категории 'другое'
                 total_quantity = existing_quantity + quantity
-                max_other = gl.get('other_max', 15)
+                max_other = limits["другое"]
                 if total_quantity > max_other:
                     corrected_quantity = max_other - existing_quantity
                     if corrected_quantity <= 0:
@@ -479,11 +609,7 @@ class WarehouseManager:
         Каждый конкретный предмет имеет свой отдельный лимит
         """
         # Приводим категории к единому формату (ключ)
-        category_key2 = None
-        for cat_name, cat_data in self.item_categories.items():
-            if cat_name == category2:
-                category_key2 = cat_data["key"]
-                break
+        category_key2 = self._category_keys.get(category2)
         
         if not category_key2:
             return False